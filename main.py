@@ -0,0 +1,29 @@
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+
+from src.Helpers.config import get_settings
+from src.Routes import chat_route, llm_route, mcp_route, metrics_route
+from src.Agent.Graph.graph_registry import get_graph_registry
+from src.Agent.LLM.llm_gateway import get_llm_gateway
+from src.MCP.mcp_session_pool import get_mcp_session_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build and compile the CRM graph once, before the first request is accepted
+    graph_registry = get_graph_registry()
+    await graph_registry.start()
+    yield
+    await graph_registry.shutdown()
+    # Terminates the pooled MCP server subprocesses
+    await get_mcp_session_pool().close()
+    # Closes the pooled OpenAI connections
+    await get_llm_gateway().aclose()
+
+
+app = FastAPI(title=get_settings().APP_NAME, lifespan=lifespan)
+app.include_router(chat_route.router)
+app.include_router(mcp_route.router)
+app.include_router(llm_route.router)
+app.include_router(metrics_route.router)
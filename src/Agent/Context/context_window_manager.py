@@ -0,0 +1,160 @@
+import hashlib
+import json
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from langchain_core.messages import (AIMessage, BaseMessage, HumanMessage, SystemMessage,
+                                     ToolMessage, get_buffer_string)
+from langchain_core.messages.utils import count_tokens_approximately
+
+from src.Agent.LLM.llm_response_cache import message_fingerprint
+from src.Helpers.config import get_settings, Settings
+
+
+def _load_token_counter(encoding_name: str) -> Callable[[BaseMessage], int]:
+    """
+    Returns a per-message token counter backed by tiktoken, or by langchain's
+    ~4 chars/token approximation when the encoding cannot be loaded (e.g. offline).
+    """
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding(encoding_name)
+    except Exception as e:
+        print(f"Could not load the '{encoding_name}' tokenizer ({e}), approximating token counts.")
+        return lambda message: count_tokens_approximately([message])
+
+    # 3 tokens of per-message framing, as in the OpenAI chat format.
+    return lambda message: len(encoding.encode(get_buffer_string([message]), disallowed_special=())) + 3
+
+
+@dataclass
+class CompactionReport:
+    """How much a turn's prompt was compacted."""
+    tokens_before: int
+    tokens_after: int
+    tokens_saved: int
+    tool_results_compacted: int
+    messages_dropped: int
+
+    def to_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class ContextWindowManager:
+    """
+    Keeps the prompt of each turn under a token budget.
+
+    The system prompt and the last `recent_turns` human turns are always sent verbatim.
+    When the prompt is over budget, older tool results are first replaced by a short stub,
+    then the oldest messages are dropped. An AI tool_call message and its tool results are
+    treated as one unit, so a tool_call is never sent without its results (or the reverse).
+    """
+
+    def __init__(self, settings: Settings = None):
+        self.settings = settings if settings else get_settings()
+        self.max_prompt_tokens = self.settings.CONTEXT_MAX_PROMPT_TOKENS
+        self.recent_turns = self.settings.CONTEXT_RECENT_TURNS
+        self.compacted_tool_result_chars = self.settings.CONTEXT_COMPACTED_TOOL_RESULT_CHARS
+        self._count = _load_token_counter(self.settings.CONTEXT_TOKENIZER_ENCODING)
+        # Counts are cached by what is counted, not by message id: a reviewer's "update" edits the
+        # tool call args of an AI message in place. The manager is shared by every thread, so the
+        # cache is an LRU bounded by CONTEXT_TOKEN_CACHE_MAX_ENTRIES.
+        self.token_cache_max_entries = self.settings.CONTEXT_TOKEN_CACHE_MAX_ENTRIES
+        self._token_cache: "OrderedDict[str, int]" = OrderedDict()
+
+    def count_tokens(self, message: BaseMessage) -> int:
+        key = hashlib.sha256(json.dumps(message_fingerprint(message), sort_keys=True, ensure_ascii=False,
+                                        default=str).encode()).hexdigest()
+        tokens = self._token_cache.get(key)
+        if tokens is not None:
+            self._token_cache.move_to_end(key)
+            return tokens
+        tokens = self._count(message)
+        self._token_cache[key] = tokens
+        if len(self._token_cache) > self.token_cache_max_entries:
+            self._token_cache.popitem(last=False)
+        return tokens
+
+    def compact(self, system_message: SystemMessage,
+                messages: List[BaseMessage]) -> Tuple[List[BaseMessage], CompactionReport]:
+        """Returns the prompt to send for `messages` and a report of what was compacted."""
+        system_tokens = self.count_tokens(system_message)
+        tokens_before = system_tokens + sum(self.count_tokens(m) for m in messages)
+        if tokens_before <= self.max_prompt_tokens:
+            return [system_message] + messages, CompactionReport(tokens_before, tokens_before, 0, 0, 0)
+
+        units = self._group_units(messages)
+        recent_start = self._recent_start(units)
+        older, recent = units[:recent_start], units[recent_start:]
+        budget = self.max_prompt_tokens - system_tokens - sum(self.count_tokens(m) for u in recent for m in u)
+
+        # 1. Stub the tool results of older turns, oldest first, until they fit.
+        stubs = []
+        older_tokens = sum(self.count_tokens(m) for u in older for m in u)
+        for unit in older:
+            if older_tokens <= budget:
+                break
+            for i, message in enumerate(unit):
+                if isinstance(message, ToolMessage):
+                    stub = self._compact_tool_message(message)
+                    if stub is not None:
+                        older_tokens += self.count_tokens(stub) - self.count_tokens(message)
+                        unit[i] = stub
+                        stubs.append(stub)
+
+        # 2. Drop whole older units, oldest first.
+        messages_dropped = 0
+        while older and older_tokens > budget:
+            unit = older.pop(0)
+            older_tokens -= sum(self.count_tokens(m) for m in unit)
+            messages_dropped += len(unit)
+
+        prompt = [system_message]
+        if messages_dropped:
+            prompt.append(SystemMessage(
+                content=f"[{messages_dropped} earlier messages of this conversation were omitted to fit the context window.]"
+            ))
+        prompt += [m for u in older + recent for m in u]
+
+        tokens_after = sum(self.count_tokens(m) for m in prompt)
+        tool_results_compacted = sum(1 for stub in stubs if any(stub is m for m in prompt))
+        report = CompactionReport(tokens_before, tokens_after, tokens_before - tokens_after,
+                                  tool_results_compacted, messages_dropped)
+        return prompt, report
+
+    @staticmethod
+    def _group_units(messages: List[BaseMessage]) -> List[List[BaseMessage]]:
+        """Splits messages into units that are kept or dropped together: an AI message with
+        tool calls plus its tool results, or any other single message."""
+        units: List[List[BaseMessage]] = []
+        pending_calls = set()
+        for message in messages:
+            if isinstance(message, ToolMessage) and message.tool_call_id in pending_calls:
+                units[-1].append(message)
+                pending_calls.discard(message.tool_call_id)
+                continue
+            units.append([message])
+            pending_calls = {c["id"] for c in message.tool_calls} if isinstance(message, AIMessage) else set()
+        return units
+
+    def _recent_start(self, units: List[List[BaseMessage]]) -> int:
+        """Index of the first unit of the last `recent_turns` human turns."""
+        human_turns = 0
+        for index in range(len(units) - 1, -1, -1):
+            if isinstance(units[index][0], HumanMessage):
+                human_turns += 1
+                if human_turns >= self.recent_turns:
+                    return index
+        return 0
+
+    def _compact_tool_message(self, message: ToolMessage) -> Optional[ToolMessage]:
+        content = message.content if isinstance(message.content, str) else str(message.content)
+        if len(content) <= self.compacted_tool_result_chars:
+            return None
+        elided = self.count_tokens(message)
+        return message.model_copy(update={
+            "id": f"{message.id}:compacted" if message.id else None,
+            "content": f"{content[:self.compacted_tool_result_chars]}... "
+                       f"[compacted: ~{elided} tokens of this earlier tool result elided]",
+        })
@@ -0,0 +1,6 @@
+from enum import Enum
+
+class CheckpointerBackend(Enum):
+    MEMORY = "memory"
+    POSTGRES = "postgres"
+    SQLITE = "sqlite"
@@ -3,4 +3,13 @@ from enum import Enum
 class NodeName(Enum):
     ASSISTANT_NODE = "assistant_node"
     HUMAN_TOOL_REVIEW_NODE = "human_tool_review_node"
-    TOOLS = "tools"
\ No newline at end of file
+    TOOLS = "tools"
+    CAMPAIGN = "campaign"
+
+class CampaignNodeName(Enum):
+    CUSTOMER_PROFILES = "customer_profiles"
+    EMAIL_WORKER = "email_worker"
+    EMAIL_TEMPLATE = "email_template"
+    RENDER_EMAILS = "render_emails"
+    REVIEW = "review"
+    SEND_EMAILS = "send_emails"
\ No newline at end of file
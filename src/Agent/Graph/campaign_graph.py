@@ -0,0 +1,122 @@
+import random
+from collections import defaultdict
+from typing import List
+
+from langchain_core.tools import BaseTool
+from langgraph.graph import StateGraph, START, END
+from langgraph.types import Send
+
+from src.Agent.Graph.base_graph import BaseGraph
+from src.Agent.Graph.Enumerations.nodes_name_enums import CampaignNodeName
+from src.Agent.LLM.LLMProviders.base_provider import BaseProvider
+from src.Agent.Nodes.Campaign.campaign_review_node import CampaignReviewNode
+from src.Agent.Nodes.Campaign.campaign_send_node import CampaignSendNode
+from src.Agent.Nodes.Campaign.customer_profiles_node import CustomerProfilesNode
+from src.Agent.Nodes.Campaign.email_template import segment_of
+from src.Agent.Nodes.Campaign.email_template_node import EmailTemplateNode
+from src.Agent.Nodes.Campaign.email_worker_node import EmailWorkerNode
+from src.Agent.Nodes.Campaign.render_emails_node import RenderEmailsNode
+from src.Agent.State.campaign_state import CampaignState, EmailWorkerState, TemplateWorkerState
+from src.Helpers.config import Settings
+
+# Profiles shown to a segment's template worker, to ground the template in real customers.
+TEMPLATE_EXAMPLE_PROFILES = 3
+# The marketing MCP server's tools the subgraph runs.
+REQUIRED_TOOLS = ("get_customer_profiles", "send_campaign_emails")
+
+
+class CampaignGraph(BaseGraph):
+    """
+    Fans a campaign out to parallel workers, then reviews and sends the batch.
+
+        personalized: customer_profiles -> email_worker (x customers, via Send) -> review -> send_emails
+        template:     customer_profiles -> email_template (x segments, via Send) -> render_emails
+                      -> email_worker (polish, x sampled customers) -> review -> send_emails
+
+    It is compiled without a checkpointer: run from a node of the CRM graph, it inherits
+    the parent's, so an interrupted review resumes without re-drafting the emails. The
+    number of workers running at once is capped by the `max_concurrency` of the run.
+    """
+
+    def __init__(self, llm: BaseProvider, tools: List[BaseTool], settings: Settings = None):
+        super().__init__()
+        self.settings = settings if settings else self.settings
+        tools_by_name = {tool.name: tool for tool in tools}
+        missing_tools = [name for name in REQUIRED_TOOLS if name not in tools_by_name]
+        if missing_tools:
+            raise RuntimeError(f"The campaign subgraph needs the marketing MCP server's tools, missing: "
+                               f"{', '.join(missing_tools)}. Check that the server is configured and running.")
+        self.nodes = {
+            CampaignNodeName.CUSTOMER_PROFILES.value: CustomerProfilesNode(tools_by_name["get_customer_profiles"]),
+            CampaignNodeName.EMAIL_WORKER.value: EmailWorkerNode(llm=llm),
+            CampaignNodeName.EMAIL_TEMPLATE.value: EmailTemplateNode(llm=llm),
+            CampaignNodeName.RENDER_EMAILS.value: RenderEmailsNode(),
+            CampaignNodeName.REVIEW.value: CampaignReviewNode(),
+            CampaignNodeName.SEND_EMAILS.value: CampaignSendNode(tools_by_name["send_campaign_emails"]),
+        }
+
+    def build_graph(self) -> StateGraph:
+        graph = StateGraph(state_schema=CampaignState)
+
+        # The input schemas are explicit: BaseNode.__call__ is annotated with the CRM graph's state.
+        input_schemas = {
+            CampaignNodeName.EMAIL_WORKER.value: EmailWorkerState,
+            CampaignNodeName.EMAIL_TEMPLATE.value: TemplateWorkerState,
+        }
+        for node_name, node_instance in self.nodes.items():
+            graph.add_node(node_name, node_instance, input_schema=input_schemas.get(node_name, CampaignState))
+
+        graph.add_edge(START, CampaignNodeName.CUSTOMER_PROFILES.value)
+        graph.add_conditional_edges(CampaignNodeName.CUSTOMER_PROFILES.value,
+                                    self._fan_out,
+                                    [CampaignNodeName.EMAIL_WORKER.value, CampaignNodeName.EMAIL_TEMPLATE.value,
+                                     CampaignNodeName.REVIEW.value])
+        graph.add_edge(CampaignNodeName.EMAIL_TEMPLATE.value, CampaignNodeName.RENDER_EMAILS.value)
+        graph.add_conditional_edges(CampaignNodeName.RENDER_EMAILS.value,
+                                    self._polish_sample,
+                                    [CampaignNodeName.EMAIL_WORKER.value, CampaignNodeName.REVIEW.value])
+        graph.add_edge(CampaignNodeName.EMAIL_WORKER.value, CampaignNodeName.REVIEW.value)
+        graph.add_edge(CampaignNodeName.SEND_EMAILS.value, END)
+
+        return graph.compile()
+
+    @staticmethod
+    def _fan_out(state: CampaignState):
+        if not state.profiles:
+            return CampaignNodeName.REVIEW.value
+
+        if state.mode == "template":
+            profiles_by_segment = defaultdict(list)
+            for profile in state.profiles:
+                profiles_by_segment[segment_of(profile)].append(profile)
+            return [
+                Send(CampaignNodeName.EMAIL_TEMPLATE.value,
+                     TemplateWorkerState(campaign_type=state.campaign_type, brief=state.brief, segment=segment,
+                                         customers=len(profiles),
+                                         example_profiles=profiles[:TEMPLATE_EXAMPLE_PROFILES]))
+                for segment, profiles in profiles_by_segment.items()
+            ]
+
+        return [
+            Send(CampaignNodeName.EMAIL_WORKER.value,
+                 EmailWorkerState(campaign_type=state.campaign_type, brief=state.brief, profile=profile))
+            for profile in state.profiles
+        ]
+
+    def _polish_sample(self, state: CampaignState):
+        """Sends a random sample (CAMPAIGN_POLISH_SAMPLE_RATE) of the rendered emails to be polished."""
+        drafts = [draft for draft in state.drafts if draft.is_valid]
+        rate = self.settings.CAMPAIGN_POLISH_SAMPLE_RATE
+        if not drafts or rate <= 0:
+            return CampaignNodeName.REVIEW.value
+
+        sample_size = min(max(1, round(rate * len(drafts))), self.settings.CAMPAIGN_POLISH_MAX_EMAILS)
+        # Seeded with the campaign, so that a re-run of the step polishes the same customers.
+        sample = random.Random(state.campaign_id).sample(drafts, sample_size)
+        profiles = {profile["customer_id"]: profile for profile in state.profiles}
+        return [
+            Send(CampaignNodeName.EMAIL_WORKER.value,
+                 EmailWorkerState(campaign_type=state.campaign_type, brief=state.brief,
+                                  profile=profiles[draft.customer_id], draft=draft))
+            for draft in sample
+        ]
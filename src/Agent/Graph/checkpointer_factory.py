@@ -0,0 +1,74 @@
+import functools
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import MemorySaver
+
+from src.Agent.Graph.Enumerations.checkpointer_backend_enums import CheckpointerBackend
+from src.Helpers.config import get_settings, Settings
+from src.Helpers.metrics import CHECKPOINT_SAVE_DURATION
+
+
+def _timed(operation: str, method):
+    @functools.wraps(method)
+    async def timed(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            CHECKPOINT_SAVE_DURATION.observe(time.perf_counter() - started, operation=operation)
+    return timed
+
+
+def instrument_checkpointer(checkpointer: BaseCheckpointSaver) -> BaseCheckpointSaver:
+    """Times the checkpointer's async saves: the graph looks them up on the instance."""
+    checkpointer.aput = _timed("put", checkpointer.aput)
+    checkpointer.aput_writes = _timed("put_writes", checkpointer.aput_writes)
+    return checkpointer
+
+
+@asynccontextmanager
+async def create_checkpointer(settings: Settings = None) -> AsyncIterator[BaseCheckpointSaver]:
+    """
+    Opens the checkpointer selected by CHECKPOINTER_BACKEND for the lifetime of the context.
+
+    - memory: in-process MemorySaver (threads are lost on restart, not shared across workers).
+    - postgres: AsyncPostgresSaver on a connection pool to SUPABASE_URI.
+    - sqlite: AsyncSqliteSaver on CHECKPOINTER_SQLITE_PATH, for local use.
+
+    The durable backends let a restarted or sibling worker resume any thread_id.
+    """
+    settings = settings if settings else get_settings()
+    backend = CheckpointerBackend(settings.CHECKPOINTER_BACKEND)
+
+    if backend == CheckpointerBackend.POSTGRES:
+        from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+        from psycopg.rows import dict_row
+        from psycopg_pool import AsyncConnectionPool
+
+        if not settings.SUPABASE_URI:
+            raise ValueError("CHECKPOINTER_BACKEND is 'postgres' but SUPABASE_URI is not configured.")
+
+        async with AsyncConnectionPool(
+            conninfo=settings.SUPABASE_URI,
+            max_size=settings.CHECKPOINTER_POOL_SIZE,
+            kwargs={"autocommit": True, "prepare_threshold": 0, "row_factory": dict_row},
+            open=False,
+        ) as pool:
+            checkpointer = AsyncPostgresSaver(pool)
+            await checkpointer.setup()
+            print("Using the Postgres checkpointer.")
+            yield instrument_checkpointer(checkpointer)
+
+    elif backend == CheckpointerBackend.SQLITE:
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+        async with AsyncSqliteSaver.from_conn_string(settings.CHECKPOINTER_SQLITE_PATH) as checkpointer:
+            await checkpointer.setup()
+            print(f"Using the SQLite checkpointer at {settings.CHECKPOINTER_SQLITE_PATH}.")
+            yield instrument_checkpointer(checkpointer)
+
+    else:
+        yield instrument_checkpointer(MemorySaver())
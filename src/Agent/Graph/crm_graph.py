@@ -1,27 +1,45 @@
 from src.Agent.Graph.base_graph import BaseGraph
 from langgraph.graph import StateGraph , END , START
-from langgraph.prebuilt import ToolNode
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.checkpoint.memory import MemorySaver
 from src.Agent.LLM.factory_providers import LLMFactory
 from src.Agent.Nodes.assistant_node import AssistantNode
 from src.Agent.Nodes.human_tool_review_node import HumanToolReviewNode
+from src.Agent.Nodes.parallel_tool_node import ParallelToolNode
+from src.Agent.Nodes.campaign_node import CampaignNode
+from src.Agent.Graph.campaign_graph import CampaignGraph
+from src.Agent.Tools.campaign_tools import CAMPAIGN_EMAILS_TOOL_NAME, draft_campaign_emails
 from src.Agent.Graph.Enumerations.nodes_name_enums import NodeName
 from src.MCP import mcp_config
 from src.Agent.LLM.LLMBuilder.llm_builder import LLMBuilder
 from src.Agent.State.crm_state import AgentState
 
 class CRMGraph(BaseGraph):
-    
-    def __init__(self):
+
+    def __init__(self , checkpointer : BaseCheckpointSaver = None):
         super().__init__()
-        self.llm_builder = LLMBuilder(llm_name=self.settings.GENERATION_BACKEND , mcp_config=mcp_config)
-        llm_with_tools , tools = self.llm_builder.build_llm()
+        self.llm_builder = LLMBuilder(llm_name=self.settings.GENERATION_BACKEND , mcp_config=mcp_config ,
+                                      local_tools=[draft_campaign_emails])
+        # The checkpointer is injected so that every compiled graph sharing it
+        # (e.g. after a registry rebuild) also shares the conversation threads.
+        self.checkpointer = checkpointer if checkpointer else MemorySaver()
+        self.llm_with_tools = None
+        self.tools = None
+        self.nodes = None
+
+    async def _initialize_nodes(self):
+        """Build the LLM, discover the MCP tools and create the graph nodes"""
+        llm_with_tools , tools = await self.llm_builder.build_llm()
         self.llm_with_tools = llm_with_tools
         self.tools = tools
+        # The campaign email workers get a plain LLM: they write one email, without tools.
+        email_llm = await LLMBuilder(llm_name=self.settings.GENERATION_BACKEND).build_llm()
+        campaign_graph = CampaignGraph(llm=email_llm , tools=self.tools).get_graph()
         self.nodes = {NodeName.ASSISTANT_NODE.value : AssistantNode(llm=self.llm_with_tools) ,
                       NodeName.HUMAN_TOOL_REVIEW_NODE.value : HumanToolReviewNode() ,
-                      NodeName.TOOLS.value : ToolNode(tools=self.tools)}
-        
+                      NodeName.TOOLS.value : ParallelToolNode(tools=self.tools) ,
+                      NodeName.CAMPAIGN.value : CampaignNode(campaign_graph=campaign_graph)}
+
 
     def build_graph(self) -> StateGraph:
         graph = StateGraph(state_schema=AgentState)
@@ -31,27 +49,34 @@ class CRMGraph(BaseGraph):
             graph.add_node(node_name, node_instance)
 
         graph.add_edge(START, NodeName.ASSISTANT_NODE.value)
-        graph.add_conditional_edges(NodeName.ASSISTANT_NODE.value, 
-                                    self._assistant_router, 
-                                    [NodeName.TOOLS.value, NodeName.HUMAN_TOOL_REVIEW_NODE.value, END])
+        graph.add_conditional_edges(NodeName.ASSISTANT_NODE.value,
+                                    self._assistant_router,
+                                    [NodeName.TOOLS.value, NodeName.HUMAN_TOOL_REVIEW_NODE.value,
+                                     NodeName.CAMPAIGN.value, END])
         graph.add_edge(NodeName.TOOLS.value, NodeName.ASSISTANT_NODE.value)
+        graph.add_edge(NodeName.CAMPAIGN.value, NodeName.ASSISTANT_NODE.value)
 
-        return graph.compile(checkpointer=MemorySaver())
+        return graph.compile(checkpointer=self.checkpointer)
 
-    def get_graph(self) -> StateGraph:
+    async def get_graph(self) -> StateGraph:
         """Get the compiled graph"""
         if self.graph is None:
+            if self.nodes is None:
+                await self._initialize_nodes()
             self.graph = self.build_graph()
         return self.graph
-    
+
 
     def _assistant_router(self,state: AgentState) -> str:
         last_message = state.messages[-1]
         if not last_message.tool_calls:
             return END
+        # Campaign emails go through the campaign subgraph, which has its own batch review.
+        elif any(tool_call["name"] == CAMPAIGN_EMAILS_TOOL_NAME for tool_call in last_message.tool_calls):
+            return NodeName.CAMPAIGN.value
         else:
-            if not state.yolo_mode:
-                if any(tool_call["name"] in state.protected_tools for tool_call in last_message.tool_calls):
-                    return NodeName.HUMAN_TOOL_REVIEW_NODE.value
+            # Every protected call of the message goes to one review, answered with one resume.
+            if not state.yolo_mode and state.protected_tool_calls():
+                return NodeName.HUMAN_TOOL_REVIEW_NODE.value
             return NodeName.TOOLS.value
 
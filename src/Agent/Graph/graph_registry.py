@@ -0,0 +1,88 @@
+import asyncio
+from contextlib import AsyncExitStack
+from functools import lru_cache
+from typing import Optional
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.graph.state import CompiledStateGraph
+
+from src.Agent.Graph.crm_graph import CRMGraph
+from src.Agent.Graph.checkpointer_factory import create_checkpointer
+
+
+class GraphRegistry:
+    """
+    Process-wide holder of the compiled CRM graph.
+
+    - Builds and compiles the graph once (normally from the FastAPI lifespan).
+    - Hands the same compiled graph to every request.
+    - Rebuilds in the background and swaps the new graph in atomically; requests
+      that already hold the previous graph keep running on it.
+    - Owns the checkpointer, so conversation threads survive a rebuild. Unless one is
+      injected, it is opened from CHECKPOINTER_BACKEND and closed on shutdown.
+    """
+    def __init__(self, checkpointer: BaseCheckpointSaver = None):
+        self._checkpointer = checkpointer
+        self._owns_checkpointer = checkpointer is None
+        self._exit_stack = AsyncExitStack()
+        self._graph: Optional[CompiledStateGraph] = None
+        self._build_lock = asyncio.Lock()
+        self._rebuild_task: Optional[asyncio.Task] = None
+        self.generation = 0
+
+    async def start(self) -> None:
+        """Builds the graph eagerly so the first request doesn't pay for it."""
+        await self.get_graph()
+
+    async def get_graph(self) -> CompiledStateGraph:
+        """Returns the shared compiled graph, building it on first use."""
+        graph = self._graph
+        if graph is not None:
+            return graph
+
+        async with self._build_lock:
+            if self._graph is None:
+                self._graph = await self._build()
+                self.generation += 1
+            return self._graph
+
+    async def rebuild(self) -> CompiledStateGraph:
+        """Builds a fresh graph and swaps it in once it is fully compiled."""
+        async with self._build_lock:
+            graph = await self._build()
+            # A single reference assignment: readers see either the old or the new graph.
+            self._graph = graph
+            self.generation += 1
+            print(f"CRM graph rebuilt (generation {self.generation}).")
+            return graph
+
+    def rebuild_in_background(self) -> asyncio.Task:
+        """Schedules a rebuild without blocking the caller. Concurrent calls share one rebuild."""
+        if self._rebuild_task is None or self._rebuild_task.done():
+            self._rebuild_task = asyncio.create_task(self.rebuild())
+        return self._rebuild_task
+
+    async def shutdown(self) -> None:
+        """Cancels any pending rebuild, drops the compiled graph and closes the checkpointer."""
+        if self._rebuild_task and not self._rebuild_task.done():
+            self._rebuild_task.cancel()
+            try:
+                await self._rebuild_task
+            except asyncio.CancelledError:
+                pass
+        self._graph = None
+        await self._exit_stack.aclose()
+        if self._owns_checkpointer:
+            self._checkpointer = None
+
+    async def _build(self) -> CompiledStateGraph:
+        if self._checkpointer is None:
+            self._checkpointer = await self._exit_stack.enter_async_context(create_checkpointer())
+        crm_graph = CRMGraph(checkpointer=self._checkpointer)
+        return await crm_graph.get_graph()
+
+
+@lru_cache()
+def get_graph_registry() -> GraphRegistry:
+    """Returns the process-wide GraphRegistry instance."""
+    return GraphRegistry()
@@ -7,5 +7,5 @@ class BaseLLMBuilder(ABC):
         self._settings = get_settings()
 
     @abstractmethod
-    def build_llm(self):
+    async def build_llm(self):
         pass
@@ -4,17 +4,18 @@ from src.Agent.LLM.LLMBuilder.base_llm_builder import BaseLLMBuilder
 
 class LLMBuilder(BaseLLMBuilder):
     
-    def __init__(self , llm_name : str , mcp_config = None):
+    def __init__(self , llm_name : str , mcp_config = None , local_tools = None):
         super().__init__()
         self.llm_name = llm_name
         self.mcp_config = mcp_config if mcp_config else None
+        self.local_tools = local_tools if local_tools else []
 
-    def build_llm(self):
+    async def build_llm(self):
         llm_factory = LLMFactory()
         llm_provider = llm_factory.create_llm_provider(llm_name=self.llm_name)
         if self.mcp_config :
             print("Creating LLM With MCP Tools")
-            _ = llm_provider.initialize_llm_mcptools(mcp_config=self.mcp_config)
+            _ = await llm_provider.initialize_llm_mcptools(mcp_config=self.mcp_config, local_tools=self.local_tools)
             llm_with_tools = llm_provider.llm_with_tools
             tools = llm_provider.tools
 
@@ -15,8 +15,9 @@ class BaseProvider(ABC):
         pass
 
     @abstractmethod
-    async def initialize_llm_mcptools(self, mcp_config: dict):
-        """Initialize the provider with LLM and tools"""
+    async def initialize_llm_mcptools(self, mcp_config: dict, local_tools: list = None):
+        """Initialize the provider with LLM and tools (`local_tools` are bound to the LLM
+        but executed by the graph, not by an MCP server)"""
         pass
 
     @property
@@ -0,0 +1,133 @@
+import json
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+from uuid import uuid4
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, message_chunk_to_message
+from langchain_core.messages.tool import tool_call_chunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableBinding
+from pydantic import ConfigDict
+
+from src.Agent.LLM.LLMProviders.base_provider import BaseProvider
+from src.Agent.LLM.llm_metrics_callback import llm_metrics_callback
+from src.Agent.LLM.llm_response_cache import LLMResponseCache, get_llm_response_cache
+
+
+def _replayed(message: AIMessage, tier: str) -> AIMessage:
+    """A cached response as a new message: fresh tool call ids, so that its tool results
+    never collide with the ones of the conversation it was cached from."""
+    return AIMessage(
+        content=message.content,
+        tool_calls=[{**tool_call, "id": f"call_{uuid4().hex[:24]}"} for tool_call in message.tool_calls],
+        response_metadata={**message.response_metadata, "llm_cache": tier},
+    )
+
+
+class CachedChatModel(BaseChatModel):
+    """
+    A chat model answering from an LLMResponseCache before calling `model`.
+
+    A hit is streamed back like a live completion (the text, then one chunk per tool call),
+    so it reaches the graph's "messages" stream; a miss streams from `model` and is cached.
+    Only the async paths, the ones the graph runs, are cached.
+    """
+    model: BaseChatModel
+    cache: LLMResponseCache
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    @property
+    def _llm_type(self) -> str:
+        return f"cached-{self.model._llm_type}"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return self.model._identifying_params
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager=None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        lookup = await self.cache.lookup(self.model._get_llm_string(stop=stop, **kwargs), messages)
+        if lookup.message is not None:
+            message = _replayed(lookup.message, lookup.tier)
+            if message.content:
+                yield ChatGenerationChunk(message=AIMessageChunk(content=message.content))
+            for index, tool_call in enumerate(message.tool_calls):
+                yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[tool_call_chunk(
+                    name=tool_call["name"], args=json.dumps(tool_call["args"]), id=tool_call["id"], index=index,
+                )]))
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", response_metadata=message.response_metadata,
+                                                             chunk_position="last"))
+            return
+
+        response = None
+        async for chunk in self.model._astream(messages, stop=stop, run_manager=run_manager, **kwargs):
+            response = chunk if response is None else response + chunk
+            yield chunk
+        if response is not None:
+            await self.cache.store(lookup, message_chunk_to_message(response.message))
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager=None, **kwargs: Any) -> ChatResult:
+        lookup = await self.cache.lookup(self.model._get_llm_string(stop=stop, **kwargs), messages)
+        if lookup.message is not None:
+            return ChatResult(generations=[ChatGeneration(message=_replayed(lookup.message, lookup.tier))])
+
+        result = await self.model._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        await self.cache.store(lookup, result.generations[0].message)
+        return result
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        yield from self.model._stream(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs: Any) -> ChatResult:
+        return self.model._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+
+class CachedProvider(BaseProvider):
+    """
+    Wraps the provider built by LLMFactory so that its tool-bound LLM, the assistant's,
+    answers repeated prompts from the process-wide LLMResponseCache.
+
+    The plain LLM is passed through: it drafts one email per customer, which never repeats.
+    """
+
+    def __init__(self, provider: BaseProvider, cache: LLMResponseCache = None):
+        super().__init__()
+        self._provider = provider
+        self._cache = cache if cache else get_llm_response_cache()
+        self._llm_with_tools = None
+
+    def initialize_llm(self):
+        return self._provider.initialize_llm()
+
+    async def initialize_llm_mcptools(self, mcp_config: dict, local_tools: list = None):
+        _ = await self._provider.initialize_llm_mcptools(mcp_config=mcp_config, local_tools=local_tools)
+        llm_with_tools = self._provider.llm_with_tools
+        # bind_tools returns a binding: the cached model goes underneath, so the bound tools
+        # reach it as call arguments and are part of the cache key. It calls the wrapped model
+        # without its callbacks, so it reports the LLM metrics itself, hits included.
+        if isinstance(llm_with_tools, RunnableBinding):
+            self._llm_with_tools = CachedChatModel(model=llm_with_tools.bound, cache=self._cache,
+                                                   callbacks=[llm_metrics_callback]).bind(**llm_with_tools.kwargs)
+        else:
+            self._llm_with_tools = CachedChatModel(model=llm_with_tools, cache=self._cache,
+                                                   callbacks=[llm_metrics_callback])
+
+        return None
+
+    @property
+    def llm(self):
+        return self._provider.llm
+
+    @property
+    def llm_with_tools(self):
+        if self._llm_with_tools is None:
+            raise RuntimeError("LLM has not been initialized. Call 'initialize()' first.")
+        return self._llm_with_tools
+
+    @property
+    def tools(self):
+        return self._provider.tools
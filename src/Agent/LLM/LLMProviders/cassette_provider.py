@@ -0,0 +1,150 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage, message_chunk_to_message
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableBinding
+from pydantic import ConfigDict
+
+from src.Agent.LLM.LLMProviders.base_provider import BaseProvider
+from src.Agent.LLM.llm_cassette import Cassette, chunk_to_record, get_cassette, message_to_records, record_to_chunk
+from src.Agent.LLM.llm_metrics_callback import llm_metrics_callback
+from src.Agent.LLM.llm_response_cache import prompt_hash
+
+
+class CassetteChatModel(BaseChatModel):
+    """
+    In "RECORD" mode, calls `model` and records its responses, chunk by chunk, to the
+    cassette. In "REPLAY" mode, streams the recorded responses back without calling it,
+    at their recorded timing divided by `replay_speed` (0: without any delay). A prompt
+    the cassette does not hold fails the call.
+
+    Only the async paths, the ones the graph runs, are recorded.
+    """
+    model: BaseChatModel
+    cassette: Cassette
+    mode: str
+    replay_speed: float = 1.0
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    @property
+    def _llm_type(self) -> str:
+        return f"cassette-{self.model._llm_type}"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return self.model._identifying_params
+
+    def bind_tools(self, tools, **kwargs: Any):
+        # The wrapped model formats the tools; they reach it back as call arguments.
+        return self.bind(**self.model.bind_tools(tools, **kwargs).kwargs)
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager=None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        key = prompt_hash(self.model._get_llm_string(stop=stop, **kwargs), messages)
+        if self.mode == "REPLAY":
+            async for chunk in self._replay(key):
+                yield chunk
+            return
+
+        started = time.perf_counter()
+        records = []
+        async for chunk in self.model._astream(messages, stop=stop, run_manager=run_manager, **kwargs):
+            records.append(chunk_to_record(chunk.message, time.perf_counter() - started))
+            yield chunk
+        self.cassette.record(key, records)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager=None, **kwargs: Any) -> ChatResult:
+        key = prompt_hash(self.model._get_llm_string(stop=stop, **kwargs), messages)
+        if self.mode == "REPLAY":
+            response = None
+            async for chunk in self._replay(key):
+                response = chunk.message if response is None else response + chunk.message
+            return ChatResult(generations=[ChatGeneration(message=message_chunk_to_message(response))])
+
+        started = time.perf_counter()
+        result = await self.model._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        self.cassette.record(key, message_to_records(result.generations[0].message, time.perf_counter() - started))
+        return result
+
+    async def _replay(self, key: str) -> AsyncIterator[ChatGenerationChunk]:
+        records = self.cassette.replay(key)
+        if records is None:
+            raise RuntimeError(f"The cassette {self.cassette.path} has no response to this prompt ({key[:12]}): "
+                               f"the prompt or the model's settings changed since it was recorded.")
+        started = time.perf_counter()
+        for record in records:
+            if self.replay_speed > 0:
+                delay = record["t"] / self.replay_speed - (time.perf_counter() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            yield ChatGenerationChunk(message=record_to_chunk(record))
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        yield from self.model._stream(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs: Any) -> ChatResult:
+        return self.model._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+
+class CassetteProvider(BaseProvider):
+    """
+    The GENERATION_BACKEND="RECORD" / "REPLAY" provider: wraps the CASSETTE_BACKEND
+    provider so that both its LLMs record to, or replay from, the cassette at CASSETTE_PATH.
+
+    A replay needs no network for the LLM, so graph changes can be profiled on the same
+    responses, at the same (or a CASSETTE_REPLAY_SPEED times faster) pace, run after run.
+    """
+
+    def __init__(self, provider: BaseProvider, mode: str, cassette: Cassette = None):
+        super().__init__()
+        self._provider = provider
+        self._mode = mode
+        self._cassette = cassette if cassette else get_cassette(mode=mode)
+        self._llm = None
+        self._llm_with_tools = None
+
+    def initialize_llm(self):
+        _ = self._provider.initialize_llm()
+        self._llm = self._with_cassette(self._provider.llm)
+
+        return None
+
+    async def initialize_llm_mcptools(self, mcp_config: dict, local_tools: list = None):
+        _ = await self._provider.initialize_llm_mcptools(mcp_config=mcp_config, local_tools=local_tools)
+        self._llm_with_tools = self._with_cassette(self._provider.llm_with_tools)
+
+        return None
+
+    def _with_cassette(self, llm):
+        # As in CachedProvider: the bound tools reach the cassette model as call arguments,
+        # so they are part of the prompt hash.
+        if isinstance(llm, RunnableBinding):
+            return CassetteChatModel(model=llm.bound, cassette=self._cassette, mode=self._mode,
+                                     replay_speed=self._settings.CASSETTE_REPLAY_SPEED,
+                                     callbacks=[llm_metrics_callback]).bind(**llm.kwargs)
+        return CassetteChatModel(model=llm, cassette=self._cassette, mode=self._mode,
+                                 replay_speed=self._settings.CASSETTE_REPLAY_SPEED,
+                                 callbacks=[llm_metrics_callback])
+
+    @property
+    def llm(self):
+        if self._llm is None:
+            raise RuntimeError("LLM has not been initialized. Call 'initialize()' first.")
+        return self._llm
+
+    @property
+    def llm_with_tools(self):
+        if self._llm_with_tools is None:
+            raise RuntimeError("LLM has not been initialized. Call 'initialize()' first.")
+        return self._llm_with_tools
+
+    @property
+    def tools(self):
+        return self._provider.tools
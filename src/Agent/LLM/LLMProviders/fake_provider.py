@@ -0,0 +1,147 @@
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessageChunk, BaseMessage, HumanMessage, ToolMessage, message_chunk_to_message
+from langchain_core.messages.tool import tool_call_chunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from src.Agent.LLM.LLMProviders.base_provider import BaseProvider
+from src.Agent.LLM.llm_metrics_callback import llm_metrics_callback
+from src.MCP.mcp_session_pool import get_mcp_session_pool
+
+ANSWER_WORDS = ["The", " champions", " bought", " the", " most", " this", " quarter", ",", " mostly", " cake",
+                " stands", " and", " gift", " bags", "."]
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    A deterministic chat model for offline load tests: to every new question, it makes the
+    scripted `tool_calls` (those of its bound tools) in one message, then, once they are
+    answered, streams `answer_tokens` tokens at `tokens_per_second`.
+    """
+    tool_calls: List[Dict[str, Any]] = []
+    answer_tokens: int = 200
+    tokens_per_second: float = 100.0
+    time_to_first_token: float = 0.3
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": "scripted"}
+
+    def bind_tools(self, tools, **kwargs: Any):
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager=None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.time_to_first_token)
+        for index, chunk in enumerate(self._chunks(messages, kwargs.get("tools") or [])):
+            if index and chunk.message.content:
+                await asyncio.sleep(1 / self.tokens_per_second)
+            yield chunk
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.time_to_first_token)
+        for index, chunk in enumerate(self._chunks(messages, kwargs.get("tools") or [])):
+            if index and chunk.message.content:
+                time.sleep(1 / self.tokens_per_second)
+            yield chunk
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager=None, **kwargs: Any) -> ChatResult:
+        response = None
+        async for chunk in self._astream(messages, stop=stop, **kwargs):
+            response = chunk.message if response is None else response + chunk.message
+        return ChatResult(generations=[ChatGeneration(message=message_chunk_to_message(response))])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs: Any) -> ChatResult:
+        response = None
+        for chunk in self._stream(messages, stop=stop, **kwargs):
+            response = chunk.message if response is None else response + chunk.message
+        return ChatResult(generations=[ChatGeneration(message=message_chunk_to_message(response))])
+
+    def _chunks(self, messages: List[BaseMessage], tools: List[Dict[str, Any]]) -> List[ChatGenerationChunk]:
+        bound = {tool["function"]["name"] for tool in tools}
+        tool_calls = [tool_call for tool_call in self.tool_calls if tool_call["name"] in bound]
+        answered = False
+        for message in reversed(messages):
+            if isinstance(message, HumanMessage):
+                break
+            answered = answered or isinstance(message, ToolMessage)
+        prompt_tokens = sum(len(str(message.content)) for message in messages) // 4
+
+        if tool_calls and not answered:
+            chunks = [ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[tool_call_chunk(
+                name=tool_call["name"], args=json.dumps(tool_call["args"]),
+                id=f"call_{len(messages)}_{index}", index=index)])) for index, tool_call in enumerate(tool_calls)]
+            finish_reason, completion_tokens = "tool_calls", 10 * len(tool_calls)
+        else:
+            chunks = [ChatGenerationChunk(message=AIMessageChunk(content=ANSWER_WORDS[index % len(ANSWER_WORDS)]))
+                      for index in range(self.answer_tokens)]
+            finish_reason, completion_tokens = "stop", self.answer_tokens
+        chunks.append(ChatGenerationChunk(message=AIMessageChunk(
+            content="", response_metadata={"finish_reason": finish_reason, "model_name": "scripted"},
+            usage_metadata={"input_tokens": prompt_tokens, "output_tokens": completion_tokens,
+                            "total_tokens": prompt_tokens + completion_tokens},
+            chunk_position="last")))
+        return chunks
+
+
+class FakeProvider(BaseProvider):
+    """
+    The GENERATION_BACKEND="FAKE" provider: a ScriptedChatModel (FAKE_LLM_* settings)
+    with the real MCP tools, so that load tests run the whole graph without OpenAI.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._llm_with_tools = None
+        self._llm = None
+        self._tools = None
+
+    def initialize_llm(self):
+        self._llm = self._chat_model()
+
+        return None
+
+    async def initialize_llm_mcptools(self, mcp_config: dict, local_tools: list = None):
+        mcp_session_pool = get_mcp_session_pool(mcp_config=mcp_config)
+        tools = await mcp_session_pool.get_tools()
+        self._tools = tools
+        self._llm_with_tools = self._chat_model().bind_tools(tools=self._tools + (local_tools or []))
+
+        return None
+
+    def _chat_model(self) -> ScriptedChatModel:
+        return ScriptedChatModel(tool_calls=self._settings.FAKE_LLM_TOOL_CALLS,
+                                 answer_tokens=self._settings.FAKE_LLM_ANSWER_TOKENS,
+                                 tokens_per_second=self._settings.FAKE_LLM_TOKENS_PER_SECOND,
+                                 time_to_first_token=self._settings.FAKE_LLM_TIME_TO_FIRST_TOKEN_SECONDS,
+                                 callbacks=[llm_metrics_callback])
+
+    @property
+    def llm(self):
+        if self._llm is None:
+            raise RuntimeError("LLM has not been initialized. Call 'initialize()' first.")
+        return self._llm
+
+    @property
+    def llm_with_tools(self):
+        if self._llm_with_tools is None:
+            raise RuntimeError("LLM has not been initialized. Call 'initialize()' first.")
+        return self._llm_with_tools
+
+    @property
+    def tools(self):
+        if self._tools is None:
+            raise RuntimeError("Tools has not been initialized. Call 'initialize()' first.")
+        return self._tools
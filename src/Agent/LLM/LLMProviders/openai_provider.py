@@ -1,7 +1,8 @@
 from src.Agent.LLM.LLMProviders.base_provider import BaseProvider
 from langchain_openai import ChatOpenAI
-from MCP import mcp_config
-from langchain_mcp_adapters.client import MultiServerMCPClient
+from src.Agent.LLM.llm_gateway import get_llm_gateway
+from src.Agent.LLM.llm_metrics_callback import llm_metrics_callback
+from src.MCP.mcp_session_pool import get_mcp_session_pool
 from src.Helpers.config import Settings
 
 class OpenaiProvider(BaseProvider):
@@ -13,21 +14,30 @@ class OpenaiProvider(BaseProvider):
         self._tools = None
 
     def initialize_llm(self):
-        self._llm = ChatOpenAI(api_key=self._settings.OPENAI_API_KEY,
-                               model=self._settings.GENERATION_MODEL_ID,
-                               temperature=self._settings.GENERATION_DAFAULT_TEMPERATURE)
+        self._llm = self._chat_model()
         
         return None
 
-    async def initialize_llm_mcptools(self, mcp_config: dict):
-        client =  MultiServerMCPClient(connections=mcp_config["mcpServers"])
-        tools = await client.get_tools()
+    async def initialize_llm_mcptools(self, mcp_config: dict, local_tools: list = None):
+        # Tools borrow warm sessions from the process-wide pool instead of spawning servers per build
+        mcp_session_pool = get_mcp_session_pool(mcp_config=mcp_config)
+        tools = await mcp_session_pool.get_tools()
         self._tools = tools
-        self._llm_with_tools = ChatOpenAI(api_key=self._settings.OPENAI_API_KEY,
-                                          temperature=self._settings.GENERATION_DAFAULT_TEMPERATURE,
-                                          model=self._settings.GENERATION_MODEL_ID).bind_tools(tools=self._tools)
+        self._llm_with_tools = self._chat_model().bind_tools(tools=self._tools + (local_tools or []))
 
         return None
+
+    def _chat_model(self) -> ChatOpenAI:
+        # Every chat model shares the gateway's connection pool, rate limits and retries.
+        gateway_kwargs = {}
+        if self._settings.LLM_GATEWAY_ENABLED:
+            gateway_kwargs = {"http_async_client": get_llm_gateway().http_client, "max_retries": 0}
+        return ChatOpenAI(api_key=self._settings.OPENAI_API_KEY,
+                          base_url=self._settings.OPENAI_API_URL,
+                          model=self._settings.GENERATION_MODEL_ID,
+                          temperature=self._settings.GENERATION_DAFAULT_TEMPERATURE,
+                          callbacks=[llm_metrics_callback],
+                          **gateway_kwargs)
     
     @property
     def llm(self):
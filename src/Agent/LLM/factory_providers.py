@@ -1,5 +1,8 @@
 from src.Agent.LLM.base_factory_provider import BaseLLMFactory
 from src.Agent.LLM.LLMProviders.openai_provider import OpenaiProvider
+from src.Agent.LLM.LLMProviders.cached_provider import CachedProvider
+from src.Agent.LLM.LLMProviders.fake_provider import FakeProvider
+from src.Agent.LLM.LLMProviders.cassette_provider import CassetteProvider
 
 class LLMFactory(BaseLLMFactory):
 
@@ -7,7 +10,24 @@ class LLMFactory(BaseLLMFactory):
         super().__init__()
 
     def create_llm_provider(self,llm_name : str):    
+        if(llm_name in ("RECORD", "REPLAY")):
+            # Records, or replays, the responses of the CASSETTE_BACKEND provider
+            backend_provider = self._create_backend_provider(self.settings.CASSETTE_BACKEND)
+            if backend_provider is None:
+                return None
+            llm_provider = CassetteProvider(backend_provider, mode=llm_name)
+        else:
+            llm_provider = self._create_backend_provider(llm_name)
+            if llm_provider is None:
+                return None
+
+        if self.settings.LLM_CACHE_ENABLED:
+            return CachedProvider(llm_provider)
+        return llm_provider
+
+    def _create_backend_provider(self, llm_name: str):
         if(llm_name == "OPENAI"):
             return OpenaiProvider()
-        
-        return None
\ No newline at end of file
+        elif(llm_name == "FAKE"):
+            return FakeProvider()
+        return None
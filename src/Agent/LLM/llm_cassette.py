@@ -0,0 +1,126 @@
+import gzip
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.messages.tool import tool_call_chunk
+
+from src.Helpers.config import get_settings
+
+_cassette_instance = None
+
+
+def chunk_to_record(chunk: AIMessageChunk, offset_seconds: float) -> Dict[str, Any]:
+    """A streamed chunk as a compact record: its offset from the request, and its non-empty fields."""
+    record = {"t": round(offset_seconds, 4)}
+    if chunk.content:
+        record["content"] = chunk.content
+    if chunk.tool_call_chunks:
+        record["tool_call_chunks"] = [
+            {key: value for key, value in part.items() if key != "type" and value is not None}
+            for part in chunk.tool_call_chunks
+        ]
+    if chunk.response_metadata:
+        record["response_metadata"] = chunk.response_metadata
+    if chunk.usage_metadata:
+        record["usage_metadata"] = dict(chunk.usage_metadata)
+    if chunk.chunk_position:
+        record["chunk_position"] = chunk.chunk_position
+    return record
+
+
+def message_to_records(message: AIMessage, offset_seconds: float) -> List[Dict[str, Any]]:
+    """A complete (not streamed) response as the records of a single chunk."""
+    return [chunk_to_record(AIMessageChunk(
+        content=message.content,
+        tool_call_chunks=[tool_call_chunk(name=tool_call["name"], args=json.dumps(tool_call["args"]), id=tool_call["id"],
+                                          index=index) for index, tool_call in enumerate(message.tool_calls)],
+        response_metadata=message.response_metadata,
+        usage_metadata=message.usage_metadata,
+    ), offset_seconds)]
+
+
+def record_to_chunk(record: Dict[str, Any]) -> AIMessageChunk:
+    return AIMessageChunk(
+        content=record.get("content", ""),
+        tool_call_chunks=[tool_call_chunk(name=part.get("name"), args=part.get("args"), id=part.get("id"),
+                                          index=part.get("index")) for part in record.get("tool_call_chunks", [])],
+        response_metadata=record.get("response_metadata", {}),
+        usage_metadata=record.get("usage_metadata"),
+        chunk_position=record.get("chunk_position"),
+    )
+
+
+class Cassette:
+    """
+    The LLM responses of a RECORD run, replayed by a REPLAY run (see CassetteProvider).
+
+    Each response is stored under its prompt hash (`prompt_hash`: the model, its bound
+    tools and the messages without their ids) as the list of its streamed chunks, with
+    their offsets from the request. A prompt recorded several times is replayed in the
+    same order, its last recording once they are used up.
+
+    The file holds one gzip member per response, a JSON line, appended as they come.
+    """
+
+    def __init__(self, path: str, mode: str):
+        self.path = path
+        self.mode = mode
+        self._recordings: Dict[str, List[List[Dict[str, Any]]]] = {}
+        self._replays: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+
+        if mode == "RECORD":
+            # A recording starts from an empty cassette.
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            open(path, "wb").close()
+        elif os.path.exists(path):
+            with gzip.open(path, "rt", encoding="utf-8") as file:
+                for line in file:
+                    entry = json.loads(line)
+                    self._recordings.setdefault(entry["key"], []).append(entry["chunks"])
+        else:
+            raise FileNotFoundError(f"Cassette {path} not found: record it first with GENERATION_BACKEND=RECORD.")
+
+    def record(self, key: str, records: List[Dict[str, Any]]) -> None:
+        line = json.dumps({"key": key, "chunks": records}, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._recordings.setdefault(key, []).append(records)
+            with gzip.open(self.path, "at", encoding="utf-8") as file:
+                file.write(line + "\n")
+            self.recorded += 1
+
+    def replay(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            recordings = self._recordings.get(key)
+            if not recordings:
+                self.misses += 1
+                return None
+            index = self._replays.get(key, 0)
+            self._replays[key] = index + 1
+            self.replayed += 1
+            return recordings[min(index, len(recordings) - 1)]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "mode": self.mode,
+            "prompts": len(self._recordings),
+            "responses": sum(len(recordings) for recordings in self._recordings.values()),
+            "recorded": self.recorded,
+            "replayed": self.replayed,
+            "misses": self.misses,
+        }
+
+
+def get_cassette(mode: str) -> Cassette:
+    """Returns the process-wide Cassette at CASSETTE_PATH, shared by every provider."""
+    global _cassette_instance
+    if _cassette_instance is None:
+        _cassette_instance = Cassette(path=get_settings().CASSETTE_PATH, mode=mode)
+    return _cassette_instance
@@ -0,0 +1,303 @@
+import asyncio
+import json
+import random
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+import httpx
+
+from src.Helpers.config import get_settings
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+OVERLOAD_STATUS_CODES = {429, 503}
+
+
+class TokenBucket:
+    """
+    `per_minute` units refilled continuously, up to a minute's worth. A request waits,
+    in arrival order, until its units are available.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate_per_second = per_minute / 60
+        self._available = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @property
+    def available(self) -> float:
+        self._refill()
+        return self._available
+
+    async def acquire(self, amount: float) -> None:
+        # A request larger than the bucket waits for a full bucket instead of forever.
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            self._refill()
+            while self._available < amount:
+                await asyncio.sleep((amount - self._available) / self.rate_per_second)
+                self._refill()
+            self._available -= amount
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._available = min(self.capacity, self._available + (now - self._updated_at) * self.rate_per_second)
+        self._updated_at = now
+
+
+class AdaptiveConcurrencyLimit:
+    """
+    How many completions may be in flight, adapted AIMD-style: +1 for every `limit`
+    responses faster than `latency_target_seconds`, halved on an overload (a 429, a 503
+    or a slow response), at most once per `latency_target_seconds` so that the
+    responses of one burst only count once.
+    """
+
+    def __init__(self, initial: int, minimum: int, maximum: int, latency_target_seconds: float):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target_seconds = latency_target_seconds
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.in_flight = 0
+        self.waiting = 0
+        self.decreases = 0
+        self._last_decrease_at = 0.0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._condition:
+            self.waiting += 1
+            try:
+                await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+
+    async def release(self) -> None:
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def on_response(self, latency_seconds: float) -> None:
+        if latency_seconds > self.latency_target_seconds:
+            self.on_overload()
+        else:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+    def on_overload(self) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease_at < self.latency_target_seconds:
+            return
+        self._last_decrease_at = now
+        self.limit = max(self.minimum, self.limit / 2)
+        self.decreases += 1
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """A response body that gives the request's concurrency slot back once it is closed,
+    so a streamed completion holds its slot until its last chunk."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, on_close: Callable):
+        self._stream = stream
+        self._on_close = on_close
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            await self._on_close()
+
+
+class LLMGateway(httpx.AsyncBaseTransport):
+    """
+    The process-wide path of every OpenAI request: the `http_async_client` of the chat
+    models built by LLMFactory (see OpenaiProvider).
+
+    - One keep-alive connection pool, so a new graph reuses warm TLS connections.
+    - Token buckets on requests and tokens per minute. A request is charged its prompt
+      (JSON bytes / 4) plus its max completion tokens, as OpenAI does.
+    - An AdaptiveConcurrencyLimit on the completions in flight.
+    - Retries of 408/409/429/5xx and connection errors with full-jitter exponential
+      backoff, or the server's Retry-After. The OpenAI client's own retries are off.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, concurrency: AdaptiveConcurrencyLimit,
+                 max_retries: int, backoff_base_seconds: float, backoff_max_seconds: float,
+                 default_completion_tokens: int, limits: httpx.Limits, timeout: httpx.Timeout,
+                 transport: httpx.AsyncBaseTransport = None):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.default_completion_tokens = default_completion_tokens
+        self._transport = transport if transport else httpx.AsyncHTTPTransport(limits=limits)
+        self._timeout = timeout
+        self._http_client: Optional[httpx.AsyncClient] = None
+
+        self.queued = 0
+        self.max_queued = 0
+        self.sent = 0
+        self.retries = 0
+        self.throttled = 0
+        self.errors = 0
+        self._queue_wait_total = 0.0
+        self._queue_wait_max = 0.0
+        self._admitted = 0
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(transport=self, timeout=self._timeout)
+        return self._http_client
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        await self._admit(request)
+
+        try:
+            return await self._send(request)
+        except BaseException:
+            # Errors and cancellations (e.g. a client gone during a backoff) free the slot here,
+            # a response frees it once its body is closed.
+            await self.concurrency.release()
+            raise
+
+    async def _send(self, request: httpx.Request) -> httpx.Response:
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            try:
+                response = await self._transport.handle_async_request(request)
+            except httpx.TransportError:
+                if attempt >= self.max_retries:
+                    self.errors += 1
+                    raise
+                response = None
+
+            if response is not None and (response.status_code not in RETRYABLE_STATUS_CODES
+                                         or attempt >= self.max_retries):
+                if response.status_code in OVERLOAD_STATUS_CODES:
+                    self.throttled += 1
+                    self.concurrency.on_overload()
+                elif response.status_code < 400:
+                    self.concurrency.on_response(time.monotonic() - started)
+                else:
+                    self.errors += 1
+                return httpx.Response(status_code=response.status_code, headers=response.headers,
+                                      stream=_ReleasingStream(response.stream, self.concurrency.release),
+                                      extensions=response.extensions, request=request)
+
+            delay = self._backoff(attempt, response)
+            if response is not None:
+                await response.aclose()
+                if response.status_code in OVERLOAD_STATUS_CODES:
+                    self.throttled += 1
+                    self.concurrency.on_overload()
+            self.retries += 1
+            attempt += 1
+            await asyncio.sleep(delay)
+            # A retry is another request for the provider's rate limits; the slot is kept.
+            if self.requests:
+                await self.requests.acquire(1)
+            self.sent += 1
+
+    async def _admit(self, request: httpx.Request) -> None:
+        queued_at = time.monotonic()
+        self.queued += 1
+        self.max_queued = max(self.max_queued, self.queued)
+        try:
+            if self.requests:
+                await self.requests.acquire(1)
+            if self.tokens:
+                await self.tokens.acquire(self._estimated_tokens(request))
+            await self.concurrency.acquire()
+        finally:
+            self.queued -= 1
+        waited = time.monotonic() - queued_at
+        self._admitted += 1
+        self._queue_wait_total += waited
+        self._queue_wait_max = max(self._queue_wait_max, waited)
+        self.sent += 1
+
+    def _estimated_tokens(self, request: httpx.Request) -> int:
+        completion_tokens = self.default_completion_tokens
+        try:
+            body = json.loads(request.content or b"{}")
+            completion_tokens = body.get("max_completion_tokens") or body.get("max_tokens") or completion_tokens
+        except ValueError:
+            pass
+        return len(request.content) // 4 + completion_tokens
+
+    def _backoff(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        retry_after = self._retry_after(response) if response is not None else None
+        if retry_after is not None and retry_after <= self.backoff_max_seconds:
+            return retry_after + random.uniform(0, self.backoff_base_seconds)
+        return random.uniform(0, min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** attempt))
+
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> Optional[float]:
+        try:
+            if "retry-after-ms" in response.headers:
+                return float(response.headers["retry-after-ms"]) / 1000
+            if "retry-after" in response.headers:
+                return float(response.headers["retry-after"])
+        except ValueError:
+            pass
+        return None
+
+    async def aclose(self) -> None:
+        if self._http_client is not None:
+            self._http_client = None
+        await self._transport.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "concurrency_limit": round(self.concurrency.limit, 2),
+            "in_flight": self.concurrency.in_flight,
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "waiting_for_slot": self.concurrency.waiting,
+            "avg_queue_wait_seconds": round(self._queue_wait_total / self._admitted, 4) if self._admitted else 0.0,
+            "max_queue_wait_seconds": round(self._queue_wait_max, 4),
+            "requests_available": round(self.requests.available, 1) if self.requests else None,
+            "tokens_available": round(self.tokens.available) if self.tokens else None,
+            "sent": self.sent,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "errors": self.errors,
+            "limit_decreases": self.concurrency.decreases,
+        }
+
+
+_gateway_instance: Optional[LLMGateway] = None
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Returns the process-wide LLMGateway, shared by every provider and graph rebuild."""
+    global _gateway_instance
+    if _gateway_instance is None:
+        settings = get_settings()
+        _gateway_instance = LLMGateway(
+            requests_per_minute=settings.LLM_GATEWAY_REQUESTS_PER_MINUTE,
+            tokens_per_minute=settings.LLM_GATEWAY_TOKENS_PER_MINUTE,
+            concurrency=AdaptiveConcurrencyLimit(initial=settings.LLM_GATEWAY_INITIAL_CONCURRENCY,
+                                                 minimum=settings.LLM_GATEWAY_MIN_CONCURRENCY,
+                                                 maximum=settings.LLM_GATEWAY_MAX_CONCURRENCY,
+                                                 latency_target_seconds=settings.LLM_GATEWAY_LATENCY_TARGET_SECONDS),
+            max_retries=settings.LLM_GATEWAY_MAX_RETRIES,
+            backoff_base_seconds=settings.LLM_GATEWAY_BACKOFF_BASE_SECONDS,
+            backoff_max_seconds=settings.LLM_GATEWAY_BACKOFF_MAX_SECONDS,
+            default_completion_tokens=settings.LLM_GATEWAY_DEFAULT_COMPLETION_TOKENS,
+            limits=httpx.Limits(max_connections=settings.LLM_GATEWAY_MAX_CONNECTIONS,
+                                max_keepalive_connections=settings.LLM_GATEWAY_MAX_CONNECTIONS,
+                                keepalive_expiry=settings.LLM_GATEWAY_KEEPALIVE_SECONDS),
+            timeout=httpx.Timeout(settings.LLM_GATEWAY_TIMEOUT_SECONDS, connect=5.0),
+        )
+    return _gateway_instance
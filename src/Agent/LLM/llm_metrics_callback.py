@@ -0,0 +1,59 @@
+import time
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from src.Helpers.metrics import LLM_DURATION, LLM_ERRORS, LLM_IN_FLIGHT, LLM_TIME_TO_FIRST_TOKEN, LLM_TOKENS
+
+
+class LLMMetricsCallback(AsyncCallbackHandler):
+    """
+    Records the latency, time to first token and token usage of every call of the chat
+    models it is set on (see OpenaiProvider and CachedProvider). Calls answered from the
+    LLM cache are labelled with their cache tier.
+    """
+
+    def __init__(self):
+        self._runs: Dict[UUID, Dict[str, Any]] = {}
+
+    async def on_chat_model_start(self, serialized: Dict[str, Any], messages, *, run_id: UUID,
+                                  invocation_params: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        invocation_params = invocation_params or {}
+        model = invocation_params.get("model") or invocation_params.get("model_name") \
+            or invocation_params.get("_type", "unknown")
+        self._runs[run_id] = {"model": model, "started": time.perf_counter(), "first_token": None}
+        LLM_IN_FLIGHT.inc(model=model)
+
+    async def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        run = self._runs.get(run_id)
+        if run is not None and run["first_token"] is None:
+            run["first_token"] = time.perf_counter() - run["started"]
+
+    async def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        model = run["model"]
+        LLM_IN_FLIGHT.dec(model=model)
+        message = getattr(response.generations[0][0], "message", None) if response.generations else None
+        cache = (message.response_metadata.get("llm_cache") if message is not None else None) or "miss"
+        LLM_DURATION.observe(time.perf_counter() - run["started"], model=model, cache=cache)
+        if run["first_token"] is not None:
+            LLM_TIME_TO_FIRST_TOKEN.observe(run["first_token"], model=model, cache=cache)
+        # A cached answer costs no tokens.
+        usage = getattr(message, "usage_metadata", None) if cache == "miss" else None
+        if usage:
+            LLM_TOKENS.inc(usage.get("input_tokens", 0), model=model, kind="prompt")
+            LLM_TOKENS.inc(usage.get("output_tokens", 0), model=model, kind="completion")
+
+    async def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        LLM_IN_FLIGHT.dec(model=run["model"])
+        LLM_ERRORS.inc(model=run["model"])
+
+
+llm_metrics_callback = LLMMetricsCallback()
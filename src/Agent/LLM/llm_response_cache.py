@@ -0,0 +1,214 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+
+from src.Helpers.config import get_settings
+
+_cache_instance = None
+
+
+def message_fingerprint(message: BaseMessage) -> Dict[str, Any]:
+    """What of a message a completion depends on: its ids and metadata are left out, so the
+    same conversation replayed in another thread hashes the same."""
+    fingerprint = {"type": message.type, "content": message.content}
+    if isinstance(message, AIMessage) and message.tool_calls:
+        fingerprint["tool_calls"] = [{"name": tool_call["name"], "args": tool_call["args"]}
+                                     for tool_call in message.tool_calls]
+    if isinstance(message, ToolMessage):
+        fingerprint["name"] = message.name
+        fingerprint["status"] = message.status
+    return fingerprint
+
+
+def prompt_hash(llm_string: str, messages: Sequence[BaseMessage]) -> str:
+    """Hashes the model, its bound tools and parameters (`llm_string`) and the prompt messages."""
+    payload = json.dumps([llm_string, [message_fingerprint(message) for message in messages]],
+                         sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+@dataclass
+class CacheLookup:
+    """The outcome of `LLMResponseCache.lookup`, handed back to `store` on a miss."""
+    key: str
+    message: Optional[AIMessage] = None
+    tier: Optional[str] = None  # "exact" or "semantic" on a hit
+    # Semantic tier: the hash of the prompt before the last human message, and that message.
+    scope: Optional[str] = None
+    question: Optional[str] = None
+    embedding: Optional[np.ndarray] = None
+
+
+@dataclass
+class _CacheEntry:
+    message: AIMessage
+    expires_at: float
+    scope: Optional[str] = None
+    embedding: Optional[np.ndarray] = None
+
+
+class LLMResponseCache:
+    """
+    An LRU + TTL cache of LLM responses, in two tiers.
+
+    The exact tier is keyed on a hash of the whole prompt: system prompt, messages and the
+    bound tools. The optional semantic tier matches a new human question against the cached
+    ones asked after the same conversation prefix, by cosine similarity of their embeddings.
+    Responses calling one of `bypass_tools` (the tools that write) are never cached.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, bypass_tools: Iterable[str] = (),
+                 embeddings: Embeddings = None, similarity_threshold: float = 0.95):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.bypass_tools = set(bypass_tools)
+        self.embeddings = embeddings
+        self.similarity_threshold = similarity_threshold
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._keys_by_scope: Dict[str, Set[str]] = {}
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    async def lookup(self, llm_string: str, messages: List[BaseMessage]) -> CacheLookup:
+        lookup = CacheLookup(key=prompt_hash(llm_string, messages))
+        entry = self._get(lookup.key)
+        if entry is not None:
+            self.exact_hits += 1
+            lookup.message, lookup.tier = entry.message, "exact"
+            return lookup
+
+        # Only a fresh question is matched semantically: mid tool loop, the prompt ends with tool results.
+        last_message = messages[-1] if messages else None
+        if self.embeddings is not None and isinstance(last_message, HumanMessage) \
+                and isinstance(last_message.content, str):
+            lookup.scope = prompt_hash(llm_string, messages[:-1])
+            lookup.question = last_message.content
+            candidates = [key for key in list(self._keys_by_scope.get(lookup.scope, ())) if self._get(key)]
+            if candidates:
+                lookup.embedding = await self._embed(lookup.question)
+            if lookup.embedding is not None:
+                best_key, best_similarity = None, self.similarity_threshold
+                for key in candidates:
+                    similarity = float(np.dot(self._entries[key].embedding, lookup.embedding))
+                    if similarity >= best_similarity:
+                        best_key, best_similarity = key, similarity
+                if best_key is not None:
+                    self._entries.move_to_end(best_key)
+                    self.semantic_hits += 1
+                    lookup.message, lookup.tier = self._entries[best_key].message, "semantic"
+                    return lookup
+
+        self.misses += 1
+        return lookup
+
+    async def store(self, lookup: CacheLookup, message: AIMessage) -> None:
+        """Caches the response to a missed lookup, unless it calls a write tool."""
+        if self.max_entries <= 0 or not (message.content or message.tool_calls):
+            return
+        if any(tool_call["name"] in self.bypass_tools for tool_call in message.tool_calls):
+            self.bypassed += 1
+            return
+
+        if lookup.scope is not None and lookup.embedding is None:
+            lookup.embedding = await self._embed(lookup.question)
+        if lookup.key in self._entries:
+            self._remove(lookup.key)
+
+        response_metadata = {key: message.response_metadata[key]
+                             for key in ("finish_reason", "model_name") if key in message.response_metadata}
+        entry = _CacheEntry(
+            message=AIMessage(content=message.content, tool_calls=message.tool_calls,
+                              response_metadata=response_metadata),
+            expires_at=time.monotonic() + self.ttl_seconds,
+            scope=lookup.scope if lookup.embedding is not None else None,
+            embedding=lookup.embedding,
+        )
+        self._entries[lookup.key] = entry
+        if entry.scope is not None:
+            self._keys_by_scope.setdefault(entry.scope, set()).add(lookup.key)
+
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._keys_by_scope.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.exact_hits + self.semantic_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "semantic_enabled": self.embeddings is not None,
+            "similarity_threshold": self.similarity_threshold,
+            "lookups": lookups,
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.exact_hits + self.semantic_hits) / lookups, 4) if lookups else 0.0,
+            "exact_hit_rate": round(self.exact_hits / lookups, 4) if lookups else 0.0,
+            "semantic_hit_rate": round(self.semantic_hits / lookups, 4) if lookups else 0.0,
+            "bypassed": self.bypassed,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _get(self, key: str) -> Optional[_CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def _embed(self, text: str) -> Optional[np.ndarray]:
+        # The semantic tier is best effort: an embedding failure only costs the lookup.
+        try:
+            vector = np.asarray(await self.embeddings.aembed_query(text), dtype=np.float32)
+        except Exception as e:
+            print(f"LLM cache: could not embed the question, semantic tier skipped: {e}")
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        if entry.scope is not None:
+            keys = self._keys_by_scope.get(entry.scope)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_scope[entry.scope]
+
+
+def get_llm_response_cache() -> LLMResponseCache:
+    """Returns the process-wide LLMResponseCache, shared by every provider and graph rebuild."""
+    global _cache_instance
+    if _cache_instance is None:
+        settings = get_settings()
+        embeddings = None
+        if settings.LLM_CACHE_SEMANTIC_ENABLED:
+            from langchain_openai import OpenAIEmbeddings
+            embeddings = OpenAIEmbeddings(api_key=settings.OPENAI_API_KEY, model=settings.LLM_CACHE_EMBEDDING_MODEL)
+        _cache_instance = LLMResponseCache(max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+                                           ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+                                           bypass_tools=settings.LLM_CACHE_BYPASS_TOOLS,
+                                           embeddings=embeddings,
+                                           similarity_threshold=settings.LLM_CACHE_SEMANTIC_THRESHOLD)
+    return _cache_instance
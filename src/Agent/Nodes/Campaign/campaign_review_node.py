@@ -0,0 +1,61 @@
+import json
+
+from langgraph.graph import END
+from langgraph.types import Command, interrupt
+
+from src.Agent.Graph.Enumerations.nodes_name_enums import CampaignNodeName
+from src.Agent.Nodes.base_node import BaseNode
+from src.Agent.State.campaign_state import CampaignState
+
+
+class CampaignReviewNode(BaseNode):
+    """
+    Submits every valid draft of the campaign to a single human review.
+
+    The resume value follows HumanToolReviewNode:
+    - {"action": "continue"} sends every draft as is.
+    - {"action": "update", "data": '[{"customer_id": 1, "subject": "...", "body": "..."},
+      {"customer_id": 2, "exclude": true}]'} edits or drops individual drafts, then sends the rest.
+    - {"action": "feedback", "data": "..."} sends nothing and hands the feedback to the assistant.
+    """
+
+    async def execute(self, state: CampaignState):
+        drafts = [draft for draft in state.final_drafts() if draft.is_valid]
+        if not drafts:
+            return Command(goto=END)
+        if state.yolo_mode:
+            return Command(goto=CampaignNodeName.SEND_EMAILS.value, update={"review": "continue", "approved": drafts})
+
+        human_review: dict = interrupt({
+            "message": f"Your approval is required to send {len(drafts)} emails of campaign {state.campaign_id}:",
+            "campaign_id": state.campaign_id,
+            "drafts": [draft.model_dump(include={"customer_id", "subject", "body"}) for draft in drafts],
+            "rejected": [draft.model_dump(include={"customer_id", "problems"})
+                         for draft in state.final_drafts() if not draft.is_valid],
+        })
+
+        review_action = human_review["action"]
+        review_data = human_review.get("data")
+
+        if review_action == "continue":
+            return Command(goto=CampaignNodeName.SEND_EMAILS.value,
+                           update={"review": review_action, "approved": drafts})
+
+        elif review_action == "update":
+            edits = {edit["customer_id"]: edit for edit in json.loads(review_data)}
+            approved = []
+            for draft in drafts:
+                edit = edits.get(draft.customer_id, {})
+                if edit.get("exclude"):
+                    continue
+                approved.append(draft.model_copy(update={
+                    "subject": edit.get("subject", draft.subject),
+                    "body": edit.get("body", draft.body),
+                }))
+            return Command(goto=CampaignNodeName.SEND_EMAILS.value,
+                           update={"review": review_action, "approved": approved})
+
+        elif review_action == "feedback":
+            return Command(goto=END, update={"review": review_action, "review_feedback": review_data})
+
+        raise ValueError(f"Unknown review action: {review_action}")
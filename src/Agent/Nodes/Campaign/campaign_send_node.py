@@ -0,0 +1,22 @@
+import json
+
+from langchain_core.tools import BaseTool
+
+from src.Agent.Nodes.base_node import BaseNode
+from src.Agent.State.campaign_state import CampaignState
+
+
+class CampaignSendNode(BaseNode):
+    """Sends the approved drafts in a single `send_campaign_emails` call."""
+
+    def __init__(self, send_tool: BaseTool):
+        self._send_tool = send_tool
+
+    async def execute(self, state: CampaignState):
+        if not state.approved:
+            return {"send_result": {"sent": 0, "failed": 0, "failures": []}}
+        result = await self._send_tool.ainvoke({
+            "campaign_id": state.campaign_id,
+            "emails": [draft.model_dump(include={"customer_id", "subject", "body"}) for draft in state.approved],
+        })
+        return {"send_result": json.loads(result)}
@@ -0,0 +1,30 @@
+import asyncio
+import json
+
+from langchain_core.tools import BaseTool
+
+from src.Agent.Nodes.base_node import BaseNode
+from src.Agent.State.campaign_state import CampaignState
+from src.Helpers.config import get_settings, Settings
+
+
+class CustomerProfilesNode(BaseNode):
+    """Profiles the whole audience with `get_customer_profiles`, in as few calls as its cap allows."""
+
+    def __init__(self, profiles_tool: BaseTool, settings: Settings = None):
+        self.settings = settings if settings else get_settings()
+        self._profiles_tool = profiles_tool
+
+    async def execute(self, state: CampaignState):
+        customer_ids = list(dict.fromkeys(state.customer_ids))
+        chunk_size = self.settings.CUSTOMER_PROFILES_MAX_IDS
+        results = await asyncio.gather(*(
+            self._profiles_tool.ainvoke({"customer_ids": customer_ids[start:start + chunk_size]})
+            for start in range(0, len(customer_ids), chunk_size)
+        ))
+
+        profiles, not_found = [], []
+        for result in map(json.loads, results):
+            profiles.extend(result["profiles"])
+            not_found.extend(result["not_found"])
+        return {"profiles": profiles, "not_found": not_found}
@@ -0,0 +1,80 @@
+import html
+import re
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List
+
+from pydantic import BaseModel, Field
+
+# The slots a segment template can use, written {{slot}}, and what they are filled with.
+TEMPLATE_SLOTS = {
+    "first_name": "the customer's first name",
+    "name": "the customer's full name",
+    "last_product": "the product of the customer's most recent purchase",
+    "last_purchase_date": "the date of the customer's most recent purchase, e.g. March 4, 2011",
+    "favorite_product": "the product the customer bought the most of",
+    "recommendation": "a product popular with the customer's segment that they haven't bought yet",
+}
+DEFAULT_SEGMENT = "Others"
+
+_SLOT = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+class EmailTemplate(BaseModel):
+    """A marketing email for a whole segment, with {{slot}} placeholders for the customer specifics."""
+    subject: str = Field(description="The subject line, may use slots.")
+    body: str = Field(description="The HTML body, using slots for everything customer-specific.")
+
+
+def validate_template(subject: str, body: str) -> List[str]:
+    """Returns what is wrong with the slots of a template (the rendered emails are validated separately)."""
+    problems = []
+    unknown = sorted({slot for slot in _SLOT.findall(subject + body) if slot not in TEMPLATE_SLOTS})
+    if unknown:
+        problems.append(f"Unknown slots: {', '.join(unknown)}. Use only: {', '.join(TEMPLATE_SLOTS)}.")
+    if not {"first_name", "name"} & set(_SLOT.findall(body)):
+        problems.append("The body does not greet the customer with {{first_name}} or {{name}}.")
+    return problems
+
+
+def segment_of(profile: Dict[str, Any]) -> str:
+    return (profile.get("rfm") or {}).get("segment") or DEFAULT_SEGMENT
+
+
+def segment_favorites(profiles: List[Dict[str, Any]]) -> List[str]:
+    """The products of a segment, from the one most of its customers have among their top items."""
+    counts = Counter(
+        item["description"] for profile in profiles for item in profile.get("top_items") or [] if item["description"]
+    )
+    return [description for description, _ in counts.most_common()]
+
+
+def slot_values(profile: Dict[str, Any], favorites: List[str]) -> Dict[str, str]:
+    """Fills every slot for one customer. `favorites` are the segment's, from `segment_favorites`."""
+    name = (profile.get("name") or "").strip() or "there"
+    bought = [item["description"] for item in profile.get("top_items") or [] if item["description"]]
+    favorite_product = bought[0] if bought else (favorites[0] if favorites else "our bestsellers")
+    last_product = (profile.get("last_item") or {}).get("description") or favorite_product
+    recommendation = next((description for description in favorites if description not in bought), favorite_product)
+
+    last_purchase_date = "recently"
+    if profile.get("last_purchase_at"):
+        purchased_at = datetime.fromisoformat(profile["last_purchase_at"])
+        last_purchase_date = f"{purchased_at:%B} {purchased_at.day}, {purchased_at.year}"
+
+    return {
+        "first_name": name.split(" ")[0],
+        "name": name,
+        "last_product": last_product.strip().title(),
+        "last_purchase_date": last_purchase_date,
+        "favorite_product": favorite_product.strip().title(),
+        "recommendation": recommendation.strip().title(),
+    }
+
+
+def render(template: str, values: Dict[str, str], escape: bool = True) -> str:
+    """Replaces the {{slots}} of `template` with `values`, HTML-escaped unless `escape` is False."""
+    return _SLOT.sub(
+        lambda match: html.escape(values[match.group(1)]) if escape else values[match.group(1)],
+        template,
+    )
@@ -0,0 +1,61 @@
+import json
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from src.Agent.LLM.LLMProviders.base_provider import BaseProvider
+from src.Agent.Nodes.base_node import BaseNode
+from src.Agent.Nodes.Campaign.email_template import TEMPLATE_SLOTS, EmailTemplate, validate_template
+from src.Agent.Prompts.campaign_prompts import (
+    campaign_calls_to_action,
+    campaign_email_retry_prompt,
+    campaign_template_prompt,
+)
+from src.Agent.State.campaign_state import SegmentTemplate, TemplateWorkerState
+from src.Helpers.config import get_settings, Settings
+
+
+class EmailTemplateNode(BaseNode):
+    """
+    Writes the email template of one segment: a single completion for all of its customers.
+
+    A template whose slots fail validation is rewritten, up to CAMPAIGN_EMAIL_MAX_ATTEMPTS.
+    """
+
+    def __init__(self, llm: BaseProvider, settings: Settings = None):
+        self.settings = settings if settings else get_settings()
+        self._llm = llm.with_structured_output(EmailTemplate)
+
+    async def execute(self, state: TemplateWorkerState):
+        messages = [
+            SystemMessage(content=campaign_template_prompt.format(
+                campaign_type=state.campaign_type,
+                customers=state.customers,
+                segment=state.segment,
+                brief=state.brief,
+                example_profiles=json.dumps(state.example_profiles, ensure_ascii=False),
+                slots="\n".join(f"- {{{{{slot}}}}}: {description}" for slot, description in TEMPLATE_SLOTS.items()),
+                call_to_action=campaign_calls_to_action.get(state.campaign_type, "invite the customer to act"),
+            )),
+            HumanMessage(content="Write the template."),
+        ]
+
+        template = SegmentTemplate(segment=state.segment, customers=state.customers)
+        for attempt in range(1, self.settings.CAMPAIGN_EMAIL_MAX_ATTEMPTS + 1):
+            try:
+                email: EmailTemplate = await self._llm.ainvoke(messages)
+            except Exception as e:
+                template = template.model_copy(update={
+                    "problems": [f"The template could not be written: {e}"], "attempts": attempt,
+                })
+                continue
+            problems = validate_template(email.subject, email.body)
+            template = template.model_copy(update={
+                "subject": email.subject, "body": email.body, "problems": problems, "attempts": attempt,
+            })
+            if not problems:
+                break
+            messages += [
+                AIMessage(content=email.model_dump_json()),
+                HumanMessage(content=campaign_email_retry_prompt.format(problems="\n".join(problems))),
+            ]
+        return {"templates": [template]}
@@ -0,0 +1,100 @@
+import html
+import json
+import re
+from typing import Any, Dict, List
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from pydantic import BaseModel, Field
+
+from src.Agent.LLM.LLMProviders.base_provider import BaseProvider
+from src.Agent.Nodes.base_node import BaseNode
+from src.Agent.Prompts.campaign_prompts import (
+    campaign_calls_to_action,
+    campaign_email_prompt,
+    campaign_email_retry_prompt,
+    campaign_polish_prompt,
+)
+from src.Agent.State.campaign_state import EmailDraft, EmailWorkerState
+from src.Helpers.config import get_settings, Settings
+
+MAX_SUBJECT_CHARS = 150
+MAX_BODY_CHARS = 20000
+
+_HTML_TAG = re.compile(r"<(html|body|p|div|table|h[1-6]|br)\b", re.IGNORECASE)
+_CALL_TO_ACTION = re.compile(r"<a\s[^>]*href=|<button\b", re.IGNORECASE)
+_PLACEHOLDER = re.compile(r"\{\{.*?\}\}|\[(customer |first |last )?name\]|\[link\]", re.IGNORECASE)
+
+
+class EmailContent(BaseModel):
+    """A marketing email."""
+    subject: str = Field(description="The subject line.")
+    body: str = Field(description="The HTML body.")
+
+
+def validate_email(subject: str, body: str, profile: Dict[str, Any]) -> List[str]:
+    """Returns what is wrong with an email for the customer of `profile` (nothing when it can be sent)."""
+    problems = []
+    if not subject.strip():
+        problems.append("The subject is empty.")
+    elif len(subject) > MAX_SUBJECT_CHARS:
+        problems.append(f"The subject is longer than {MAX_SUBJECT_CHARS} characters.")
+    if not _HTML_TAG.search(body):
+        problems.append("The body is not HTML.")
+    elif len(body) > MAX_BODY_CHARS:
+        problems.append(f"The body is longer than {MAX_BODY_CHARS} characters.")
+    first_name = (profile.get("name") or "").split(" ")[0]
+    # The body is HTML: a name like D'Arcy is in it as D&#x27;Arcy.
+    if first_name and first_name.lower() not in html.unescape(body).lower():
+        problems.append(f"The body does not greet the customer by name ({first_name}).")
+    if not _CALL_TO_ACTION.search(body):
+        problems.append("The body has no call to action link or button.")
+    if _PLACEHOLDER.search(subject) or _PLACEHOLDER.search(body):
+        problems.append("The email contains unfilled placeholders.")
+    return problems
+
+
+class EmailWorkerNode(BaseNode):
+    """
+    Drafts and validates the email of a single customer, or polishes the one rendered from
+    their segment's template (the result then goes to `polished` rather than `drafts`).
+
+    The prompt holds only the campaign brief and the customer's profile, not the conversation.
+    A draft that fails validation is rewritten with the problems, up to CAMPAIGN_EMAIL_MAX_ATTEMPTS.
+    """
+
+    def __init__(self, llm: BaseProvider, settings: Settings = None):
+        self.settings = settings if settings else get_settings()
+        self._llm = llm.with_structured_output(EmailContent)
+
+    async def execute(self, state: EmailWorkerState):
+        profile = state.profile
+        prompt = campaign_email_prompt.format(
+            campaign_type=state.campaign_type,
+            brief=state.brief,
+            profile=json.dumps(profile, ensure_ascii=False),
+            call_to_action=campaign_calls_to_action.get(state.campaign_type, "invite the customer to act"),
+        )
+        if state.draft is not None:
+            prompt += campaign_polish_prompt.format(
+                draft=json.dumps(state.draft.model_dump(include={"subject", "body"}), ensure_ascii=False)
+            )
+        messages = [SystemMessage(content=prompt), HumanMessage(content="Write the email.")]
+
+        draft = EmailDraft(customer_id=profile["customer_id"])
+        for attempt in range(1, self.settings.CAMPAIGN_EMAIL_MAX_ATTEMPTS + 1):
+            try:
+                email: EmailContent = await self._llm.ainvoke(messages)
+            except Exception as e:
+                draft = EmailDraft(customer_id=draft.customer_id, problems=[f"The email could not be written: {e}"],
+                                   attempts=attempt)
+                continue
+            problems = validate_email(email.subject, email.body, profile)
+            draft = EmailDraft(customer_id=draft.customer_id, subject=email.subject, body=email.body,
+                               problems=problems, attempts=attempt)
+            if not problems:
+                break
+            messages += [
+                AIMessage(content=email.model_dump_json()),
+                HumanMessage(content=campaign_email_retry_prompt.format(problems="\n".join(problems))),
+            ]
+        return {"polished" if state.draft is not None else "drafts": [draft]}
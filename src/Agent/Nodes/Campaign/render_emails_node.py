@@ -0,0 +1,32 @@
+from collections import defaultdict
+
+from src.Agent.Nodes.base_node import BaseNode
+from src.Agent.Nodes.Campaign.email_template import render, segment_favorites, segment_of, slot_values
+from src.Agent.Nodes.Campaign.email_worker_node import validate_email
+from src.Agent.State.campaign_state import CampaignState, EmailDraft
+
+
+class RenderEmailsNode(BaseNode):
+    """Renders every customer's email from their segment's template, locally, and validates it."""
+
+    async def execute(self, state: CampaignState):
+        templates = {template.segment: template for template in state.templates}
+        profiles_by_segment = defaultdict(list)
+        for profile in state.profiles:
+            profiles_by_segment[segment_of(profile)].append(profile)
+
+        drafts = []
+        for segment, profiles in profiles_by_segment.items():
+            template = templates[segment]
+            favorites = segment_favorites(profiles)
+            for profile in profiles:
+                if not template.is_valid:
+                    drafts.append(EmailDraft(customer_id=profile["customer_id"],
+                                             problems=[f"The template of segment '{segment}' is invalid."]))
+                    continue
+                values = slot_values(profile, favorites)
+                subject = render(template.subject, values, escape=False)
+                body = render(template.body, values)
+                drafts.append(EmailDraft(customer_id=profile["customer_id"], subject=subject, body=body,
+                                         problems=validate_email(subject, body, profile), attempts=1))
+        return {"drafts": drafts}
@@ -2,23 +2,45 @@ from src.Agent.Nodes.base_node import BaseNode
 from src.Agent.LLM.LLMProviders.base_provider import BaseProvider
 from src.Agent.State.crm_state import AgentState
 from src.Agent.Prompts.agent_prompts import agent_system_prompt
+from src.Agent.Context.context_window_manager import ContextWindowManager
+from src.Helpers.metrics import (CONTEXT_COMPACTIONS, CONTEXT_MESSAGES_DROPPED, CONTEXT_TOKENS_SAVED,
+                                 CONTEXT_TOOL_RESULTS_COMPACTED)
 
-from langchain_core.messages import SystemMessage
+from langchain_core.messages import SystemMessage, message_chunk_to_message
 
 
 class AssistantNode(BaseNode):
     
-    def __init__(self , llm : BaseProvider):
+    def __init__(self , llm : BaseProvider , context_manager : ContextWindowManager = None):
         self._llm = llm
+        self._context_manager = context_manager if context_manager else ContextWindowManager()
     
 
     async def execute(self, state: AgentState) :
-        response = self._llm.invoke(
-            [SystemMessage(content=agent_system_prompt)] +
+        # Keep the prompt under the token budget: older tool results are stubbed or
+        # dropped, the system prompt and the latest turns are always sent verbatim.
+        prompt, report = self._context_manager.compact(
+            SystemMessage(content=agent_system_prompt),
             state.messages
             )
-        state.messages = state.messages + [response]
-        return state
+        if report.tokens_saved:
+            CONTEXT_COMPACTIONS.inc()
+            CONTEXT_TOKENS_SAVED.inc(report.tokens_saved)
+            CONTEXT_TOOL_RESULTS_COMPACTED.inc(report.tool_results_compacted)
+            CONTEXT_MESSAGES_DROPPED.inc(report.messages_dropped)
+
+        # Stream natively so the event loop is never blocked by the completion and the
+        # tokens reach the graph's "messages" stream as soon as they are generated.
+        response = None
+        async for chunk in self._llm.astream(prompt):
+            response = chunk if response is None else response + chunk
+        if response is None:
+            raise RuntimeError("The LLM streamed no response to the prompt.")
+        response = message_chunk_to_message(response)
+        response.response_metadata["context_compaction"] = report.to_dict()
+        # Return only the new message: the messages channel appends it, and the
+        # checkpointer stores it as a delta rather than re-writing the history.
+        return {"messages": [response]}
     
 
 
@@ -1,7 +1,11 @@
+import asyncio
+import time
 from abc import ABC , abstractmethod
+from langgraph.errors import GraphBubbleUp
 from src.Agent.State.crm_state import AgentState
 from typing import List , Dict , Any
 from src.Agent.LLM.base_factory_provider import BaseLLMFactory
+from src.Helpers.metrics import NODE_DURATION, NODE_IN_FLIGHT, NODE_RUNS
 
 class BaseNode(ABC):
     """Base class for all CRM nodes"""
@@ -11,6 +15,24 @@ class BaseNode(ABC):
         """Execute the node logic"""
         pass
     
-    def __call__(self, state: AgentState) :
-        """Make the node callable"""
-        return self.execute(state)
\ No newline at end of file
+    async def __call__(self, state: AgentState) :
+        """Make the node callable (as a coroutine, so LangGraph runs it on the event loop)"""
+        node = type(self).__name__
+        status = "error"
+        NODE_IN_FLIGHT.inc(node=node)
+        started = time.perf_counter()
+        try:
+            result = await self.execute(state)
+            status = "ok"
+            return result
+        except GraphBubbleUp:
+            # An interrupt waiting for a human review, not a failure
+            status = "interrupted"
+            raise
+        except asyncio.CancelledError:
+            status = "cancelled"
+            raise
+        finally:
+            NODE_IN_FLIGHT.dec(node=node)
+            NODE_DURATION.observe(time.perf_counter() - started, node=node)
+            NODE_RUNS.inc(node=node, status=status)
\ No newline at end of file
@@ -0,0 +1,82 @@
+import json
+
+from langchain_core.messages import ToolMessage
+from langgraph.graph.state import CompiledStateGraph
+from pydantic import ValidationError
+
+from src.Agent.Nodes.base_node import BaseNode
+from src.Agent.State.campaign_state import CampaignState
+from src.Agent.State.crm_state import AgentState
+from src.Agent.Tools.campaign_tools import CAMPAIGN_EMAILS_TOOL_NAME, DraftCampaignEmailsInput
+from src.Helpers.config import get_settings, Settings
+
+
+class CampaignNode(BaseNode):
+    """
+    Runs a `draft_campaign_emails` call through the campaign subgraph.
+
+    The emails are written outside the conversation, so the assistant only gets back a
+    compact JSON summary as the tool result, never the drafts themselves.
+    """
+
+    def __init__(self, campaign_graph: CompiledStateGraph, settings: Settings = None):
+        self.settings = settings if settings else get_settings()
+        self._campaign_graph = campaign_graph
+
+    async def execute(self, state: AgentState):
+        tool_calls = state.messages[-1].tool_calls
+        campaign_call = next(tool_call for tool_call in tool_calls if tool_call["name"] == CAMPAIGN_EMAILS_TOOL_NAME)
+        # One subgraph run per step: every other call of the message is answered without running.
+        tool_messages = [
+            self._tool_message(tool_call, f"Error: not run. Call {CAMPAIGN_EMAILS_TOOL_NAME} on its own, "
+                                          f"for one campaign at a time.", status="error")
+            for tool_call in tool_calls if tool_call is not campaign_call
+        ]
+
+        try:
+            arguments = DraftCampaignEmailsInput(**campaign_call["args"])
+        except ValidationError as e:
+            return {"messages": [self._tool_message(campaign_call, f"Error: {e}", status="error"), *tool_messages]}
+        if len(arguments.customer_ids) > self.settings.CAMPAIGN_MAX_AUDIENCE:
+            error = (f"Error: a campaign can target at most {self.settings.CAMPAIGN_MAX_AUDIENCE} customers, "
+                     f"got {len(arguments.customer_ids)}.")
+            return {"messages": [self._tool_message(campaign_call, error, status="error"), *tool_messages]}
+
+        mode = arguments.mode or (
+            "personalized" if len(set(arguments.customer_ids)) <= self.settings.CAMPAIGN_PERSONALIZED_MAX_AUDIENCE
+            else "template"
+        )
+        result = await self._campaign_graph.ainvoke(
+            CampaignState(**arguments.model_dump(exclude={"mode"}), mode=mode, yolo_mode=state.yolo_mode),
+            config={"max_concurrency": self.settings.CAMPAIGN_MAX_CONCURRENT_WORKERS},
+        )
+        summary = json.dumps(self._summarize(CampaignState(**result)))
+        return {"messages": [self._tool_message(campaign_call, summary), *tool_messages]}
+
+    @staticmethod
+    def _summarize(campaign: CampaignState) -> dict:
+        send_result = campaign.send_result or {}
+        drafts = campaign.final_drafts()
+        summary = {
+            "campaign_id": campaign.campaign_id,
+            "mode": campaign.mode,
+            "audience": len(set(campaign.customer_ids)),
+            "not_found": campaign.not_found,
+            "drafted": sum(1 for draft in drafts if draft.is_valid),
+            "invalid_drafts": [draft.model_dump(include={"customer_id", "problems"})
+                               for draft in drafts if not draft.is_valid],
+            "review": campaign.review,
+            "review_feedback": campaign.review_feedback,
+            "sent": send_result.get("sent", 0),
+            "failed": send_result.get("failed", 0),
+            "failures": send_result.get("failures", []),
+        }
+        if campaign.mode == "template":
+            summary["templates"] = [template.model_dump(include={"segment", "customers", "problems"})
+                                    for template in campaign.templates]
+            summary["polished"] = sum(1 for draft in campaign.polished if draft.is_valid)
+        return summary
+
+    @staticmethod
+    def _tool_message(tool_call: dict, content: str, status: str = "success") -> ToolMessage:
+        return ToolMessage(content=content, name=tool_call["name"], tool_call_id=tool_call["id"], status=status)
@@ -7,14 +7,29 @@ from langgraph.types import Command, interrupt
 import json
 
 class HumanToolReviewNode(BaseNode):
-    
+    """
+    Submits every protected tool call of the last AIMessage to a single human review.
+
+    The resume value:
+    - {"action": "continue"} runs every call as is.
+    - {"action": "update", "data": '[{"id": "call_1", "args": {...}}, {"id": "call_2", "feedback": "..."}]'}
+      edits or rejects individual calls, then runs the rest. With a single protected call,
+      "data" can also be its new arguments, as before.
+    - {"action": "feedback", "data": "..."} runs none of them and hands the feedback to the assistant.
+    "data" is either JSON text or the decoded value.
+
+    The calls that need no review run along with the approved ones.
+    """
+
     async def execute(self, state: AgentState) :
-        last_message = state.messages[-1]
-        tool_call = last_message.tool_calls[-1]
+        last_message = next(message for message in reversed(state.messages) if isinstance(message, AIMessage))
+        tool_calls = state.protected_tool_calls()
 
         human_review: dict = interrupt({
-            "message": "Your input is required for the following tool:",
-            "tool_call": tool_call
+            "message": f"Your approval is required for the following {len(tool_calls)} tool calls:",
+            "tool_calls": tool_calls,
+            "unreviewed_tool_calls": [tool_call for tool_call in state.pending_tool_calls()
+                                      if tool_call not in tool_calls],
         })
 
         review_action = human_review["action"]
@@ -22,28 +37,54 @@ class HumanToolReviewNode(BaseNode):
 
         if review_action == "continue":
             return Command(goto="tools")
-        
-        # Change the tool call arguments created by our Agent
+
+        # Change the tool call arguments created by our Agent, or reject some of the calls
         elif review_action == "update":
-            
+            edits = self._edits(self._decoded(review_data), tool_calls)
+            rejections = [self._rejection(tool_call, edits[tool_call["id"]]["feedback"])
+                          for tool_call in tool_calls if "feedback" in edits.get(tool_call["id"], {})]
             updated_message = AIMessage(
                 content=last_message.content,
-                tool_calls=[{
-                    "id": tool_call["id"],
-                    "name": tool_call["name"],
-                    "args": json.loads(review_data)
-                }],
+                tool_calls=[
+                    {**tool_call, "args": edits[tool_call["id"]]["args"]}
+                    if "args" in edits.get(tool_call["id"], {}) else tool_call
+                    for tool_call in last_message.tool_calls
+                ],
                 id=last_message.id
             )
+            # Nothing left to run: the assistant gets the rejections right away.
+            rejected = {message.tool_call_id for message in rejections}
+            goto = "tools" if any(tool_call["id"] not in rejected for tool_call in state.pending_tool_calls()) \
+                else "assistant_node"
+            return Command(goto=goto, update={"messages": [updated_message, *rejections]})
 
-            return Command(goto="tools", update={"messages": [updated_message]})
-        
         # Send feedback to the Agent as a tool message (required after a tool call)
         elif review_action == "feedback":
-            
-            tool_message = ToolMessage(
-                content=review_data,
-                name=tool_call["name"],
-                tool_call_id=tool_call["id"]
-            )
-            return Command(goto="assistant_node", update={"messages": [tool_message]})
\ No newline at end of file
+            feedback = review_data if isinstance(review_data, str) else json.dumps(review_data)
+            rejections = [self._rejection(tool_call, feedback) for tool_call in tool_calls]
+            # The calls that needed no review still run, the assistant gets every result at once.
+            goto = "tools" if len(state.pending_tool_calls()) > len(tool_calls) else "assistant_node"
+            return Command(goto=goto, update={"messages": rejections})
+
+    @staticmethod
+    def _decoded(review_data):
+        return json.loads(review_data) if isinstance(review_data, str) else review_data
+
+    @staticmethod
+    def _edits(review_data, tool_calls) -> dict:
+        """The edits of the calls under review, by id. A dict is the new arguments of the only one."""
+        if isinstance(review_data, dict):
+            if len(tool_calls) != 1:
+                raise ValueError(f"{len(tool_calls)} tool calls are under review: "
+                                 f"send a list of {{\"id\", \"args\"}} or {{\"id\", \"feedback\"}} edits.")
+            return {tool_calls[0]["id"]: {"args": review_data}}
+        reviewed = {tool_call["id"] for tool_call in tool_calls}
+        return {edit["id"]: edit for edit in review_data or [] if edit["id"] in reviewed}
+
+    @staticmethod
+    def _rejection(tool_call, feedback: str) -> ToolMessage:
+        return ToolMessage(
+            content=feedback,
+            name=tool_call["name"],
+            tool_call_id=tool_call["id"]
+        )
@@ -0,0 +1,88 @@
+import asyncio
+import time
+from typing import Dict, List
+
+from langchain_core.messages import ToolCall, ToolMessage
+from langchain_core.tools import BaseTool
+
+from src.Agent.Nodes.base_node import BaseNode
+from src.Agent.State.crm_state import AgentState
+from src.Helpers.config import get_settings, Settings
+from src.Helpers.metrics import TOOL_DURATION, TOOL_ERRORS, TOOL_QUEUE_WAIT
+
+LOCAL_SERVER = "local"  # tools that don't come from an MCP server
+
+
+class ParallelToolNode(BaseNode):
+    """
+    Runs the tool calls of the last AIMessage concurrently, except the ones already
+    answered (rejected in review).
+
+    - Calls to the same MCP server share a semaphore (TOOL_SERVER_CONCURRENCY, or the
+      server's session pool size), so a burst of calls queues here instead of timing
+      out on the pool. The semaphores are shared by every thread running the graph.
+    - Each call is bounded by TOOL_CALL_TIMEOUT_SECONDS, counted once it has its slot.
+    - A failed or timed-out call becomes an error ToolMessage for the model to act on;
+      the other calls of the turn are not affected.
+    - The ToolMessages come back in the order of the tool calls.
+    """
+
+    def __init__(self, tools: List[BaseTool], settings: Settings = None):
+        self.settings = settings if settings else get_settings()
+        self.tools_by_name: Dict[str, BaseTool] = {tool.name: tool for tool in tools}
+        self._timeout = self.settings.TOOL_CALL_TIMEOUT_SECONDS
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    async def execute(self, state: AgentState):
+        tool_calls = state.pending_tool_calls()
+        tool_messages = await asyncio.gather(*(self._run_tool_call(tool_call) for tool_call in tool_calls))
+        return {"messages": list(tool_messages)}
+
+    async def _run_tool_call(self, tool_call: ToolCall) -> ToolMessage:
+        tool = self.tools_by_name.get(tool_call["name"])
+        if tool is None:
+            TOOL_ERRORS.inc(tool=tool_call["name"], server=LOCAL_SERVER, reason="unknown_tool")
+            return self._error_message(
+                tool_call, f"{tool_call['name']} is not a valid tool, try one of [{', '.join(self.tools_by_name)}]."
+            )
+
+        server = self._server_of(tool)
+        queued_at = time.perf_counter()
+        async with self._semaphore(server):
+            started = time.perf_counter()
+            TOOL_QUEUE_WAIT.observe(started - queued_at, server=server)
+            try:
+                result = await asyncio.wait_for(tool.ainvoke({**tool_call, "type": "tool_call"}), self._timeout)
+            except asyncio.TimeoutError:
+                TOOL_ERRORS.inc(tool=tool.name, server=server, reason="timeout")
+                return self._error_message(tool_call, f"the tool did not answer within {self._timeout:g}s.")
+            except Exception as e:
+                TOOL_ERRORS.inc(tool=tool.name, server=server, reason="error")
+                return self._error_message(tool_call, str(e) or repr(e))
+            finally:
+                TOOL_DURATION.observe(time.perf_counter() - started, tool=tool.name, server=server)
+
+        if isinstance(result, ToolMessage):
+            if result.status == "error":
+                TOOL_ERRORS.inc(tool=tool.name, server=server, reason="tool_error")
+            return result
+        return ToolMessage(content=str(result), name=tool_call["name"], tool_call_id=tool_call["id"])
+
+    def _semaphore(self, server: str) -> asyncio.Semaphore:
+        if server not in self._semaphores:
+            limit = self.settings.TOOL_SERVER_CONCURRENCY.get(server, self.settings.MCP_POOL_SIZE)
+            self._semaphores[server] = asyncio.Semaphore(max(1, limit))
+        return self._semaphores[server]
+
+    @staticmethod
+    def _server_of(tool: BaseTool) -> str:
+        return (tool.metadata or {}).get("mcp_server", LOCAL_SERVER)
+
+    @staticmethod
+    def _error_message(tool_call: ToolCall, error: str) -> ToolMessage:
+        return ToolMessage(
+            content=f"Error: {error}\n Please fix your mistakes.",
+            name=tool_call["name"],
+            tool_call_id=tool_call["id"],
+            status="error",
+        )
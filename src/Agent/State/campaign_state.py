@@ -0,0 +1,87 @@
+import operator
+from pydantic import BaseModel
+from typing import Annotated, Any, Dict, List, Optional
+
+
+class EmailDraft(BaseModel):
+    """The email written for one customer of a campaign.
+
+    Attributes:
+        problems: What failed validation on the last attempt; a draft with problems is not sent.
+    """
+    customer_id: int
+    subject: str = ""
+    body: str = ""
+    problems: List[str] = []
+    attempts: int = 0
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.problems
+
+
+class SegmentTemplate(BaseModel):
+    """The email template written for one segment of a campaign's audience, in "template" mode."""
+    segment: str
+    customers: int
+    subject: str = ""
+    body: str = ""
+    problems: List[str] = []
+    attempts: int = 0
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.problems
+
+
+class CampaignState(BaseModel):
+    """The state of the campaign subgraph, for one `draft_campaign_emails` call.
+
+    Attributes:
+        mode: "personalized" (one LLM-written email per customer) or "template" (one LLM-written
+            template per segment, rendered locally for each of its customers).
+        profiles: The profiles of the audience, fetched once for all the workers.
+        drafts: One draft per profiled customer, appended by the workers as they finish.
+        polished: The template-rendered drafts that were rewritten by the LLM, for a sample of customers.
+        review: The reviewer's decision on the batch ("continue", "update" or "feedback").
+        approved: The drafts to send, as approved (and possibly edited) by the reviewer.
+        send_result: The summary returned by `send_campaign_emails`.
+    """
+    campaign_id: str
+    campaign_type: str
+    brief: str
+    customer_ids: List[int]
+    mode: str = "personalized"
+    yolo_mode: bool = False
+    profiles: List[Dict[str, Any]] = []
+    not_found: List[int] = []
+    templates: Annotated[List[SegmentTemplate], operator.add] = []
+    drafts: Annotated[List[EmailDraft], operator.add] = []
+    polished: Annotated[List[EmailDraft], operator.add] = []
+    review: Optional[str] = None
+    review_feedback: Optional[str] = None
+    approved: List[EmailDraft] = []
+    send_result: Optional[Dict[str, Any]] = None
+
+    def final_drafts(self) -> List[EmailDraft]:
+        """The drafts, with the valid polished ones in place of the rendered originals."""
+        polished = {draft.customer_id: draft for draft in self.polished if draft.is_valid}
+        return [polished.get(draft.customer_id, draft) for draft in self.drafts]
+
+
+class EmailWorkerState(BaseModel):
+    """The input of one email worker: a customer's profile and the campaign to write for.
+    With a `draft`, the worker polishes that (template-rendered) email instead of writing one."""
+    campaign_type: str
+    brief: str
+    profile: Dict[str, Any]
+    draft: Optional[EmailDraft] = None
+
+
+class TemplateWorkerState(BaseModel):
+    """The input of one template worker: a segment, its size and a few of its customers' profiles."""
+    campaign_type: str
+    brief: str
+    segment: str
+    customers: int
+    example_profiles: List[Dict[str, Any]]
@@ -1,14 +1,44 @@
 from pydantic import BaseModel
-from typing import Annotated , List 
+from typing import Annotated , List , Sequence
+from langgraph.channels import DeltaChannel
+from langchain_core.messages import AIMessage, ToolCall, ToolMessage
 from langgraph.graph.message import add_messages, BaseMessage
 
+from src.Helpers.config import get_settings
+
+
+def add_message_batches(messages: List[BaseMessage], batches: Sequence[List[BaseMessage]]) -> List[BaseMessage]:
+    """Folds a batch of `messages` writes with `add_messages`, in order."""
+    for batch in batches:
+        messages = add_messages(messages, batch)
+    return messages
+
+
 class  AgentState(BaseModel):
     """The state of the agent.
-    
+
     Attributes:
-        messages: The list of messages in the conversation.
+        messages: The list of messages in the conversation. Checkpoints store only the new
+            messages of each step (plus a periodic snapshot) instead of the whole history.
         yolo_mode: Whether to skip human review of protected tool calls.
     """
-    messages: Annotated[List[BaseMessage], add_messages] = []
-    protected_tools: List[str] = ["create_campaign", "send_campaign_email"]
-    yolo_mode: bool = False
\ No newline at end of file
+    messages: Annotated[List[BaseMessage],
+                        DeltaChannel(add_message_batches,
+                                     snapshot_frequency=get_settings().CHECKPOINT_MESSAGES_SNAPSHOT_FREQUENCY)] = []
+    protected_tools: List[str] = ["create_campaign", "send_campaign_email", "send_campaign_emails"]
+    yolo_mode: bool = False
+
+    def pending_tool_calls(self) -> List[ToolCall]:
+        """The tool calls of the last AIMessage that have no ToolMessage yet, e.g. the ones
+        approved in review when others of the same message were rejected."""
+        answered = set()
+        for message in reversed(self.messages):
+            if isinstance(message, ToolMessage):
+                answered.add(message.tool_call_id)
+            elif isinstance(message, AIMessage):
+                return [tool_call for tool_call in message.tool_calls if tool_call["id"] not in answered]
+        return []
+
+    def protected_tool_calls(self) -> List[ToolCall]:
+        """The pending tool calls that need a human review."""
+        return [tool_call for tool_call in self.pending_tool_calls() if tool_call["name"] in self.protected_tools]
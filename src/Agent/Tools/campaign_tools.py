@@ -0,0 +1,35 @@
+from typing import List, Literal, Optional
+
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import BaseModel, ConfigDict, Field
+
+CAMPAIGN_EMAILS_TOOL_NAME = "draft_campaign_emails"
+
+
+class DraftCampaignEmailsInput(BaseModel):
+    """Write a personalized email for every customer of a campaign and send them once approved.
+    The customers are profiled and their emails (or their segments' templates) drafted and
+    validated in parallel; the whole batch is then reviewed at once before it is sent.
+
+    Returns:
+        A JSON summary: emails drafted, customers not found or whose draft failed validation,
+        the review decision and the emails sent or failed.
+    """
+    model_config = ConfigDict(title=CAMPAIGN_EMAILS_TOOL_NAME)
+
+    campaign_id: str = Field(description="The ID returned by `create_campaign`.")
+    campaign_type: Literal["loyalty", "referral", "re-engagement"]
+    customer_ids: List[int] = Field(description="The IDs of every customer the campaign targets.")
+    brief: str = Field(description="What every email should get across: the goal, the offer, "
+                                   "the call to action and any tone or content notes.")
+    mode: Optional[Literal["personalized", "template"]] = Field(
+        default=None,
+        description="'personalized' writes every email individually; 'template' writes one template per "
+                    "RFM segment and fills it in with each customer's details, which is much faster for "
+                    "large audiences. By default, small audiences are personalized and large ones templated.",
+    )
+
+
+# Bound to the LLM as a schema only, so there is no tool to run: the CRM graph routes these
+# calls to the campaign subgraph.
+draft_campaign_emails = convert_to_openai_tool(DraftCampaignEmailsInput)
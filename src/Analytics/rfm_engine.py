@@ -0,0 +1,387 @@
+"""
+Computes the `rfm` table from `transactions` with NumPy.
+
+For each customer:
+- recency: days between their last purchase and the reference date,
+- frequency: number of transaction lines,
+- monetary: total spent,
+- R / F / M: quintile scores from 1 (worst) to 5 (best), equivalent to
+  `pd.qcut(recency, 5, labels=[5,4,3,2,1])`, `pd.qcut(frequency.rank(method='first'), 5)`
+  and `pd.qcut(monetary, 5)`,
+- RFM_Score and Segment.
+
+A full run scores every customer and stores the reference date and the quintile edges in
+`rfm_scoring_state`. An incremental run re-scores only the customers with transactions past
+the stored watermark (or the given customers) against those frozen edges, so the other
+customers' scores stay comparable until the next full run.
+
+Usage:
+    python -m src.Analytics.rfm_engine --mode full [--reference-date 2011-12-31]
+    python -m src.Analytics.rfm_engine --mode incremental [--customer-ids 12360 12449]
+"""
+import argparse
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.engine import Engine
+
+from src.Authentication.database import setup_database_engine
+from src.Helpers.config import get_settings
+from src.MCP.Servers.query_result_cache import QUERY_CACHE_INVALIDATION_CHANNEL
+
+QUINTILES = [0.2, 0.4, 0.6, 0.8]
+
+# Segment rules, checked in order on the (R, F, M) scores; the first match wins.
+SEGMENT_CHAMPION = "Champion"
+SEGMENT_RECENT_CUSTOMER = "Recent Customer"
+SEGMENT_FREQUENT_BUYER = "Frequent Buyer"
+SEGMENT_BIG_SPENDER = "Big Spender"
+SEGMENT_AT_RISK = "At Risk"
+SEGMENT_OTHERS = "Others"
+
+_EPOCH = np.datetime64("1970-01-01", "D")
+# Customer IDs spanning up to this many times the number of rows are grouped with bincount.
+_DENSE_SPAN_FACTOR = 4
+
+
+@dataclass
+class RFMEdges:
+    """The reference date and the inner quintile edges (4 per measure) that scores are cut at."""
+    reference_date: date
+    recency: np.ndarray
+    frequency: np.ndarray
+    monetary: np.ndarray
+
+
+@dataclass
+class RFMScores:
+    """One entry per customer, sorted by customer ID."""
+    customer_ids: np.ndarray
+    recency: np.ndarray
+    frequency: np.ndarray
+    monetary: np.ndarray
+    r: np.ndarray
+    f: np.ndarray
+    m: np.ndarray
+    rfm_score: np.ndarray
+    segment: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.customer_ids)
+
+
+def to_day_numbers(dates: Sequence[Any]) -> np.ndarray:
+    """Converts dates / datetimes / datetime64 values to days since 1970-01-01."""
+    return (np.asarray(dates, dtype="datetime64[D]") - _EPOCH).astype(np.int64)
+
+
+def aggregate_transactions(customer_ids: np.ndarray, invoice_days: np.ndarray, total_prices: np.ndarray,
+                           reference_day: int):
+    """
+    Groups transaction lines by customer, without a Python loop.
+    Returns the sorted unique customer IDs and their recency, frequency and monetary arrays.
+    """
+    if len(customer_ids) == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty, np.empty(0, dtype=np.float64)
+
+    lowest = customer_ids.min()
+    span = int(customer_ids.max() - lowest) + 1
+    if span <= _DENSE_SPAN_FACTOR * len(customer_ids):
+        # IDs are dense enough to index arrays with directly: O(n), no sort.
+        offsets = customer_ids - lowest
+        frequency = np.bincount(offsets, minlength=span)
+        present = np.flatnonzero(frequency)
+        monetary = np.bincount(offsets, weights=total_prices, minlength=span)[present]
+        last_purchase_days = np.full(span, np.iinfo(np.int64).min)
+        np.maximum.at(last_purchase_days, offsets, invoice_days)
+        customers, frequency, last_purchase_days = present + lowest, frequency[present], last_purchase_days[present]
+    else:
+        order = np.argsort(customer_ids)
+        sorted_customers = customer_ids[order]
+        starts = np.flatnonzero(np.r_[True, sorted_customers[1:] != sorted_customers[:-1]])
+        customers = sorted_customers[starts]
+        frequency = np.diff(np.r_[starts, len(sorted_customers)])
+        monetary = np.add.reduceat(total_prices[order], starts)
+        last_purchase_days = np.maximum.reduceat(invoice_days[order], starts)
+
+    recency = np.maximum(reference_day - last_purchase_days, 0)
+    return customers.astype(np.int64), recency, frequency, np.round(monetary, 2)
+
+
+def first_ranks(values: np.ndarray, tie_breaker: np.ndarray) -> np.ndarray:
+    """Ranks 1..n with ties broken by `tie_breaker`, like `Series.rank(method='first')` on sorted IDs."""
+    ranks = np.empty(len(values), dtype=np.float64)
+    ranks[np.lexsort((tie_breaker, values))] = np.arange(1, len(values) + 1)
+    return ranks
+
+
+def quintile_edges(values: np.ndarray) -> np.ndarray:
+    """The inner edges of `pd.qcut(values, 5)` (linear interpolation)."""
+    return np.quantile(values.astype(np.float64), QUINTILES)
+
+
+def quintile_index(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """0-based bin of each value, with qcut's right-closed bins: edges[i-1] < value <= edges[i]."""
+    return np.searchsorted(edges, values, side="left")
+
+
+def assign_segments(r: np.ndarray, f: np.ndarray, m: np.ndarray) -> np.ndarray:
+    return np.select(
+        [(r == 5) & (f == 5) & (m == 5), r == 5, f == 5, m == 5, r == 1],
+        [SEGMENT_CHAMPION, SEGMENT_RECENT_CUSTOMER, SEGMENT_FREQUENT_BUYER, SEGMENT_BIG_SPENDER, SEGMENT_AT_RISK],
+        default=SEGMENT_OTHERS,
+    )
+
+
+def _scores(customer_ids, recency, frequency, monetary, r, f, m) -> RFMScores:
+    return RFMScores(
+        customer_ids=customer_ids,
+        recency=recency,
+        frequency=frequency,
+        monetary=monetary,
+        r=r,
+        f=f,
+        m=m,
+        rfm_score=r * 100 + f * 10 + m,
+        segment=assign_segments(r, f, m),
+    )
+
+
+def score_full(customer_ids: np.ndarray, invoice_days: np.ndarray, total_prices: np.ndarray,
+               reference_date: date) -> Tuple[RFMScores, RFMEdges]:
+    """Scores every customer against the quintiles of the whole population."""
+    customers, recency, frequency, monetary = aggregate_transactions(
+        customer_ids, invoice_days, total_prices, int(to_day_numbers([reference_date])[0])
+    )
+    frequency_ranks = first_ranks(frequency, customers)
+    rank_edges = quintile_edges(frequency_ranks)
+    edges = RFMEdges(
+        reference_date=reference_date,
+        recency=quintile_edges(recency),
+        # Frequency is cut on its ranks; the frequency found at each rank edge is kept
+        # so that incremental runs can place new frequencies without re-ranking everyone.
+        frequency=np.interp(rank_edges, np.arange(1, len(frequency) + 1), np.sort(frequency).astype(np.float64)),
+        monetary=quintile_edges(monetary),
+    )
+    r = 5 - quintile_index(recency, edges.recency)
+    f = quintile_index(frequency_ranks, rank_edges) + 1
+    m = quintile_index(monetary, edges.monetary) + 1
+    return _scores(customers, recency, frequency, monetary, r, f, m), edges
+
+
+def score_incremental(customer_ids: np.ndarray, invoice_days: np.ndarray, total_prices: np.ndarray,
+                      edges: RFMEdges) -> RFMScores:
+    """Scores the customers of the given transactions against the frozen edges of the last full run.
+    The transactions must cover each of these customers' whole history."""
+    customers, recency, frequency, monetary = aggregate_transactions(
+        customer_ids, invoice_days, total_prices, int(to_day_numbers([edges.reference_date])[0])
+    )
+    r = 5 - quintile_index(recency, edges.recency)
+    f = quintile_index(frequency, edges.frequency) + 1
+    m = quintile_index(monetary, edges.monetary) + 1
+    return _scores(customers, recency, frequency, monetary, r, f, m)
+
+
+class RFMEngine:
+    """Loads transactions as columnar arrays, scores them and bulk-upserts the result into `rfm`."""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+
+    def run_full(self, reference_date: Optional[date] = None) -> Dict[str, Any]:
+        started = time.perf_counter()
+        reference_date = reference_date or _default_reference_date()
+        with self._connection() as connection:
+            watermark = self._transactions_watermark(connection)
+            customer_ids, invoice_days, total_prices = self._load_transactions(connection)
+            loaded = time.perf_counter()
+            if len(customer_ids) == 0:
+                return {"mode": "full", "transactions": 0, "customers": 0}
+
+            scores, edges = score_full(customer_ids, invoice_days, total_prices, reference_date)
+            scored = time.perf_counter()
+            self._upsert_scores(connection, scores)
+            self._save_state(connection, edges, watermark)
+            connection.commit()
+        return self._report("full", len(customer_ids), scores, started, loaded, scored)
+
+    def run_incremental(self, customer_ids: Optional[List[int]] = None) -> Dict[str, Any]:
+        started = time.perf_counter()
+        with self._connection() as connection:
+            edges, watermark = self._load_state(connection)
+            if edges is None:
+                raise RuntimeError("No full RFM run has been stored yet; run with --mode full first.")
+            new_watermark = self._transactions_watermark(connection)
+            if customer_ids is None:
+                customer_ids = self._customers_since(connection, watermark)
+            if not customer_ids:
+                return {"mode": "incremental", "transactions": 0, "customers": 0}
+
+            transaction_customers, invoice_days, total_prices = self._load_transactions(connection, customer_ids)
+            loaded = time.perf_counter()
+            scores = score_incremental(transaction_customers, invoice_days, total_prices, edges)
+            scored = time.perf_counter()
+            self._upsert_scores(connection, scores)
+            self._save_state(connection, edges, new_watermark, update_edges=False)
+            connection.commit()
+        return self._report("incremental", len(transaction_customers), scores, started, loaded, scored)
+
+    # --- Database access (psycopg connection of the SQLAlchemy engine) ---
+
+    @contextmanager
+    def _connection(self) -> Iterator[Any]:
+        connection = self.engine.raw_connection()
+        try:
+            yield connection.driver_connection
+        finally:
+            # Back to the pool; anything left uncommitted is rolled back.
+            connection.close()
+
+    @staticmethod
+    def _load_transactions(connection, customer_ids: Optional[List[int]] = None):
+        query = (
+            'SELECT "Customer ID", ("InvoiceDate" AT TIME ZONE \'UTC\')::date - DATE \'1970-01-01\', '
+            'coalesce("TotalPrice", 0) FROM transactions '
+            'WHERE "Customer ID" IS NOT NULL AND "InvoiceDate" IS NOT NULL'
+        )
+        params = None
+        if customer_ids is not None:
+            query += ' AND "Customer ID" = ANY(%s)'
+            params = (list(customer_ids),)
+        with connection.cursor() as cursor:
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+        if not rows:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, np.empty(0, dtype=np.float64)
+        customers, days, prices = zip(*rows)
+        return (np.array(customers, dtype=np.int64), np.array(days, dtype=np.int64),
+                np.array(prices, dtype=np.float64))
+
+    @staticmethod
+    def _transactions_watermark(connection) -> Optional[datetime]:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT max("InvoiceDate") FROM transactions')
+            return cursor.fetchone()[0]
+
+    @staticmethod
+    def _customers_since(connection, watermark: Optional[datetime]) -> List[int]:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT DISTINCT "Customer ID" FROM transactions '
+                'WHERE "Customer ID" IS NOT NULL AND (%s::timestamptz IS NULL OR "InvoiceDate" > %s)',
+                (watermark, watermark),
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    @staticmethod
+    def _upsert_scores(connection, scores: RFMScores) -> None:
+        """Upserts all the scores with a single INSERT ... SELECT FROM unnest(arrays), and has the
+        marketing servers drop their cached `rfm` results once the transaction commits."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO rfm ("Customer ID", recency, frequency, monetary, "R", "F", "M", "RFM_Score", "Segment")
+                SELECT * FROM unnest(%s::bigint[], %s::bigint[], %s::bigint[], %s::double precision[],
+                                     %s::bigint[], %s::bigint[], %s::bigint[], %s::bigint[], %s::text[])
+                ON CONFLICT ("Customer ID") DO UPDATE SET
+                    recency = excluded.recency,
+                    frequency = excluded.frequency,
+                    monetary = excluded.monetary,
+                    "R" = excluded."R",
+                    "F" = excluded."F",
+                    "M" = excluded."M",
+                    "RFM_Score" = excluded."RFM_Score",
+                    "Segment" = excluded."Segment"
+                """,
+                (
+                    scores.customer_ids.tolist(), scores.recency.tolist(), scores.frequency.tolist(),
+                    scores.monetary.tolist(), scores.r.tolist(), scores.f.tolist(), scores.m.tolist(),
+                    scores.rfm_score.tolist(), scores.segment.tolist(),
+                ),
+            )
+            cursor.execute("SELECT pg_notify(%s, 'rfm')", (QUERY_CACHE_INVALIDATION_CHANNEL,))
+
+    @staticmethod
+    def _load_state(connection):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reference_date, recency_edges, frequency_edges, monetary_edges, transactions_watermark "
+                "FROM rfm_scoring_state WHERE id = 1"
+            )
+            row = cursor.fetchone()
+        if row is None:
+            return None, None
+        edges = RFMEdges(row[0], np.array(row[1]), np.array(row[2]), np.array(row[3]))
+        return edges, row[4]
+
+    @staticmethod
+    def _save_state(connection, edges: RFMEdges, watermark: Optional[datetime], update_edges: bool = True) -> None:
+        with connection.cursor() as cursor:
+            if not update_edges:
+                cursor.execute(
+                    "UPDATE rfm_scoring_state SET transactions_watermark = %s, scored_at = now() WHERE id = 1",
+                    (watermark,),
+                )
+                return
+            cursor.execute(
+                """
+                INSERT INTO rfm_scoring_state
+                    (id, reference_date, recency_edges, frequency_edges, monetary_edges, transactions_watermark, scored_at)
+                VALUES (1, %s, %s, %s, %s, %s, now())
+                ON CONFLICT (id) DO UPDATE SET
+                    reference_date = excluded.reference_date,
+                    recency_edges = excluded.recency_edges,
+                    frequency_edges = excluded.frequency_edges,
+                    monetary_edges = excluded.monetary_edges,
+                    transactions_watermark = excluded.transactions_watermark,
+                    scored_at = excluded.scored_at
+                """,
+                (edges.reference_date, edges.recency.tolist(), edges.frequency.tolist(),
+                 edges.monetary.tolist(), watermark),
+            )
+
+    @staticmethod
+    def _report(mode: str, transactions: int, scores: RFMScores,
+                started: float, loaded: float, scored: float) -> Dict[str, Any]:
+        segments, counts = np.unique(scores.segment, return_counts=True)
+        return {
+            "mode": mode,
+            "transactions": transactions,
+            "customers": len(scores),
+            "segments": dict(zip(segments.tolist(), counts.tolist())),
+            "load_seconds": round(loaded - started, 3),
+            "score_seconds": round(scored - loaded, 3),
+            "upsert_seconds": round(time.perf_counter() - scored, 3),
+        }
+
+
+def _default_reference_date() -> date:
+    configured = get_settings().RFM_REFERENCE_DATE
+    return date.fromisoformat(configured) if configured else datetime.now(timezone.utc).date()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["full", "incremental"], default="incremental")
+    parser.add_argument("--reference-date", type=date.fromisoformat, default=None,
+                        help="Full runs only; defaults to RFM_REFERENCE_DATE, then today.")
+    parser.add_argument("--customer-ids", type=int, nargs="+", default=None,
+                        help="Incremental runs only; defaults to the customers with new transactions.")
+    args = parser.parse_args()
+
+    db_engine, _ = setup_database_engine(get_settings().SUPABASE_URI)
+    try:
+        rfm_engine = RFMEngine(db_engine)
+        if args.mode == "full":
+            report = rfm_engine.run_full(reference_date=args.reference_date)
+        else:
+            report = rfm_engine.run_incremental(customer_ids=args.customer_ids)
+        print(report)
+    finally:
+        db_engine.dispose()
@@ -0,0 +1,249 @@
+"""
+Loads the CSVs of src/Assets/Data into the CRM tables
+(created by src/Migrations/migration_runner.py).
+
+Each table is loaded on its own connection, in parallel with the others:
+1. The CSV is streamed in chunks with COPY into a temporary staging table, which has
+   no indexes or constraints and is not WAL-logged.
+2. The table's secondary indexes are dropped.
+3. The staged rows are upserted on the table's primary key (the last row wins on
+   duplicates), so running the loader again only updates what changed. For the
+   partitioned transactions table, the monthly partitions the rows need are created first.
+4. The indexes are re-created and the table is analyzed.
+All of it runs in one transaction per table: a failed load leaves the table untouched.
+
+Usage:
+    python -m src.Assets.bulk_loader [--tables customers transactions] [--data-dir path] [--workers 4]
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from psycopg import sql
+from sqlalchemy.engine import Engine
+
+from src.Authentication.database import setup_database_engine
+from src.Helpers.config import get_settings
+from src.MCP.Servers.query_result_cache import QUERY_CACHE_INVALIDATION_CHANNEL
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "Data")
+COPY_CHUNK_BYTES = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class TableSpec:
+    """A CSV file and the table it is upserted into. `partition_column` names the range
+    partition key of a table partitioned with a `create_<table>_partitions` function."""
+    table: str
+    csv_file: str
+    partition_column: Optional[str] = None
+
+
+TABLES: Dict[str, TableSpec] = {
+    "customers": TableSpec("customers", "customers.csv"),
+    "items": TableSpec("items", "items.csv"),
+    "transactions": TableSpec("transactions", "transactions.csv", partition_column="InvoiceDate"),
+    "rfm": TableSpec("rfm", "rfm.csv"),
+}
+
+
+@dataclass
+class LoadReport:
+    table: str
+    rows_copied: int
+    rows_upserted: int  # inserted or changed; rows that were already up to date are not counted
+    copy_seconds: float
+    upsert_seconds: float
+    index_seconds: float
+
+    @property
+    def total_seconds(self) -> float:
+        return self.copy_seconds + self.upsert_seconds + self.index_seconds
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_copied / self.total_seconds if self.total_seconds else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.table:<14} rows={self.rows_copied:<10,} written={self.rows_upserted:<10,} "
+            f"copy={self.copy_seconds:.2f}s upsert={self.upsert_seconds:.2f}s indexes={self.index_seconds:.2f}s "
+            f"-> {self.rows_per_second:,.0f} rows/s"
+        )
+
+
+class BulkLoader:
+    """Streams CSVs into Postgres with COPY, one connection (and thread) per table."""
+
+    def __init__(self, engine: Engine, data_dir: str = DATA_DIR, chunk_bytes: int = COPY_CHUNK_BYTES,
+                 work_mem: str = "256MB"):
+        self.engine = engine
+        self.data_dir = data_dir
+        self.chunk_bytes = chunk_bytes
+        self.work_mem = work_mem
+
+    def load(self, tables: Optional[List[str]] = None, workers: int = 4) -> List[LoadReport]:
+        specs = [TABLES[name] for name in (tables or TABLES)]
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(specs)))) as executor:
+            return list(executor.map(self.load_table, specs))
+
+    def load_table(self, spec: TableSpec) -> LoadReport:
+        path = os.path.join(self.data_dir, spec.csv_file)
+        pooled_connection = self.engine.raw_connection()
+        try:
+            connection = pooled_connection.driver_connection
+            with connection.transaction(), connection.cursor() as cursor:
+                # CSV timestamps carry no offset: read them as UTC.
+                cursor.execute("SET LOCAL TIME ZONE 'UTC'")
+                # A failed load is simply re-run, so the commit needn't wait for the WAL flush;
+                # the extra memory keeps the de-duplication sort and index builds off disk.
+                cursor.execute("SET LOCAL synchronous_commit = off")
+                cursor.execute(sql.SQL("SET LOCAL work_mem = {}").format(sql.Literal(self.work_mem)))
+                cursor.execute(sql.SQL("SET LOCAL maintenance_work_mem = {}").format(sql.Literal(self.work_mem)))
+                started = time.perf_counter()
+                columns, rows_copied = self._copy_to_staging(cursor, spec, path)
+                copied = time.perf_counter()
+
+                self._create_partitions(cursor, spec)
+                indexes = self._drop_secondary_indexes(cursor, spec.table)
+                rows_upserted = self._upsert_from_staging(cursor, spec, columns, self._key_columns(cursor, spec.table))
+                # Delivered at commit: the marketing servers then drop their cached results of the table.
+                cursor.execute("SELECT pg_notify(%s, %s)", (QUERY_CACHE_INVALIDATION_CHANNEL, spec.table))
+                upserted = time.perf_counter()
+
+                for index_definition in indexes:
+                    cursor.execute(index_definition)
+                cursor.execute(sql.SQL("ANALYZE {}").format(sql.Identifier(spec.table)))
+                finished = time.perf_counter()
+        finally:
+            pooled_connection.close()
+
+        return LoadReport(spec.table, rows_copied, rows_upserted,
+                          copied - started, upserted - copied, finished - upserted)
+
+    def _copy_to_staging(self, cursor, spec: TableSpec, path: str):
+        staging = sql.Identifier(f"staging_{spec.table}")
+        cursor.execute(sql.SQL(
+            "CREATE TEMP TABLE {} (LIKE {} INCLUDING DEFAULTS) ON COMMIT DROP"
+        ).format(staging, sql.Identifier(spec.table)))
+
+        with open(path, "rb") as csv_file:
+            header = csv_file.readline().decode("utf-8-sig").strip()
+            columns = [column.strip().strip('"') for column in header.split(",")]
+            copy_statement = sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv)").format(
+                staging, sql.SQL(", ").join(map(sql.Identifier, columns))
+            )
+            with cursor.copy(copy_statement) as copy:
+                while chunk := csv_file.read(self.chunk_bytes):
+                    copy.write(chunk)
+        return columns, cursor.rowcount
+
+    @staticmethod
+    def _create_partitions(cursor, spec: TableSpec) -> None:
+        """Creates the partitions covering the staged rows, if the table is partitioned."""
+        if spec.partition_column is None:
+            return
+        function_name = f"create_{spec.table}_partitions"
+        cursor.execute("SELECT to_regproc(%s)", (f"public.{function_name}",))
+        if cursor.fetchone()[0] is None:
+            return
+        cursor.execute(sql.SQL("SELECT {}(min({column}), max({column})) FROM {}").format(
+            sql.Identifier("public", function_name),
+            sql.Identifier(f"staging_{spec.table}"),
+            column=sql.Identifier(spec.partition_column),
+        ))
+
+    @staticmethod
+    def _key_columns(cursor, table: str) -> List[str]:
+        cursor.execute(
+            """
+            SELECT a.attname
+            FROM pg_constraint c
+            CROSS JOIN LATERAL unnest(c.conkey) WITH ORDINALITY AS k(attnum, position)
+            JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = k.attnum
+            WHERE c.conrelid = %s::regclass AND c.contype = 'p'
+            ORDER BY k.position
+            """,
+            (f"public.{table}",),
+        )
+        key_columns = [row[0] for row in cursor.fetchall()]
+        if not key_columns:
+            raise ValueError(f"Table {table} has no primary key to upsert on.")
+        return key_columns
+
+    @staticmethod
+    def _drop_secondary_indexes(cursor, table: str) -> List[str]:
+        """Drops the indexes that don't back a constraint and returns their definitions
+        (those of a partitioned table, which cascade to its partitions, included)."""
+        cursor.execute(
+            """
+            SELECT i.indexrelid::regclass::text, pg_get_indexdef(i.indexrelid)
+            FROM pg_index i
+            WHERE i.indrelid = %s::regclass
+              AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid)
+            """,
+            (f"public.{table}",),
+        )
+        indexes = cursor.fetchall()
+        for name, _ in indexes:
+            cursor.execute(f"DROP INDEX {name}")
+        # The definition of a partitioned index reads "ON ONLY", which would skip the partitions.
+        return [definition.replace(" ON ONLY ", " ON ", 1) for _, definition in indexes]
+
+    @staticmethod
+    def _upsert_from_staging(cursor, spec: TableSpec, columns: List[str], key_columns: List[str]) -> int:
+        keys = sql.SQL(", ").join(map(sql.Identifier, key_columns))
+        updates = [column for column in columns if column not in key_columns]
+        # Rows that are already up to date are skipped, so a re-run writes (almost) nothing.
+        on_conflict = sql.SQL("DO NOTHING") if not updates else sql.SQL(
+            "DO UPDATE SET {assignments} WHERE ({current}) IS DISTINCT FROM ({incoming})"
+        ).format(
+            assignments=sql.SQL(", ").join(
+                sql.SQL("{0} = excluded.{0}").format(sql.Identifier(column)) for column in updates
+            ),
+            current=sql.SQL(", ").join(sql.Identifier(spec.table, column) for column in updates),
+            incoming=sql.SQL(", ").join(sql.Identifier("excluded", column) for column in updates),
+        )
+        # DISTINCT ON keeps one row per key (the last one of the file), since an upsert
+        # cannot touch the same row twice.
+        cursor.execute(sql.SQL(
+            """
+            INSERT INTO {table} ({columns})
+            SELECT DISTINCT ON ({keys}) {columns}
+            FROM (SELECT *, row_number() OVER () AS file_position FROM {staging}) staged
+            ORDER BY {keys}, file_position DESC
+            ON CONFLICT ({keys}) {on_conflict}
+            """
+        ).format(
+            table=sql.Identifier(spec.table),
+            staging=sql.Identifier(f"staging_{spec.table}"),
+            columns=sql.SQL(", ").join(map(sql.Identifier, columns)),
+            keys=keys,
+            on_conflict=on_conflict,
+        ))
+        return cursor.rowcount
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tables", nargs="+", choices=list(TABLES), default=None)
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--chunk-bytes", type=int, default=COPY_CHUNK_BYTES)
+    args = parser.parse_args()
+
+    db_engine, _ = setup_database_engine(get_settings().SUPABASE_URI)
+    try:
+        loader = BulkLoader(db_engine, data_dir=args.data_dir, chunk_bytes=args.chunk_bytes)
+        started = time.perf_counter()
+        reports = loader.load(tables=args.tables, workers=args.workers)
+        elapsed = time.perf_counter() - started
+        for report in reports:
+            print(report)
+        total_rows = sum(report.rows_copied for report in reports)
+        print(f"{'total':<14} rows={total_rows:<10,} in {elapsed:.2f}s -> {total_rows / elapsed:,.0f} rows/s")
+    finally:
+        db_engine.dispose()
@@ -1,11 +1,40 @@
 """
 This module provides functions to manage the database connection lifecycle
 for standalone scripts and services.
+
+Two engine flavours are available, both configured from the same pool settings:
+- `setup_database_engine`: the synchronous engine (psycopg) with a `Session` factory.
+- `setup_async_database_engine`: an asyncio engine (asyncpg) with an `AsyncSession` factory.
 """
 import sys
-from sqlalchemy import create_engine
+from contextlib import asynccontextmanager
+from enum import Enum
+from typing import Any, AsyncIterator, Callable, Dict
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
+from src.Helpers.config import get_settings, Settings
+
+
+class DatabaseDriverMode(str, Enum):
+    SYNC = "sync"
+    ASYNC = "async"
+
+
+def _pool_options(settings: Settings) -> Dict[str, Any]:
+    """Connection pool options shared by the sync and async engines."""
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
 def setup_database_engine(db_uri: str):
     """
     Creates and returns the SQLAlchemy engine and a Session factory.
@@ -14,16 +43,94 @@ def setup_database_engine(db_uri: str):
     if not db_uri:
         print("FATAL: Database URI is not configured.", file=sys.stderr)
         sys.exit(1)
-        
+
+    settings = get_settings()
     try:
-        engine = create_engine(db_uri)
+        connect_args = {}
+        if make_url(db_uri).get_backend_name() == "postgresql":
+            connect_args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+
+        engine = create_engine(db_uri, connect_args=connect_args, **_pool_options(settings))
         # Test connection on startup
         with engine.connect() as connection:
             print("Database engine created and connection successful.")
-        
+
         SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
         return engine, SessionLocal
     except Exception as e:
         print(f"FATAL: Failed to connect to database using the provided URI.", file=sys.stderr)
         print(f"Error: {e}", file=sys.stderr)
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
+
+
+def setup_async_database_engine(db_uri: str):
+    """
+    Creates and returns an asyncio SQLAlchemy engine (asyncpg) and an AsyncSession factory.
+    The connection is checked with `verify_async_database_connection` once an event loop runs.
+    Exits the program if the URI is missing or invalid.
+    """
+    if not db_uri:
+        print("FATAL: Database URI is not configured.", file=sys.stderr)
+        sys.exit(1)
+
+    settings = get_settings()
+    try:
+        url = make_url(db_uri).set(drivername="postgresql+asyncpg")
+        connect_args: Dict[str, Any] = {
+            "server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+        }
+        # asyncpg doesn't understand libpq's `sslmode` query parameter, it takes `ssl` instead
+        if "sslmode" in url.query:
+            connect_args["ssl"] = url.query["sslmode"]
+            url = url.difference_update_query(["sslmode"])
+
+        engine = create_async_engine(url, connect_args=connect_args, **_pool_options(settings))
+        AsyncSessionLocal = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+        return engine, AsyncSessionLocal
+    except Exception as e:
+        print(f"FATAL: Failed to create the async database engine using the provided URI.", file=sys.stderr)
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+async def verify_async_database_connection(engine: AsyncEngine) -> None:
+    """Tests the async engine's connection. Exits the program if the connection fails."""
+    try:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+        print("Async database engine created and connection successful.")
+    except Exception as e:
+        print(f"FATAL: Failed to connect to database using the provided URI.", file=sys.stderr)
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+@asynccontextmanager
+async def listen_for_notifications(engine: AsyncEngine, channel: str,
+                                   callback: Callable[[str], None]) -> AsyncIterator[None]:
+    """
+    Holds one connection of the async engine that LISTENs on `channel` for the lifetime of
+    the context, calling `callback(payload)` for every NOTIFY sent to it.
+    """
+    async with engine.connect() as connection:
+        driver_connection = (await connection.get_raw_connection()).driver_connection
+
+        def on_notification(_connection, _pid, _channel, payload):
+            callback(payload)
+
+        await driver_connection.add_listener(channel, on_notification)
+        try:
+            yield
+        finally:
+            if not driver_connection.is_closed():
+                await driver_connection.remove_listener(channel, on_notification)
+
+
+def get_pool_metrics(engine: Engine | AsyncEngine) -> Dict[str, Any]:
+    """Returns a snapshot of the engine's connection pool usage."""
+    pool = engine.sync_engine.pool if isinstance(engine, AsyncEngine) else engine.pool
+    metrics: Dict[str, Any] = {"pool_class": type(pool).__name__, "status": pool.status()}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        if hasattr(pool, name):
+            metrics[name] = getattr(pool, name)()
+    return metrics
@@ -0,0 +1,116 @@
+"""
+Compares the campaign subgraph's "personalized" and "template" modes on a synthetic audience.
+
+The LLM is a stand-in that answers after `--llm-latency-ms`, and the MCP tools return
+synthetic profiles and accept every email, so only the graph's own work and the number
+of completions are measured. The review is skipped (yolo mode).
+
+Usage:
+    python -m src.Benchmarks.campaign_email_benchmark --customers 500 --llm-latency-ms 800 --polish-rate 0.02
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import List
+
+from langchain_core.runnables import RunnableLambda
+from langchain_core.tools import StructuredTool
+
+from src.Agent.Graph.campaign_graph import CampaignGraph
+from src.Agent.Nodes.Campaign.email_template import EmailTemplate
+from src.Agent.State.campaign_state import CampaignState
+from src.Helpers.config import get_settings
+
+SEGMENTS = ["Champion", "Recent Customer", "Frequent Buyer", "Big Spender", "At Risk", "Others"]
+PRODUCTS = ["WHITE HANGING HEART T-LIGHT HOLDER", "JUMBO BAG RED RETROSPOT", "REGENCY CAKESTAND 3 TIER",
+            "PARTY BUNTING", "LUNCH BAG RED RETROSPOT", "SET OF 3 CAKE TINS PANTRY DESIGN"]
+
+
+class FakeEmailLLM:
+    """Writes a fixed email (or template) after a delay, and counts its completions."""
+
+    def __init__(self, latency_seconds: float):
+        self.latency_seconds = latency_seconds
+        self.completions = 0
+
+    def with_structured_output(self, schema):
+        async def complete(messages):
+            self.completions += 1
+            await asyncio.sleep(self.latency_seconds)
+            if schema is EmailTemplate:
+                return schema(subject="A little thank you, {{first_name}}",
+                              body="<p>Hi {{first_name}},</p><p>Still enjoying your {{last_product}} from "
+                                   "{{last_purchase_date}}? You might love {{recommendation}} too.</p>"
+                                   "<a href='https://shop.example.com/perks'>Claim your perk</a>")
+            prompt = messages[0].content
+            profile = json.loads(prompt.split("<CUSTOMER_PROFILE>")[1].split("</CUSTOMER_PROFILE>")[0])
+            first_name = profile["name"].split(" ")[0]
+            return schema(subject=f"A little thank you, {first_name}",
+                          body=f"<p>Hi {first_name},</p><a href='https://shop.example.com/perks'>Claim your perk</a>")
+
+        return RunnableLambda(complete)
+
+
+def _synthetic_profiles(customers: int) -> List[dict]:
+    rng = random.Random(0)
+    profiles = []
+    for number in range(customers):
+        items = rng.sample(PRODUCTS, 3)
+        profiles.append({
+            "customer_id": 10_000 + number,
+            "name": f"Customer{number} Example",
+            "rfm": {"segment": rng.choice(SEGMENTS)},
+            "last_purchase_at": "2011-11-0%dT10:00:00+00:00" % rng.randint(1, 9),
+            "top_items": [{"stock_code": str(index), "description": item} for index, item in enumerate(items)],
+            "last_item": {"stock_code": "0", "description": items[0]},
+        })
+    return profiles
+
+
+def _fake_tools(profiles: List[dict]) -> List[StructuredTool]:
+    profiles_by_id = {profile["customer_id"]: profile for profile in profiles}
+
+    async def get_customer_profiles(customer_ids: List[int]) -> str:
+        return json.dumps({"profiles": [profiles_by_id[customer_id] for customer_id in customer_ids],
+                           "not_found": []})
+
+    async def send_campaign_emails(campaign_id: str, emails: List[dict]) -> str:
+        return json.dumps({"campaign_id": campaign_id, "sent": len(emails), "failed": 0, "failures": []})
+
+    return [StructuredTool.from_function(coroutine=get_customer_profiles, name="get_customer_profiles",
+                                         description="Profiles."),
+            StructuredTool.from_function(coroutine=send_campaign_emails, name="send_campaign_emails",
+                                         description="Sends.")]
+
+
+async def main(customers: int, llm_latency_ms: float, polish_rate: float) -> None:
+    settings = get_settings()
+    profiles = _synthetic_profiles(customers)
+    print(f"{customers} customers in {len(SEGMENTS)} segments, {llm_latency_ms:.0f} ms per completion, "
+          f"{settings.CAMPAIGN_MAX_CONCURRENT_WORKERS} concurrent workers\n")
+
+    for mode in ["personalized", "template"]:
+        llm = FakeEmailLLM(llm_latency_ms / 1000)
+        campaign_graph = CampaignGraph(llm=llm, tools=_fake_tools(profiles), settings=settings).get_graph()
+        # Set once the graph is built: get_settings() reloads the shared settings from the environment.
+        settings.CAMPAIGN_POLISH_SAMPLE_RATE = polish_rate
+        state = CampaignState(campaign_id="00000000-0000-0000-0000-000000000000", campaign_type="loyalty",
+                              brief="Thank our customers.", customer_ids=[p["customer_id"] for p in profiles],
+                              mode=mode, yolo_mode=True)
+        started = time.perf_counter()
+        result = CampaignState(**await campaign_graph.ainvoke(
+            state, config={"max_concurrency": settings.CAMPAIGN_MAX_CONCURRENT_WORKERS}))
+        elapsed = time.perf_counter() - started
+        print(f"{mode:<14} completions={llm.completions:<6} sent={result.send_result['sent']:<6} "
+              f"polished={sum(1 for draft in result.polished if draft.is_valid):<4} wall={elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--customers", type=int, default=500)
+    parser.add_argument("--llm-latency-ms", type=float, default=800)
+    parser.add_argument("--polish-rate", type=float, default=0.02)
+    args = parser.parse_args()
+    asyncio.run(main(args.customers, args.llm_latency_ms, args.polish_rate))
@@ -0,0 +1,290 @@
+"""
+Load-tests /chat/invoke end to end, without OpenAI.
+
+The chat router runs in uvicorn, on a real socket, with the app's lifespan: the CRM graph
+is built with GENERATION_BACKEND="FAKE" (a scripted LLM: one `query` tool call per question,
+then an answer streamed at `--tokens-per-second`) and the real marketing MCP server, against
+the configured database or, with `--ephemeral-db`, a throwaway copy of it.
+
+With `--backend RECORD`, the responses of the CASSETTE_BACKEND provider (OpenAI unless set)
+are recorded to `--cassette`; `--backend REPLAY` then replays them, without any network call
+to the LLM, at their recorded pace divided by `--replay-speed`, so a regression run sees the
+same responses as its baseline.
+
+`--threads` conversations run concurrently, `--turns` questions each. The report has the
+p50/p95/p99 time to first byte and latency of the turns, the throughput and the peak RSS of
+the server and of the MCP server. It is saved as JSON; `--baseline` compares it to a previous one.
+
+Usage:
+    python -m src.Benchmarks.chat_load_benchmark --threads 20 --turns 3 --output before.json
+    python -m src.Benchmarks.chat_load_benchmark --threads 20 --turns 3 --baseline before.json
+    python -m src.Benchmarks.chat_load_benchmark --backend RECORD --cassette cassettes/load.jsonl.gz
+    python -m src.Benchmarks.chat_load_benchmark --backend REPLAY --cassette cassettes/load.jsonl.gz --replay-speed 5
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import socket
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+from uuid import uuid4
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+
+from src.Helpers.config import get_settings
+
+QUESTION = "How many customers are in each segment?"
+# Compared with --baseline: (path in the report, True when higher is better)
+COMPARED = [("ttfb_s.p50", False), ("ttfb_s.p95", False), ("ttfb_s.p99", False), ("latency_s.p50", False),
+            ("latency_s.p95", False), ("latency_s.p99", False), ("throughput_turns_per_s", True),
+            ("rss_mb.server_peak", False), ("errors", False)]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    values = sorted(values)
+    if not values:
+        return {"p50": None, "p95": None, "p99": None, "max": None}
+    nearest_rank = {p: values[max(0, math.ceil(p / 100 * len(values)) - 1)] for p in (50, 95, 99)}
+    return {"p50": nearest_rank[50], "p95": nearest_rank[95], "p99": nearest_rank[99], "max": values[-1]}
+
+
+def _rss_mb(pid: int) -> Optional[float]:
+    try:
+        with open(f"/proc/{pid}/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        return None
+
+
+def _children(pid: int) -> List[int]:
+    children = []
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as task_children:
+                children += [int(child) for child in task_children.read().split()]
+    except OSError:
+        pass
+    return children
+
+
+async def _sample_rss(peaks: Dict[str, float], interval: float = 0.1) -> None:
+    """Keeps the peak RSS of this process (the server) and of its children (the MCP server)."""
+    while True:
+        server = _rss_mb(os.getpid())
+        children = sum(_rss_mb(child) or 0.0 for child in _children(os.getpid()))
+        if server is not None:
+            peaks["server_peak"] = max(peaks.get("server_peak", 0.0), server)
+        peaks["mcp_peak"] = max(peaks.get("mcp_peak", 0.0), children)
+        await asyncio.sleep(interval)
+
+
+@contextmanager
+def _ephemeral_database(database_url: str) -> Iterator[str]:
+    """A copy of `database_url`'s database for the run, dropped afterwards. Postgres copies it
+    from its template, which must have no other connection meanwhile."""
+    url = make_url(database_url)
+    copy = f"{url.database}_load_{uuid4().hex[:8]}"
+    admin = create_engine(url.set(database="postgres"), isolation_level="AUTOCOMMIT")
+    with admin.connect() as connection:
+        connection.execute(text(f'CREATE DATABASE "{copy}" TEMPLATE "{url.database}"'))
+    print(f"Created the database {copy}.")
+    try:
+        yield url.set(database=copy).render_as_string(hide_password=False)
+    finally:
+        with admin.connect() as connection:
+            connection.execute(text(f'DROP DATABASE IF EXISTS "{copy}" WITH (FORCE)'))
+        admin.dispose()
+        print(f"Dropped the database {copy}.")
+
+
+@contextmanager
+def _same_database(database_url: str) -> Iterator[str]:
+    yield database_url
+
+
+def _configure(args) -> None:
+    # Read by get_settings() when the graph is built, so the scripted LLM, or a cassette, replaces OpenAI.
+    os.environ.update({
+        "GENERATION_BACKEND": args.backend,
+        "CASSETTE_PATH": args.cassette,
+        "CASSETTE_REPLAY_SPEED": str(args.replay_speed),
+        "FAKE_LLM_ANSWER_TOKENS": str(args.answer_tokens),
+        "FAKE_LLM_TOKENS_PER_SECOND": str(args.tokens_per_second),
+        "FAKE_LLM_TIME_TO_FIRST_TOKEN_SECONDS": str(args.time_to_first_token),
+        "LLM_CACHE_ENABLED": str(args.llm_cache).lower(),
+        "CHECKPOINTER_BACKEND": args.checkpointer,
+    })
+
+
+def _mcp_config(database_url: str) -> Dict[str, Any]:
+    """The marketing MCP server alone, run by this interpreter against `database_url`."""
+    from src.MCP import mcp_config
+    marketing = dict(mcp_config["mcpServers"]["marketing"])
+    marketing.update(command=sys.executable, env={**marketing.get("env", {}), "SUPABASE_URI": database_url})
+    return {"mcpServers": {"marketing": marketing}}
+
+
+async def _conversation(client: httpx.AsyncClient, run_id: str, user: int, args, turns: List[Dict[str, Any]]) -> None:
+    await asyncio.sleep(args.ramp_up * user / max(1, args.threads))
+    thread_id = f"load-{run_id}-{user}"
+    for turn in range(args.turns):
+        started = time.perf_counter()
+        sample = {"user": user, "turn": turn, "ttfb_s": None, "latency_s": None, "bytes": 0, "ok": False}
+        try:
+            async with client.stream("POST", "/chat/invoke", json={
+                "message": QUESTION, "thread_id": thread_id, "stream_format": args.stream_format,
+            }) as response:
+                async for chunk in response.aiter_raw():
+                    if chunk and sample["ttfb_s"] is None:
+                        sample["ttfb_s"] = time.perf_counter() - started
+                    sample["bytes"] += len(chunk)
+                    if b"event: error" in chunk:
+                        sample["error"] = chunk.decode(errors="replace")[:200]
+                sample["ok"] = response.status_code == 200 and "error" not in sample
+        except httpx.HTTPError as e:
+            sample["error"] = repr(e)
+        sample["latency_s"] = time.perf_counter() - started
+        turns.append(sample)
+        await asyncio.sleep(args.think_time)
+
+
+async def _run(args, database_url: str) -> Dict[str, Any]:
+    from main import lifespan
+    from src.MCP.mcp_session_pool import get_mcp_session_pool
+    from src.Routes import chat_route
+
+    # Created first, so the graph's tools use this MCP server and database.
+    get_mcp_session_pool(mcp_config=_mcp_config(database_url))
+    app = FastAPI(lifespan=lifespan)
+    app.include_router(chat_route.router)
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    startup_started = time.perf_counter()
+    while not server.started:
+        if serving.done():
+            raise RuntimeError("The server did not start.") from serving.exception()
+        await asyncio.sleep(0.05)
+    startup = time.perf_counter() - startup_started
+
+    rss = {"server_start": _rss_mb(os.getpid())}
+    sampler = asyncio.create_task(_sample_rss(rss))
+    turns: List[Dict[str, Any]] = []
+    run_id = uuid4().hex[:8]
+    limits = httpx.Limits(max_connections=args.threads, max_keepalive_connections=args.threads)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits,
+                                     timeout=httpx.Timeout(args.timeout)) as client:
+            started = time.perf_counter()
+            await asyncio.gather(*(_conversation(client, run_id, user, args, turns) for user in range(args.threads)))
+            wall = time.perf_counter() - started
+    finally:
+        sampler.cancel()
+        rss["server_end"] = _rss_mb(os.getpid())
+        server.should_exit = True
+        await serving
+
+    completed = [turn for turn in turns if turn["ok"]]
+    report = {
+        "benchmark": "chat_load",
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        "turns": len(turns),
+        "errors": len(turns) - len(completed),
+        "error_samples": [turn["error"] for turn in turns if "error" in turn][:5],
+        "startup_s": startup,
+        "wall_s": wall,
+        "throughput_turns_per_s": len(completed) / wall if wall else 0.0,
+        "ttfb_s": _percentiles([turn["ttfb_s"] for turn in completed if turn["ttfb_s"] is not None]),
+        "latency_s": _percentiles([turn["latency_s"] for turn in completed]),
+        "bytes_per_turn": sum(turn["bytes"] for turn in completed) / len(completed) if completed else 0,
+        "rss_mb": {key: round(value, 1) if value is not None else None for key, value in rss.items()},
+    }
+    if args.backend != "FAKE":
+        from src.Agent.LLM.llm_cassette import get_cassette
+        report["cassette"] = get_cassette(mode=args.backend).stats()
+    return report
+
+
+def _value(report: Dict[str, Any], path: str) -> Optional[float]:
+    for key in path.split("."):
+        report = report.get(key) if isinstance(report, dict) else None
+    return report
+
+
+def _compare(report: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    print(f"\nAgainst the baseline of {baseline.get('timestamp')}:")
+    for path, higher_is_better in COMPARED:
+        before, after = _value(baseline, path), _value(report, path)
+        if before is None or after is None:
+            continue
+        change = (after - before) / before * 100 if before else 0.0
+        better = (change > 0) == higher_is_better if change else None
+        verdict = "" if better is None else ("  better" if better else "  worse")
+        print(f"  {path:<24} {before:>10.3f} -> {after:>10.3f}  ({change:+.1f}%){verdict}")
+
+
+def main(args) -> None:
+    _configure(args)
+    database_url = args.database_url or get_settings().SUPABASE_URI
+    with (_ephemeral_database(database_url) if args.ephemeral_db else _same_database(database_url)) as database_url:
+        report = asyncio.run(_run(args, database_url))
+
+    print(f"\n{report['turns']} turns ({args.threads} conversations x {args.turns}), {report['errors']} errors, "
+          f"{report['throughput_turns_per_s']:.2f} turns/s")
+    for name in ["ttfb_s", "latency_s"]:
+        values = report[name]
+        print(f"  {name:<10} " + " ".join(f"{key}={value:.3f}" for key, value in values.items() if value is not None))
+    print(f"  rss_mb     {json.dumps(report['rss_mb'])}")
+    if "cassette" in report:
+        print(f"  cassette   {json.dumps(report['cassette'])}")
+    for error in report["error_samples"]:
+        print(f"  error: {error}")
+
+    output = args.output or f"chat_load_{datetime.now():%Y%m%d_%H%M%S}.json"
+    with open(output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Saved to {output}.")
+    if args.baseline:
+        with open(args.baseline) as file:
+            _compare(report, json.load(file))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=20, help="concurrent conversations")
+    parser.add_argument("--turns", type=int, default=3, help="questions per conversation")
+    parser.add_argument("--think-time", type=float, default=0.0, help="seconds between the turns of a conversation")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="seconds over which the conversations start")
+    parser.add_argument("--backend", choices=["FAKE", "RECORD", "REPLAY"], default="FAKE",
+                        help="the scripted LLM, or a recording (or replay) of CASSETTE_BACKEND's responses")
+    parser.add_argument("--cassette", default=get_settings().CASSETTE_PATH, help="the cassette file")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="REPLAY: pace multiplier, 0 for no delays")
+    parser.add_argument("--tokens-per-second", type=float, default=100.0)
+    parser.add_argument("--answer-tokens", type=int, default=200)
+    parser.add_argument("--time-to-first-token", type=float, default=0.3)
+    parser.add_argument("--stream-format", choices=["text", "sse"], default="sse")
+    parser.add_argument("--checkpointer", choices=["memory", "postgres", "sqlite"], default="memory")
+    parser.add_argument("--llm-cache", action="store_true", help="keep the LLM response cache on")
+    parser.add_argument("--database-url", help="the marketing server's database, default SUPABASE_URI")
+    parser.add_argument("--ephemeral-db", action="store_true", help="run against a throwaway copy of the database")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--output", help="the JSON report, default chat_load_<timestamp>.json")
+    parser.add_argument("--baseline", help="a previous JSON report to compare with")
+    main(parser.parse_args())
@@ -0,0 +1,123 @@
+"""
+A local stand-in for the OpenAI chat completions API, to exercise the LLM gateway offline.
+
+POST /v1/chat/completions answers `--tokens` tokens after `--latency` seconds, streamed
+(SSE, like OpenAI) or not. Past `--capacity` concurrent completions, or `--rpm` requests in
+the last minute, it answers 429 with a Retry-After header, like a rate-limited account.
+GET /stats returns what it served, including the TCP connections opened by the clients.
+
+Point the app at it with OPENAI_API_URL=http://127.0.0.1:8100/v1.
+
+Usage:
+    python -m src.Benchmarks.fake_openai_server --port 8100 --capacity 8 --latency 0.5
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+class FakeOpenAIServer:
+    """The server's limits and counters; `app` is the ASGI app."""
+
+    def __init__(self, latency: float, tokens: int, capacity: int, rpm: int = 0, retry_after: float = 1.0):
+        self.latency = latency
+        self.tokens = tokens
+        self.capacity = capacity
+        self.rpm = rpm
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.completions = 0
+        self.rejected = 0
+        self.connections = set()
+        self._recent = deque()
+        self.app = FastAPI()
+        self.app.post("/v1/chat/completions")(self.chat_completions)
+        self.app.get("/stats")(self.stats)
+
+    def reset(self) -> None:
+        self.max_in_flight, self.completions, self.rejected = self.in_flight, 0, 0
+        self.connections = set()
+        self._recent.clear()
+
+    def stats(self):
+        return {"completions": self.completions, "rejected": self.rejected, "max_in_flight": self.max_in_flight,
+                "connections": len(self.connections)}
+
+    async def chat_completions(self, request: Request):
+        self.connections.add((request.client.host, request.client.port) if request.client else None)
+        body = await request.json()
+        now = time.monotonic()
+        while self._recent and self._recent[0] < now - 60:
+            self._recent.popleft()
+        if self.in_flight >= self.capacity or (self.rpm and len(self._recent) >= self.rpm):
+            self.rejected += 1
+            return JSONResponse(status_code=429, headers={"retry-after": f"{self.retry_after:g}"},
+                                content={"error": {"message": "Rate limit reached.", "type": "requests",
+                                                   "code": "rate_limit_exceeded"}})
+        self._recent.append(now)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+        model = body.get("model", "fake")
+        words = [f"word{index} " for index in range(self.tokens)]
+        if body.get("stream"):
+            return StreamingResponse(self._stream(model, words), media_type="text/event-stream")
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self._finish()
+        return {
+            "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()), "model": model,
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": "".join(words)}}],
+            "usage": self._usage(body, len(words)),
+        }
+
+    async def _stream(self, model: str, words):
+        try:
+            await asyncio.sleep(self.latency)
+            chunk = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()),
+                     "model": model}
+            yield self._event({**chunk, "choices": [{"index": 0, "delta": {"role": "assistant", "content": ""}}]})
+            for word in words:
+                yield self._event({**chunk, "choices": [{"index": 0, "delta": {"content": word}}]})
+            yield self._event({**chunk, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+            yield "data: [DONE]\n\n"
+        finally:
+            self._finish()
+
+    def _finish(self) -> None:
+        self.in_flight -= 1
+        self.completions += 1
+
+    @staticmethod
+    def _event(data) -> str:
+        return f"data: {json.dumps(data)}\n\n"
+
+    @staticmethod
+    def _usage(body, completion_tokens: int):
+        prompt_tokens = len(json.dumps(body.get("messages", []))) // 4
+        return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--tokens", type=int, default=50)
+    parser.add_argument("--capacity", type=int, default=8)
+    parser.add_argument("--rpm", type=int, default=0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    args = parser.parse_args()
+    server = FakeOpenAIServer(latency=args.latency, tokens=args.tokens, capacity=args.capacity, rpm=args.rpm,
+                              retry_after=args.retry_after)
+    uvicorn.run(server.app, host="127.0.0.1", port=args.port)
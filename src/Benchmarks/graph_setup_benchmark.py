@@ -0,0 +1,70 @@
+"""
+Measures the per-request graph setup latency of /chat/invoke.
+
+- "per-request build": what the route used to do, a fresh CRMGraph() plus
+  get_graph() for every request (LLM build, MCP tool discovery, compile).
+- "registry": the shared graph handed out by the GraphRegistry.
+
+Usage:
+    python -m src.Benchmarks.graph_setup_benchmark --iterations 5
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+from src.Agent.Graph.crm_graph import CRMGraph
+from src.Agent.Graph.graph_registry import GraphRegistry
+
+
+def _format_seconds(seconds: float) -> str:
+    if seconds >= 1:
+        return f"{seconds:.2f} s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.2f} µs"
+
+
+def _report(label: str, samples: List[float]) -> None:
+    print(
+        f"{label:<20} n={len(samples):<6} "
+        f"mean={_format_seconds(statistics.mean(samples)):<12} "
+        f"p50={_format_seconds(statistics.median(samples)):<12} "
+        f"max={_format_seconds(max(samples))}"
+    )
+
+
+async def _per_request_build(iterations: int) -> List[float]:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        crm_graph = CRMGraph()
+        await crm_graph.get_graph()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def _registry_lookup(iterations: int) -> List[float]:
+    graph_registry = GraphRegistry()
+    await graph_registry.start()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await graph_registry.get_graph()
+        samples.append(time.perf_counter() - start)
+    await graph_registry.shutdown()
+    return samples
+
+
+async def main(iterations: int, registry_iterations: int) -> None:
+    _report("per-request build", await _per_request_build(iterations))
+    _report("registry", await _registry_lookup(registry_iterations))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=5, help="Full graph builds to time.")
+    parser.add_argument("--registry-iterations", type=int, default=10_000, help="Registry lookups to time.")
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations, args.registry_iterations))
@@ -0,0 +1,134 @@
+"""
+Replays a day of repeated analytical questions against the assistant LLM, with and without
+the LLM response cache, and reports the hit rates and the time spent waiting on completions.
+
+The LLM is a stand-in streaming its answer after `--llm-latency-ms`; questions about a
+campaign are answered with a `create_campaign` call, which the cache must bypass. The
+semantic tier uses a bag-of-words embedding, so only word-level paraphrases match.
+
+Usage:
+    python -m src.Benchmarks.llm_cache_benchmark --questions 200 --llm-latency-ms 1500 --semantic-threshold 0.8
+"""
+import argparse
+import asyncio
+import random
+import re
+import time
+import zlib
+from typing import Any, AsyncIterator, List
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessageChunk, HumanMessage, SystemMessage, message_chunk_to_message
+from langchain_core.messages.tool import tool_call_chunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from src.Agent.LLM.LLMProviders.cached_provider import CachedChatModel
+from src.Agent.LLM.llm_response_cache import LLMResponseCache
+from src.Agent.Prompts.agent_prompts import agent_system_prompt
+from src.Helpers.config import get_settings
+
+# Each question comes in a few phrasings; the first one is the most common.
+QUESTIONS = [
+    ["Who are our champions?", "who are our champions", "Who are the champions?"],
+    ["What were the top products last month?", "Top products last month?", "what were top products last month"],
+    ["How many customers are at risk?", "How many customers are at risk right now?"],
+    ["What is the revenue by country?", "Show the revenue by country."],
+    ["Which customers have not bought anything in 90 days?", "Which customers haven't bought anything in 90 days?"],
+    ["Create a win-back campaign for at risk customers.", "Create a win back campaign for the at risk customers."],
+]
+TOOLS = [{"type": "function", "function": {"name": name, "description": name, "parameters": {"type": "object"}}}
+         for name in ("query", "create_campaign")]
+
+
+class FakeStreamingLLM(BaseChatModel):
+    """Streams a fixed answer after a delay: a `query` call, or `create_campaign` for campaigns."""
+    latency_seconds: float
+    completions: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-streaming"
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        self.completions += 1
+        await asyncio.sleep(self.latency_seconds)
+        question = messages[-1].content
+        if "campaign" in question.lower():
+            name, args = "create_campaign", '{"name": "Win back", "type": "winback", "description": "At risk"}'
+        else:
+            name, args = "query", '{"sql": "SELECT 1"}'
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[
+            tool_call_chunk(name=name, args=args, id=f"call_{self.completions}", index=0)]))
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", response_metadata={"finish_reason": "tool_calls"},
+                                                         chunk_position="last"))
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        response = None
+        async for chunk in self._astream(messages, stop=stop, **kwargs):
+            response = chunk.message if response is None else response + chunk.message
+        return ChatResult(generations=[ChatGeneration(message=message_chunk_to_message(response))])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        # The benchmark runs the model asynchronously; a synchronous call runs the same stream on its own loop.
+        return asyncio.run(self._agenerate(messages, stop=stop, **kwargs))
+
+
+class BagOfWordsEmbeddings(Embeddings):
+    """Embeds a text as its word counts over a hashed vocabulary."""
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        vector = [0.0] * 256
+        for word in re.findall(r"[a-z0-9']+", text.lower()):
+            vector[zlib.crc32(word.encode()) % 256] += 1.0
+        return vector
+
+
+async def _run(llm, questions: List[str]) -> float:
+    waited = 0.0
+    for question in questions:
+        started = time.perf_counter()
+        async for _ in llm.astream([SystemMessage(content=agent_system_prompt), HumanMessage(content=question)]):
+            pass
+        waited += time.perf_counter() - started
+    return waited
+
+
+async def main(questions: int, llm_latency_ms: float, semantic_threshold: float) -> None:
+    settings = get_settings()
+    rng = random.Random(0)
+    workload = []
+    for _ in range(questions):
+        phrasings = rng.choice(QUESTIONS)
+        workload.append(phrasings[0] if rng.random() < 0.6 else rng.choice(phrasings[1:]))
+    print(f"{questions} questions ({len(set(workload))} distinct phrasings), {llm_latency_ms:.0f} ms per completion\n")
+
+    runs = [
+        ("no cache", None),
+        ("exact", LLMResponseCache(max_entries=settings.LLM_CACHE_MAX_ENTRIES, ttl_seconds=3600,
+                                   bypass_tools=settings.LLM_CACHE_BYPASS_TOOLS)),
+        ("exact+semantic", LLMResponseCache(max_entries=settings.LLM_CACHE_MAX_ENTRIES, ttl_seconds=3600,
+                                            bypass_tools=settings.LLM_CACHE_BYPASS_TOOLS,
+                                            embeddings=BagOfWordsEmbeddings(),
+                                            similarity_threshold=semantic_threshold)),
+    ]
+    for name, cache in runs:
+        model = FakeStreamingLLM(latency_seconds=llm_latency_ms / 1000)
+        llm = model if cache is None else CachedChatModel(model=model, cache=cache)
+        waited = await _run(llm.bind(tools=TOOLS), workload)
+        stats = cache.stats() if cache else {}
+        print(f"{name:<15} completions={model.completions:<5} waited={waited:7.2f}s "
+              f"hit_rate={stats.get('hit_rate', 0.0):<7} exact={stats.get('exact_hits', 0):<4} "
+              f"semantic={stats.get('semantic_hits', 0):<4} bypassed={stats.get('bypassed', 0)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--llm-latency-ms", type=float, default=1500)
+    parser.add_argument("--semantic-threshold", type=float, default=0.8)
+    args = parser.parse_args()
+    asyncio.run(main(args.questions, args.llm_latency_ms, args.semantic_threshold))
@@ -0,0 +1,127 @@
+"""
+Sends a burst of streamed completions to the local fake OpenAI server, with and without the LLM gateway.
+
+The server accepts `--capacity` concurrent completions and answers 429 past that, like a
+rate-limited account. `--requests` completions are started at once:
+
+- "direct": ChatOpenAI as before, with the OpenAI client's own retries (`--direct-retries`).
+- "gateway": ChatOpenAI through an LLMGateway built from the app's settings, which queues
+  the burst, adapts its concurrency to the 429s and retries with jittered backoff.
+
+Usage:
+    python -m src.Benchmarks.llm_gateway_benchmark --requests 100 --capacity 8 --latency 0.5
+"""
+import argparse
+import asyncio
+import json
+import socket
+import statistics
+import time
+from typing import Any, Dict
+
+import httpx
+import uvicorn
+from langchain_core.messages import HumanMessage
+from langchain_openai import ChatOpenAI
+
+from src.Agent.LLM.llm_gateway import AdaptiveConcurrencyLimit, LLMGateway
+from src.Benchmarks.fake_openai_server import FakeOpenAIServer
+from src.Helpers.config import get_settings
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _gateway(args) -> LLMGateway:
+    settings = get_settings()
+    return LLMGateway(
+        requests_per_minute=settings.LLM_GATEWAY_REQUESTS_PER_MINUTE,
+        tokens_per_minute=settings.LLM_GATEWAY_TOKENS_PER_MINUTE,
+        concurrency=AdaptiveConcurrencyLimit(initial=settings.LLM_GATEWAY_INITIAL_CONCURRENCY,
+                                             minimum=settings.LLM_GATEWAY_MIN_CONCURRENCY,
+                                             maximum=settings.LLM_GATEWAY_MAX_CONCURRENCY,
+                                             latency_target_seconds=args.latency * 4),
+        max_retries=settings.LLM_GATEWAY_MAX_RETRIES,
+        backoff_base_seconds=settings.LLM_GATEWAY_BACKOFF_BASE_SECONDS,
+        backoff_max_seconds=settings.LLM_GATEWAY_BACKOFF_MAX_SECONDS,
+        default_completion_tokens=settings.LLM_GATEWAY_DEFAULT_COMPLETION_TOKENS,
+        limits=httpx.Limits(max_connections=settings.LLM_GATEWAY_MAX_CONNECTIONS,
+                            keepalive_expiry=settings.LLM_GATEWAY_KEEPALIVE_SECONDS),
+        timeout=httpx.Timeout(settings.LLM_GATEWAY_TIMEOUT_SECONDS, connect=5.0),
+    )
+
+
+async def _burst(mode: str, server: FakeOpenAIServer, base_url: str, args) -> Dict[str, Any]:
+    server.reset()
+    gateway = _gateway(args) if mode == "gateway" else None
+
+    async def complete(index: int):
+        # A new chat model per request, as every graph build creates its own.
+        if gateway:
+            llm = ChatOpenAI(api_key="fake", base_url=base_url, model="gpt-fake",
+                             http_async_client=gateway.http_client, max_retries=0)
+        else:
+            llm = ChatOpenAI(api_key="fake", base_url=base_url, model="gpt-fake", max_retries=args.direct_retries)
+        started = time.perf_counter()
+        try:
+            async for _ in llm.astream([HumanMessage(content=f"Summarize customer {index}.")]):
+                pass
+            return time.perf_counter() - started
+        except Exception:
+            return None
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(complete(index) for index in range(args.requests)))
+    wall = time.perf_counter() - started
+    completed = sorted(latency for latency in latencies if latency is not None)
+    result = {
+        "mode": mode,
+        "completed": len(completed),
+        "failed": args.requests - len(completed),
+        "p50_s": statistics.median(completed) if completed else None,
+        "p95_s": completed[int(0.95 * (len(completed) - 1))] if completed else None,
+        "wall_s": wall,
+        "server": server.stats(),
+    }
+    if gateway:
+        result["gateway"] = gateway.stats()
+        await gateway.aclose()
+    return result
+
+
+async def main(args) -> None:
+    server = FakeOpenAIServer(latency=args.latency, tokens=args.tokens, capacity=args.capacity,
+                              retry_after=args.retry_after)
+    port = _free_port()
+    uvicorn_server = uvicorn.Server(uvicorn.Config(server.app, host="127.0.0.1", port=port, log_level="warning"))
+    serving = asyncio.create_task(uvicorn_server.serve())
+    while not uvicorn_server.started:
+        await asyncio.sleep(0.05)
+
+    print(f"{args.requests} streamed completions at once, server capacity {args.capacity}, "
+          f"{args.latency:.2f}s per completion\n")
+    try:
+        for mode in ["direct", "gateway"]:
+            result = await _burst(mode, server, f"http://127.0.0.1:{port}/v1", args)
+            print(f"{mode:<8} completed={result['completed']:<4} failed={result['failed']:<4} "
+                  f"429s={result['server']['rejected']:<5} connections={result['server']['connections']:<4} "
+                  f"p50={result['p50_s'] or 0:.2f}s p95={result['p95_s'] or 0:.2f}s wall={result['wall_s']:.2f}s")
+            if "gateway" in result:
+                print(f"         gateway: {json.dumps(result['gateway'])}")
+    finally:
+        uvicorn_server.should_exit = True
+        await serving
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--capacity", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--tokens", type=int, default=50)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--direct-retries", type=int, default=2, help="the OpenAI client's default")
+    asyncio.run(main(parser.parse_args()))
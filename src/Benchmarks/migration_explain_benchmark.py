@@ -0,0 +1,163 @@
+"""
+Compares the plans of the agent's typical queries before and after the indexing and
+partitioning migrations (0004 and up).
+
+On an EMPTY scratch database, it:
+1. migrates to version 3 (the schema as it was before them) and loads the seed CSVs;
+2. multiplies the transactions `--scale` times (shifted invoice numbers, same dates) and
+   adds 10 x `--scale` campaigns that emailed every customer;
+3. runs EXPLAIN (ANALYZE, BUFFERS) of each query;
+4. migrates to the latest version and runs them again.
+
+Usage:
+    python -m src.Benchmarks.migration_explain_benchmark --database-uri postgresql://.../scratch --scale 50
+"""
+import argparse
+import json
+import time
+from typing import Dict, List, Tuple
+
+from sqlalchemy.engine import Engine
+
+from src.Assets.bulk_loader import BulkLoader
+from src.Authentication.database import setup_database_engine
+from src.Migrations.migration_runner import MigrationRunner
+
+BEFORE_VERSION = 3
+
+QUERIES: Dict[str, str] = {
+    "customer history": """
+        SELECT "Invoice", "InvoiceDate", "StockCode", "TotalPrice" FROM transactions
+        WHERE "Customer ID" = 17503 ORDER BY "InvoiceDate" DESC LIMIT 50
+    """,
+    "last purchase": """
+        SELECT max("InvoiceDate") FROM transactions WHERE "Customer ID" = 17503
+    """,
+    "monthly revenue": """
+        SELECT date_trunc('day', "InvoiceDate") AS day, sum("TotalPrice") FROM transactions
+        WHERE "InvoiceDate" >= '2011-03-01' AND "InvoiceDate" < '2011-04-01' GROUP BY 1
+    """,
+    "item buyers": """
+        SELECT DISTINCT "Customer ID" FROM transactions WHERE "StockCode" = '85123A'
+    """,
+    "campaign emails": """
+        SELECT customer_id, subject, sent_at FROM campaign_emails
+        WHERE campaign_id = (SELECT id FROM marketing_campaigns WHERE name = 'Benchmark campaign 00001')
+    """,
+    "customer emails": """
+        SELECT campaign_id, subject, sent_at FROM campaign_emails
+        WHERE customer_id = 17503 ORDER BY sent_at DESC LIMIT 5
+    """,
+}
+
+
+def _grow_dataset(engine: Engine, scale: int) -> None:
+    pooled_connection = engine.raw_connection()
+    try:
+        connection = pooled_connection.driver_connection
+        with connection.transaction(), connection.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO transactions
+                SELECT t."Invoice" + copy_number * 10000000, t."InvoiceDate", t."StockCode", t."Quantity",
+                       t."Price", t."TotalPrice", t."Customer ID"
+                FROM transactions t CROSS JOIN generate_series(1, %s) AS copy_number
+                """,
+                (scale - 1,),
+            )
+            # Campaigns that each emailed every customer, for the campaign_emails lookups.
+            cursor.execute(
+                """
+                INSERT INTO marketing_campaigns (name, type, created_at)
+                SELECT format('Benchmark campaign %%s', lpad(campaign_number::text, 5, '0')), 'loyalty',
+                       now() - campaign_number * interval '1 day'
+                FROM generate_series(1, 10 * %s) AS campaign_number
+                """,
+                (scale,),
+            )
+            cursor.execute(
+                """
+                INSERT INTO campaign_emails (campaign_id, customer_id, subject, body, sent_at)
+                SELECT m.id, c."Customer ID", 'Subject', 'Body', m.created_at
+                FROM marketing_campaigns m CROSS JOIN customers c
+                """
+            )
+            cursor.execute("ANALYZE")
+    finally:
+        pooled_connection.close()
+
+
+def _explain(engine: Engine) -> Dict[str, Tuple[str, float, int]]:
+    """Returns, per query: the top scan nodes, the execution time (ms) and the shared buffers touched."""
+    results = {}
+    pooled_connection = engine.raw_connection()
+    try:
+        connection = pooled_connection.driver_connection
+        with connection.cursor() as cursor:
+            for label, query in QUERIES.items():
+                cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}")
+                plan = cursor.fetchone()[0]
+                plan = plan if isinstance(plan, list) else json.loads(plan)
+                root = plan[0]["Plan"]
+                buffers = root.get("Shared Hit Blocks", 0) + root.get("Shared Read Blocks", 0)
+                results[label] = (_scan_summary(root), plan[0]["Execution Time"], buffers)
+            connection.rollback()
+    finally:
+        pooled_connection.close()
+    return results
+
+
+def _scan_summary(node: dict) -> str:
+    scans: List[str] = []
+
+    def visit(current: dict) -> None:
+        if "Scan" in current["Node Type"]:
+            scans.append(current["Node Type"])
+        for child in current.get("Plans", []):
+            visit(child)
+
+    visit(node)
+    unique_scans = sorted(set(scans))
+    summary = ", ".join(f"{scan} x{scans.count(scan)}" if scans.count(scan) > 1 else scan for scan in unique_scans)
+    return summary or node["Node Type"]
+
+
+def main(database_uri: str, scale: int) -> None:
+    engine, _ = setup_database_engine(database_uri)
+    try:
+        runner = MigrationRunner(engine)
+        if runner.status()[0]["applied_at"] is not None:
+            raise SystemExit("The benchmark needs an empty scratch database.")
+        runner.migrate(target=BEFORE_VERSION)
+        BulkLoader(engine).load()
+        _grow_dataset(engine, scale)
+        before = _explain(engine)
+
+        started = time.perf_counter()
+        runner.migrate()
+        print(f"Migrations after version {BEFORE_VERSION} took {time.perf_counter() - started:.2f}s.")
+        pooled_connection = engine.raw_connection()
+        try:
+            pooled_connection.driver_connection.autocommit = True
+            pooled_connection.driver_connection.execute("ANALYZE")
+            pooled_connection.driver_connection.autocommit = False
+        finally:
+            pooled_connection.close()
+        after = _explain(engine)
+    finally:
+        engine.dispose()
+
+    print(f"\n{'query':<18} {'before':<44} {'after':<44}")
+    for label in QUERIES:
+        (plan_before, ms_before, buffers_before), (plan_after, ms_after, buffers_after) = before[label], after[label]
+        print(f"{label:<18} {plan_before[:44]:<44} {plan_after[:44]:<44}")
+        print(f"{'':<18} {f'{ms_before:.2f} ms, {buffers_before} buffers':<44} "
+              f"{f'{ms_after:.2f} ms, {buffers_after} buffers':<44}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-uri", required=True, help="An empty scratch database: the benchmark fills it.")
+    parser.add_argument("--scale", type=int, default=50, help="How many times the seed transactions are repeated.")
+    args = parser.parse_args()
+    main(args.database_uri, args.scale)
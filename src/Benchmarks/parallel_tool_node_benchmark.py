@@ -0,0 +1,86 @@
+"""
+Measures a turn with several tool calls, run one after the other vs by ParallelToolNode.
+
+The tools are stand-ins for the MCP ones: each sleeps for a random latency
+(`--latency-ms` +/- 50%) and is tagged with one of two servers, like the pooled tools.
+One call in ten sleeps past the timeout, to show it doesn't hold back the turn.
+
+Usage:
+    python -m src.Benchmarks.parallel_tool_node_benchmark --calls 5 --concurrency 2 --latency-ms 300
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from langchain_core.messages import AIMessage
+from langchain_core.tools import StructuredTool
+
+from src.Agent.Nodes.parallel_tool_node import ParallelToolNode
+from src.Agent.State.crm_state import AgentState
+from src.Helpers.config import get_settings
+
+SERVERS = ["marketing", "slack"]
+
+
+def _fake_tool(server: str, latencies: dict) -> StructuredTool:
+    async def call_tool(call_number: int) -> str:
+        await asyncio.sleep(latencies[call_number])
+        return f"result of call {call_number}"
+
+    return StructuredTool.from_function(
+        coroutine=call_tool,
+        name=f"{server}_query",
+        description=f"A query against the {server} server.",
+        metadata={"mcp_server": server},
+    )
+
+
+async def main(calls: int, concurrency: int, latency_ms: float, timeout_seconds: float) -> None:
+    rng = random.Random(0)
+    latencies = {
+        number: timeout_seconds * 2 if number % 10 == 9 else latency_ms / 1000 * rng.uniform(0.5, 1.5)
+        for number in range(calls)
+    }
+    tools = [_fake_tool(server, latencies) for server in SERVERS]
+    tool_calls = [
+        {"name": f"{SERVERS[number % len(SERVERS)]}_query", "args": {"call_number": number}, "id": f"call_{number}"}
+        for number in range(calls)
+    ]
+    state = AgentState(messages=[AIMessage(content="", tool_calls=tool_calls)])
+
+    settings = get_settings()
+    settings.TOOL_SERVER_CONCURRENCY = {server: concurrency for server in SERVERS}
+    settings.TOOL_CALL_TIMEOUT_SECONDS = timeout_seconds
+    node = ParallelToolNode(tools, settings=settings)
+    tools_by_name = {tool.name: tool for tool in tools}
+
+    started = time.perf_counter()
+    for tool_call in tool_calls:
+        try:
+            await asyncio.wait_for(tools_by_name[tool_call["name"]].ainvoke(tool_call["args"]), timeout_seconds)
+        except asyncio.TimeoutError:
+            pass
+    sequential = time.perf_counter() - started
+
+    started = time.perf_counter()
+    result = await node.execute(state)
+    parallel = time.perf_counter() - started
+
+    ordered = [message.tool_call_id for message in result["messages"]] == [call["id"] for call in tool_calls]
+    errors = sum(1 for message in result["messages"] if message.status == "error")
+    print(f"{calls} calls over {len(SERVERS)} servers, {concurrency} concurrent per server, "
+          f"timeout {timeout_seconds:g}s, slowest call {max(latencies.values()):.2f}s")
+    print(f"{'sequential':<22} {sequential * 1e3:>9.1f} ms")
+    print(f"{'ParallelToolNode':<22} {parallel * 1e3:>9.1f} ms   ({sequential / parallel:.1f}x, "
+          f"{errors} timed out, ordered by tool call: {ordered})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=2)
+    parser.add_argument("--latency-ms", type=float, default=300)
+    parser.add_argument("--timeout-seconds", type=float, default=2.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.concurrency, args.latency_ms, args.timeout_seconds))
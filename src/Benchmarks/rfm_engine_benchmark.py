@@ -0,0 +1,102 @@
+"""
+Measures the RFM engine's scoring on synthetic columnar transactions.
+
+- "numpy full": score_full over every transaction line.
+- "numpy incremental": score_incremental for the customers of a small batch of new
+  invoices, against the edges of the full run.
+- "pandas groupby + qcut": the offline snippet the rfm table used to come from
+  (only when pandas is installed).
+- "python loop": a plain-Python aggregation, for scale.
+
+The database round trips are not included, only the scoring itself.
+
+Usage:
+    python -m src.Benchmarks.rfm_engine_benchmark --rows 1000000 --customers 50000
+"""
+import argparse
+import time
+from collections import defaultdict
+from datetime import date
+
+import numpy as np
+
+from src.Analytics.rfm_engine import score_full, score_incremental, to_day_numbers
+
+
+def _synthetic_transactions(rows: int, customers: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    # A skewed customer distribution, so that frequency and monetary have long tails.
+    customer_ids = 10_000 + np.minimum(rng.zipf(1.3, rows), customers) - 1
+    invoice_days = to_day_numbers([date(2010, 12, 1)])[0] + rng.integers(0, 396, rows)
+    total_prices = np.round(rng.gamma(1.5, 12.0, rows), 2)
+    return customer_ids.astype(np.int64), invoice_days.astype(np.int64), total_prices
+
+
+def _timed(label: str, function, repeat: int):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        samples.append(time.perf_counter() - started)
+    print(f"{label:<26} best={min(samples) * 1e3:>10.1f} ms   mean={sum(samples) / len(samples) * 1e3:>10.1f} ms")
+    return result
+
+
+def _python_loop(customer_ids, invoice_days, total_prices, reference_day):
+    last, frequency, monetary = {}, defaultdict(int), defaultdict(float)
+    for customer, day, price in zip(customer_ids.tolist(), invoice_days.tolist(), total_prices.tolist()):
+        last[customer] = max(last.get(customer, day), day)
+        frequency[customer] += 1
+        monetary[customer] += price
+    return {customer: (reference_day - day, frequency[customer], round(monetary[customer], 2))
+            for customer, day in last.items()}
+
+
+def _pandas_qcut(pd, customer_ids, invoice_days, total_prices, reference_day):
+    frame = pd.DataFrame({"customer": customer_ids, "day": invoice_days, "total": total_prices})
+    rfm = frame.groupby("customer").agg(recency=("day", "max"), frequency=("day", "size"), monetary=("total", "sum"))
+    rfm["recency"] = reference_day - rfm["recency"]
+    rfm["monetary"] = rfm["monetary"].round(2)
+    rfm["R"] = pd.qcut(rfm["recency"], 5, labels=[5, 4, 3, 2, 1]).astype(int)
+    rfm["F"] = pd.qcut(rfm["frequency"].rank(method="first"), 5, labels=[1, 2, 3, 4, 5]).astype(int)
+    rfm["M"] = pd.qcut(rfm["monetary"], 5, labels=[1, 2, 3, 4, 5]).astype(int)
+    return rfm
+
+
+def main(rows: int, customers: int, repeat: int) -> None:
+    reference_date = date(2012, 1, 1)
+    reference_day = int(to_day_numbers([reference_date])[0])
+    customer_ids, invoice_days, total_prices = _synthetic_transactions(rows, customers)
+    print(f"{rows:,} transaction lines, {len(np.unique(customer_ids)):,} customers\n")
+
+    scores, edges = _timed("numpy full", lambda: score_full(customer_ids, invoice_days, total_prices, reference_date),
+                           repeat)
+
+    # New invoices for ~1% of the customers: re-score only them, over their whole history.
+    affected = np.random.default_rng(1).choice(scores.customer_ids, max(1, len(scores) // 100), replace=False)
+    mask = np.isin(customer_ids, affected)
+    _timed(f"numpy incremental ({len(affected)})",
+           lambda: score_incremental(customer_ids[mask], invoice_days[mask], total_prices[mask], edges), repeat)
+
+    try:
+        import pandas as pd
+    except ImportError:
+        print(f"{'pandas groupby + qcut':<26} skipped (pandas is not installed)")
+    else:
+        rfm = _timed("pandas groupby + qcut",
+                     lambda: _pandas_qcut(pd, customer_ids, invoice_days, total_prices, reference_day), repeat)
+        matches = (rfm["R"].to_numpy() == scores.r).all() and (rfm["F"].to_numpy() == scores.f).all() \
+            and (rfm["M"].to_numpy() == scores.m).all()
+        print(f"{'':<26} scores identical to numpy full: {bool(matches)}")
+
+    _timed("python loop (aggregation)", lambda: _python_loop(customer_ids, invoice_days, total_prices, reference_day), 1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--customers", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main(args.rows, args.customers, args.repeat)
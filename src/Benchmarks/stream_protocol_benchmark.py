@@ -0,0 +1,146 @@
+"""
+Compares the writes and bytes on the wire of the chat stream's plain-text and SSE formats.
+
+A stand-in LLM streams `--tokens` tokens per answer at `--tokens-per-second` (one tool call,
+then the final answer) through the CRM graph's tool node and StreamResponseBuilder. Every
+write is assumed to go out in its own TCP segment, as the server disables Nagle: it costs
+its HTTP/1.1 chunk framing plus `--per-write-overhead` bytes of TLS record and TCP/IP headers.
+
+Usage:
+    python -m src.Benchmarks.stream_protocol_benchmark --tokens 800 --tokens-per-second 80 --tool-seconds 2
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, Dict
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessageChunk, HumanMessage, ToolMessage, message_chunk_to_message
+from langchain_core.messages.tool import tool_call_chunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.tools import StructuredTool
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, StateGraph
+
+from src.Agent.Nodes.parallel_tool_node import ParallelToolNode
+from src.Agent.State.crm_state import AgentState
+from src.Routes.ChatSchemes.stream_response_builder import StreamResponseBuilder
+
+WORDS = ["Our", " champions", " bought", " the", " regency", " cakestand", " most", " often", ",", " then",
+         " the", " jumbo", " bag", " in", " red", " retrospot", ".", " \U0001F389"]
+
+
+class FakeStreamingLLM(BaseChatModel):
+    """Calls the `query` tool once, then streams a long answer, token by token."""
+    tokens: int
+    seconds_per_token: float
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-streaming"
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        if not isinstance(messages[-1], ToolMessage):
+            for part in ['{"sql": "SELECT', ' \\"Customer ID\\"', ' FROM rfm', ' WHERE \\"Segment\\"', " = 'Champion'\"}"]:
+                await asyncio.sleep(self.seconds_per_token)
+                yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[
+                    tool_call_chunk(name="query" if part.startswith("{") else None, args=part,
+                                    id="call_1" if part.startswith("{") else None, index=0)]))
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", response_metadata={"finish_reason": "tool_calls"},
+                                                             usage_metadata={"input_tokens": 900, "output_tokens": 5,
+                                                                             "total_tokens": 905}))
+            return
+        for index in range(self.tokens):
+            await asyncio.sleep(self.seconds_per_token)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=WORDS[index % len(WORDS)]))
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", response_metadata={"finish_reason": "stop"},
+                                                         usage_metadata={"input_tokens": 950, "output_tokens": self.tokens,
+                                                                         "total_tokens": 950 + self.tokens}))
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        response = None
+        async for chunk in self._astream(messages, stop=stop, **kwargs):
+            response = chunk.message if response is None else response + chunk.message
+        return ChatResult(generations=[ChatGeneration(message=message_chunk_to_message(response))])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        # The benchmark runs the model asynchronously; a synchronous call runs the same stream on its own loop.
+        return asyncio.run(self._agenerate(messages, stop=stop, **kwargs))
+
+
+def _graph(llm: FakeStreamingLLM, tool_seconds: float):
+    async def query(sql: str) -> str:
+        await asyncio.sleep(tool_seconds)
+        return json.dumps({"columns": ["Customer ID"], "data": [[12346, 12347, 12348]], "row_count": 3})
+
+    async def assistant(state: AgentState):
+        response = None
+        async for chunk in llm.astream(state.messages):
+            response = chunk if response is None else response + chunk
+        return {"messages": [response]}
+
+    def route(state: AgentState):
+        return "tools" if state.messages[-1].tool_calls else END
+
+    graph = StateGraph(state_schema=AgentState)
+    graph.add_node("assistant_node", assistant)
+    graph.add_node("tools", ParallelToolNode(tools=[StructuredTool.from_function(coroutine=query, name="query",
+                                                                                   description="Runs SQL.")]))
+    graph.add_edge(START, "assistant_node")
+    graph.add_conditional_edges("assistant_node", route, ["tools", END])
+    graph.add_edge("tools", "assistant_node")
+    return graph.compile(checkpointer=MemorySaver())
+
+
+async def _measure(stream_format: str, args) -> Dict[str, Any]:
+    llm = FakeStreamingLLM(tokens=args.tokens, seconds_per_token=1 / args.tokens_per_second)
+    builder = StreamResponseBuilder(graph_input=AgentState(messages=[HumanMessage(content="Who are our champions?")]),
+                                    graph=_graph(llm, args.tool_seconds),
+                                    config={"configurable": {"thread_id": f"benchmark-{stream_format}"}},
+                                    stream_format=stream_format)
+    # Set once the builder is created: get_settings() reloads the shared settings from the environment.
+    builder.settings.STREAM_HEARTBEAT_SECONDS = args.heartbeat_seconds
+
+    writes, payload_bytes, framing_bytes, events = 0, 0, 0, {}
+    started = time.perf_counter()
+    first_byte = None
+    async for chunk in builder.event_stream():
+        size = len(chunk.encode())
+        if not size:
+            continue
+        first_byte = first_byte or time.perf_counter() - started
+        writes += 1
+        payload_bytes += size
+        framing_bytes += len(f"{size:x}") + 4 + args.per_write_overhead
+        if stream_format == "sse":
+            for frame in chunk.split("\n\n"):
+                name = "heartbeat" if frame.startswith(":") else next(
+                    (line[7:] for line in frame.split("\n") if line.startswith("event: ")), None)
+                if name:
+                    events[name] = events.get(name, 0) + 1
+    return {"format": stream_format, "writes": writes, "payload_bytes": payload_bytes,
+            "overhead_bytes": framing_bytes, "wire_bytes": payload_bytes + framing_bytes,
+            "first_byte_s": first_byte, "wall_s": time.perf_counter() - started, "events": events}
+
+
+async def main(args) -> None:
+    print(f"{args.tokens} tokens at {args.tokens_per_second:.0f}/s, a {args.tool_seconds:.1f}s tool call, "
+          f"{args.per_write_overhead} bytes of TLS + TCP/IP overhead per write\n")
+    for stream_format in ["text", "sse"]:
+        result = await _measure(stream_format, args)
+        print(f"{result['format']:<5} writes={result['writes']:<6} payload={result['payload_bytes']:<7} "
+              f"overhead={result['overhead_bytes']:<7} on_wire={result['wire_bytes']:<7} "
+              f"first_byte={result['first_byte_s']:.3f}s wall={result['wall_s']:.2f}s")
+        if result["events"]:
+            print(f"      events: {json.dumps(result['events'])}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=800)
+    parser.add_argument("--tokens-per-second", type=float, default=80)
+    parser.add_argument("--tool-seconds", type=float, default=2.0)
+    parser.add_argument("--heartbeat-seconds", type=float, default=1.0)
+    parser.add_argument("--per-write-overhead", type=int, default=74, help="TLS 1.3 record (22) + TCP/IP headers (52)")
+    asyncio.run(main(parser.parse_args()))
@@ -1,6 +1,6 @@
 import threading
 from pydantic_settings import BaseSettings
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 _lock = threading.Lock()
 _instance = None
@@ -33,6 +33,109 @@ class Settings(BaseSettings):
     SUPABASE_PASSWORD: Optional[str] = None 
     SLACK_BOT_TOKEN: Optional[str] = None
     SLACK_TEAM_ID: Optional[str] = None
+
+    # --- Database Settings ---
+    DATABASE_DRIVER_MODE: str = "async"  # "async" (asyncpg) or "sync" (psycopg)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 30000
+    QUERY_MAX_ROWS: int = 200  # caps of the read-only `query` tool
+    QUERY_MAX_BYTES: int = 32768
+    QUERY_STATEMENT_TIMEOUT_MS: int = 15000
+    QUERY_CACHE_ENABLED: bool = True
+    QUERY_CACHE_MAX_ENTRIES: int = 256
+    QUERY_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    QUERY_CACHE_TTL_SECONDS: float = 300.0
+    CUSTOMER_PROFILES_MAX_IDS: int = 200  # customers per get_customer_profiles call
+    CUSTOMER_PROFILE_RECENT_EMAILS: int = 5
+    SCHEMA_CACHE_TTL_SECONDS: float = 3600.0  # row estimates of `describe_table`; migrations invalidate at once
+    SCHEMA_EXCLUDED_TABLES: List[str] = ["schema_migrations", "rfm_scoring_state", "checkpoints",
+                                         "checkpoint_blobs", "checkpoint_writes", "checkpoint_migrations"]
+
+    # --- RFM Settings ---
+    RFM_REFERENCE_DATE: Optional[str] = None  # YYYY-MM-DD recency is measured from; defaults to today
+
+    # --- Checkpointer Settings ---
+    CHECKPOINTER_BACKEND: str = "memory"  # "memory", "postgres" (SUPABASE_URI) or "sqlite"
+    CHECKPOINTER_SQLITE_PATH: str = "checkpoints.sqlite"
+    CHECKPOINTER_POOL_SIZE: int = 10
+    CHECKPOINT_DURABILITY: str = "async"  # "sync", "async" or "exit" (one write at the end of a run)
+    CHECKPOINT_MESSAGES_SNAPSHOT_FREQUENCY: int = 50
+
+    # --- MCP Session Pool Settings ---
+    MCP_POOL_SIZE: int = 2
+    MCP_POOL_STARTUP_TIMEOUT_SECONDS: float = 60.0
+    MCP_POOL_ACQUIRE_TIMEOUT_SECONDS: float = 30.0
+    MCP_POOL_HEALTHCHECK_INTERVAL_SECONDS: float = 30.0
+    MCP_POOL_HEALTHCHECK_TIMEOUT_SECONDS: float = 5.0
+
+    # --- Tool Execution Settings ---
+    TOOL_CALL_TIMEOUT_SECONDS: float = 60.0
+    TOOL_SERVER_CONCURRENCY: Dict[str, int] = {}  # concurrent calls per MCP server, default MCP_POOL_SIZE
+
+    # --- LLM Cache Settings ---
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_ENTRIES: int = 512
+    LLM_CACHE_TTL_SECONDS: float = 300.0
+    LLM_CACHE_SEMANTIC_ENABLED: bool = False  # also match paraphrased questions, by embedding similarity
+    LLM_CACHE_SEMANTIC_THRESHOLD: float = 0.95
+    LLM_CACHE_EMBEDDING_MODEL: str = "text-embedding-3-small"
+    LLM_CACHE_BYPASS_TOOLS: List[str] = ["create_campaign", "send_campaign_email", "send_campaign_emails",
+                                         "draft_campaign_emails"]  # responses calling these are never cached
+
+    # --- LLM Gateway Settings ---
+    LLM_GATEWAY_ENABLED: bool = True
+    LLM_GATEWAY_REQUESTS_PER_MINUTE: int = 500  # 0 disables the limit
+    LLM_GATEWAY_TOKENS_PER_MINUTE: int = 200000  # 0 disables the limit
+    LLM_GATEWAY_INITIAL_CONCURRENCY: int = 8
+    LLM_GATEWAY_MIN_CONCURRENCY: int = 1
+    LLM_GATEWAY_MAX_CONCURRENCY: int = 64
+    LLM_GATEWAY_LATENCY_TARGET_SECONDS: float = 10.0  # slower responses lower the concurrency
+    LLM_GATEWAY_MAX_RETRIES: int = 4
+    LLM_GATEWAY_BACKOFF_BASE_SECONDS: float = 0.5
+    LLM_GATEWAY_BACKOFF_MAX_SECONDS: float = 20.0
+    LLM_GATEWAY_DEFAULT_COMPLETION_TOKENS: int = 1000  # charged to requests without max_tokens
+    LLM_GATEWAY_MAX_CONNECTIONS: int = 64
+    LLM_GATEWAY_KEEPALIVE_SECONDS: float = 120.0
+    LLM_GATEWAY_TIMEOUT_SECONDS: float = 120.0
+
+    # --- Fake LLM Settings (GENERATION_BACKEND="FAKE", for load tests) ---
+    FAKE_LLM_TOOL_CALLS: List[Dict[str, Any]] = [
+        {"name": "query", "args": {"sql": 'SELECT "Segment", count(*) FROM rfm GROUP BY "Segment"'}}
+    ]  # made once per question, before the answer
+    FAKE_LLM_ANSWER_TOKENS: int = 200
+    FAKE_LLM_TOKENS_PER_SECOND: float = 100.0
+    FAKE_LLM_TIME_TO_FIRST_TOKEN_SECONDS: float = 0.3
+
+    # --- Cassette Settings (GENERATION_BACKEND="RECORD" or "REPLAY") ---
+    CASSETTE_BACKEND: str = "OPENAI"  # the provider whose responses are recorded
+    CASSETTE_PATH: str = "cassettes/crm.jsonl.gz"
+    CASSETTE_REPLAY_SPEED: float = 1.0  # 1: at the recorded pace, 10: ten times faster, 0: without delays
+
+    # --- Campaign Settings ---
+    CAMPAIGN_MAX_AUDIENCE: int = 1000  # customers per draft_campaign_emails call
+    CAMPAIGN_MAX_CONCURRENT_WORKERS: int = 8  # emails drafted at once
+    CAMPAIGN_EMAIL_MAX_ATTEMPTS: int = 2  # a draft failing validation is rewritten up to this many times
+    CAMPAIGN_PERSONALIZED_MAX_AUDIENCE: int = 25  # larger audiences default to one template per segment
+    CAMPAIGN_POLISH_SAMPLE_RATE: float = 0.0  # share of template-rendered emails rewritten by the LLM
+    CAMPAIGN_POLISH_MAX_EMAILS: int = 20
+
+    # --- Streaming Settings ---
+    STREAM_COALESCE_MAX_BYTES: int = 512  # SSE tokens are sent once this many bytes are buffered...
+    STREAM_COALESCE_MAX_DELAY_MS: float = 50.0  # ...or this long after the first one
+    STREAM_HEARTBEAT_SECONDS: float = 15.0
+    STREAM_QUEUE_MAX_EVENTS: int = 256  # events buffered for a slow client before the graph's stream is paused
+    STREAM_TOOL_RESULT_MAX_CHARS: int = 4000
+
+    # --- Context Window Settings ---
+    CONTEXT_MAX_PROMPT_TOKENS: int = 24000
+    CONTEXT_RECENT_TURNS: int = 3  # human turns always sent verbatim
+    CONTEXT_COMPACTED_TOOL_RESULT_CHARS: int = 400
+    CONTEXT_TOKENIZER_ENCODING: str = "o200k_base"
+    CONTEXT_TOKEN_CACHE_MAX_ENTRIES: int = 20000  # message token counts kept, across every thread
         
     class Config:
         env_file = ".env"
@@ -0,0 +1,183 @@
+import math
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Sequence, Tuple
+
+# Seconds, from a cached LLM answer or a fast tool call up to a long campaign run.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    """A metric family: one value (or histogram) per combination of label values."""
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes the labels {self.labelnames}, got {tuple(labels)}.")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...], extra: Dict[str, str] = None) -> str:
+        pairs = list(zip(self.labelnames, key)) + list((extra or {}).items())
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}", *self._samples()]
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        pass
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{self._labels(key)} {_format_value(value)}" for key, value in self._values.items()]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * len(self.buckets), [0.0]))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            total[0] += value
+
+    def _samples(self) -> List[str]:
+        samples = []
+        with self._lock:
+            for key, (counts, total) in self._values.items():
+                cumulative = 0
+                for bound, count in zip(self.buckets, counts):
+                    cumulative += count
+                    samples.append(f"{self.name}_bucket{self._labels(key, {'le': _format_value(bound)})} {cumulative}")
+                samples.append(f"{self.name}_sum{self._labels(key)} {_format_value(total[0])}")
+                samples.append(f"{self.name}_count{self._labels(key)} {cumulative}")
+        return samples
+
+
+class MetricsRegistry:
+    """The process's metrics, rendered in the Prometheus text format by the /metrics route."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric: _Metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered.")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self._metrics.values() for line in metric.render()) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# --- Graph nodes ---
+NODE_DURATION = REGISTRY.histogram("crm_node_duration_seconds", "Time spent in a graph node.", ["node"])
+NODE_RUNS = REGISTRY.counter("crm_node_runs_total", "Graph node runs, by outcome.", ["node", "status"])
+NODE_IN_FLIGHT = REGISTRY.gauge("crm_node_runs_in_flight", "Graph node runs in progress.", ["node"])
+
+# --- LLM ---
+LLM_TIME_TO_FIRST_TOKEN = REGISTRY.histogram("crm_llm_time_to_first_token_seconds",
+                                             "Time from a streamed LLM call to its first chunk.", ["model", "cache"])
+LLM_DURATION = REGISTRY.histogram("crm_llm_duration_seconds", "Duration of an LLM call.", ["model", "cache"])
+LLM_TOKENS = REGISTRY.counter("crm_llm_tokens_total", "LLM tokens, by kind (prompt or completion).",
+                              ["model", "kind"])
+LLM_ERRORS = REGISTRY.counter("crm_llm_errors_total", "Failed LLM calls.", ["model"])
+LLM_IN_FLIGHT = REGISTRY.gauge("crm_llm_calls_in_flight", "LLM calls in progress.", ["model"])
+LLM_GATEWAY_QUEUED = REGISTRY.gauge("crm_llm_gateway_queued", "Requests waiting in the LLM gateway.")
+LLM_GATEWAY_IN_FLIGHT = REGISTRY.gauge("crm_llm_gateway_in_flight", "Requests the LLM gateway has in flight.")
+LLM_GATEWAY_CONCURRENCY_LIMIT = REGISTRY.gauge("crm_llm_gateway_concurrency_limit",
+                                               "The LLM gateway's adaptive concurrency limit.")
+
+# --- Context window ---
+CONTEXT_COMPACTIONS = REGISTRY.counter("crm_context_compactions_total",
+                                       "Assistant turns whose prompt was compacted to fit the context window.")
+CONTEXT_TOKENS_SAVED = REGISTRY.counter("crm_context_tokens_saved_total", "Prompt tokens removed by compaction.")
+CONTEXT_TOOL_RESULTS_COMPACTED = REGISTRY.counter("crm_context_tool_results_compacted_total",
+                                                  "Older tool results replaced by a stub in the prompt.")
+CONTEXT_MESSAGES_DROPPED = REGISTRY.counter("crm_context_messages_dropped_total",
+                                            "Older messages left out of the prompt.")
+
+# --- Tools ---
+TOOL_DURATION = REGISTRY.histogram("crm_tool_duration_seconds", "Duration of a tool call, once it has its slot.",
+                                   ["tool", "server"])
+TOOL_QUEUE_WAIT = REGISTRY.histogram("crm_tool_queue_wait_seconds",
+                                     "Time a tool call waited for its MCP server's concurrency slot.", ["server"])
+TOOL_ERRORS = REGISTRY.counter("crm_tool_errors_total", "Failed tool calls, by reason.", ["tool", "server", "reason"])
+
+# --- Checkpointer ---
+CHECKPOINT_SAVE_DURATION = REGISTRY.histogram("crm_checkpoint_save_seconds",
+                                              "Time to save a checkpoint or its pending writes.", ["operation"])
+
+# --- Chat stream ---
+STREAM_TIME_TO_FIRST_BYTE = REGISTRY.histogram("crm_stream_time_to_first_byte_seconds",
+                                               "Time from a chat request to its first written chunk.", ["format"])
+STREAM_DURATION = REGISTRY.histogram("crm_stream_duration_seconds", "Duration of a chat response stream.",
+                                     ["format", "status"])
+STREAM_FLUSH_DURATION = REGISTRY.histogram("crm_stream_flush_seconds",
+                                           "Time for the server to take a written chunk, i.e. to flush it.", ["format"])
+STREAM_IN_FLIGHT = REGISTRY.gauge("crm_streams_in_flight", "Chat response streams in progress.", ["format"])
@@ -0,0 +1,171 @@
+from typing import Any, Dict, List, Optional, Set
+from uuid import UUID
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.MCP.Servers.Repositories.base_repo import (
+    SELECT_CUSTOMER_PROFILES,
+    SELECT_SCHEMA_COLUMNS,
+    SELECT_SCHEMA_CONSTRAINTS,
+    SELECT_SCHEMA_INDEXES,
+    SELECT_SCHEMA_MIGRATIONS_EXISTS,
+    SELECT_SCHEMA_TABLES,
+    SELECT_SCHEMA_VERSION,
+    MarketingRepository,
+    QueryResultCollector,
+    read_only_statement,
+)
+
+_INSERT_CAMPAIGN_EMAIL = text(
+    """
+    INSERT INTO campaign_emails (campaign_id, customer_id, subject, body)
+    VALUES (:campaign_id, :customer_id, :subject, :body)
+    """
+)
+
+# Rows fetched per round trip from the server-side cursor of a read-only query.
+_QUERY_FETCH_SIZE = 200
+
+class AsyncPostgresMarketingRepository(MarketingRepository):
+    """PostgreSQL implementation for marketing data operations on an asyncio (asyncpg) session."""
+
+    def __init__(self, db_session: AsyncSession):
+        self.db = db_session
+
+    async def create_campaign(self, name: str, type: str, description: str) -> str:
+        """Inserts a new marketing campaign into the PostgreSQL database."""
+        result = await self.db.execute(
+            text(
+                """
+                INSERT INTO marketing_campaigns (name, type, description)
+                VALUES (:name, :type, :description)
+                RETURNING id
+                """
+            ),
+            {"name": name, "type": type, "description": description},
+        )
+        campaign_id = result.scalar_one()
+        await self.db.commit()
+        return str(campaign_id)
+
+    async def create_campaign_email_record(self, campaign_id: UUID, customer_id: int, subject: str, body: str) -> None:
+        """Records a campaign email in the PostgreSQL database."""
+        await self.db.execute(
+            _INSERT_CAMPAIGN_EMAIL,
+            {
+                "campaign_id": campaign_id,
+                "customer_id": customer_id,
+                "subject": subject,
+                "body": body
+            },
+        )
+        await self.db.commit()
+
+    async def create_campaign_email_records(self, campaign_id: UUID, emails: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Records a batch of campaign emails with one executemany INSERT and a single COMMIT."""
+        errors = self._validate_campaign_emails(emails)
+        candidates = [index for index in range(len(emails)) if index not in errors]
+
+        if candidates and not await self._campaign_exists(campaign_id):
+            errors.update({index: f"Unknown campaign <{campaign_id}>" for index in candidates})
+        elif candidates:
+            known_customers = await self._existing_customer_ids({emails[index]["customer_id"] for index in candidates})
+            for index in candidates:
+                if emails[index]["customer_id"] not in known_customers:
+                    errors[index] = f"Unknown customer <{emails[index]['customer_id']}>"
+
+        rows = [
+            (index, {
+                "campaign_id": str(campaign_id),
+                "customer_id": email["customer_id"],
+                "subject": email["subject"],
+                "body": email["body"],
+            })
+            for index, email in enumerate(emails) if index not in errors
+        ]
+        if rows:
+            try:
+                await self.db.execute(_INSERT_CAMPAIGN_EMAIL, [params for _, params in rows])
+                await self.db.commit()
+            except Exception:
+                # Something slipped past validation (e.g. a concurrent delete): redo the batch row by
+                # row behind savepoints to find the failing rows, still committing only once.
+                await self.db.rollback()
+                for index, params in rows:
+                    try:
+                        async with self.db.begin_nested():
+                            await self.db.execute(_INSERT_CAMPAIGN_EMAIL, params)
+                    except Exception as e:
+                        errors[index] = str(getattr(e, "orig", e))
+                await self.db.commit()
+
+        return self._campaign_email_results(emails, errors)
+
+    async def get_customer_profiles(self, customer_ids: List[int], recent_emails: int) -> Dict[str, Any]:
+        """Reads the profiles of all the requested customers in one query."""
+        result = await self.db.execute(
+            SELECT_CUSTOMER_PROFILES,
+            {"customer_ids": list(customer_ids), "recent_emails": recent_emails},
+        )
+        return self._customer_profiles(customer_ids, result.all())
+
+    async def get_schema_version(self) -> Optional[int]:
+        """Reads the latest applied migration from schema_migrations, when the runner has created it."""
+        try:
+            if not (await self.db.execute(SELECT_SCHEMA_MIGRATIONS_EXISTS)).scalar_one():
+                return None
+            return (await self.db.execute(SELECT_SCHEMA_VERSION)).scalar_one()
+        finally:
+            await self.db.rollback()
+
+    async def describe_tables(self, excluded_tables: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Introspects the tables from the catalog, in one query per kind of information."""
+        try:
+            tables = (await self.db.execute(SELECT_SCHEMA_TABLES, {"excluded_tables": list(excluded_tables)})).all()
+            params = {"tables": [row.table_name for row in tables]}
+            columns = (await self.db.execute(SELECT_SCHEMA_COLUMNS, params)).all()
+            constraints = (await self.db.execute(SELECT_SCHEMA_CONSTRAINTS, params)).all()
+            indexes = (await self.db.execute(SELECT_SCHEMA_INDEXES, params)).all()
+        finally:
+            await self.db.rollback()
+        return self._table_descriptions(tables, columns, constraints, indexes)
+
+    async def notify_tables_changed(self, channel: str, tables: List[str]) -> None:
+        """Sends one NOTIFY per modified table on `channel`, so other processes can drop what they cached."""
+        for table in tables:
+            await self.db.execute(text("SELECT pg_notify(:channel, :table)"), {"channel": channel, "table": table})
+        await self.db.commit()
+
+    async def run_read_only_query(self, sql: str, max_rows: int, max_bytes: int, statement_timeout_ms: int) -> Dict[str, Any]:
+        """Streams a query from a server-side cursor in a read-only transaction, stopping at the row and byte caps."""
+        try:
+            await self.db.execute(text("SET TRANSACTION READ ONLY"))
+            await self.db.execute(text(f"SET LOCAL statement_timeout = {int(statement_timeout_ms)}"))
+            result = await self.db.stream(
+                read_only_statement(sql),
+                execution_options={"yield_per": _QUERY_FETCH_SIZE},
+            )
+            collector = QueryResultCollector(list(result.keys()), max_rows, max_bytes)
+            async for row in result:
+                if not collector.add(row):
+                    break
+            await result.close()
+        finally:
+            # Nothing to keep: the rollback ends the transaction and drops the cursor,
+            # so the rows past the caps are never fetched.
+            await self.db.rollback()
+        return collector.result()
+
+    async def _campaign_exists(self, campaign_id: UUID) -> bool:
+        result = await self.db.execute(
+            text("SELECT 1 FROM marketing_campaigns WHERE id = :campaign_id"),
+            {"campaign_id": str(campaign_id)},
+        )
+        return result.first() is not None
+
+    async def _existing_customer_ids(self, customer_ids: Set[int]) -> Set[int]:
+        result = await self.db.execute(
+            text('SELECT "Customer ID" FROM customers WHERE "Customer ID" = ANY(:customer_ids)'),
+            {"customer_ids": list(customer_ids)},
+        )
+        return set(result.scalars().all())
@@ -1,5 +1,189 @@
+import json
+import re
 from abc import ABC, abstractmethod
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence
 from uuid import UUID
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql.elements import TextClause
+
+# One row per requested customer: contact details, RFM segment, the precomputed purchase
+# summary (see Migrations/Versions/0002_customer_profile_summary.sql) and their latest campaign emails.
+SELECT_CUSTOMER_PROFILES = text(
+    """
+    SELECT
+        c."Customer ID" AS customer_id, c."Name" AS name, c."Email" AS email, c."Country" AS country,
+        r."Segment" AS segment, r."RFM_Score" AS rfm_score, r.recency, r.frequency, r.monetary,
+        s.first_purchase_at, s.last_purchase_at, s.invoice_count, s.total_quantity, s.total_spent,
+        coalesce(s.top_items, '[]'::jsonb) AS top_items, l.last_stock_code, l.last_description,
+        coalesce(e.campaign_emails, '[]'::jsonb) AS campaign_emails
+    FROM customers c
+    LEFT JOIN rfm r ON r."Customer ID" = c."Customer ID"
+    LEFT JOIN customer_profile_summary s ON s."Customer ID" = c."Customer ID"
+    LEFT JOIN LATERAL (
+        SELECT t."StockCode" AS last_stock_code, i."Description" AS last_description
+        FROM transactions t
+        LEFT JOIN items i ON i."StockCode" = t."StockCode"
+        WHERE t."Customer ID" = c."Customer ID"
+        ORDER BY t."InvoiceDate" DESC, t."TotalPrice" DESC NULLS LAST
+        LIMIT 1
+    ) l ON true
+    LEFT JOIN LATERAL (
+        SELECT jsonb_agg(
+                   jsonb_build_object(
+                       'campaign', m.name, 'type', m.type, 'subject', ce.subject,
+                       'sent_at', ce.sent_at, 'status', ce.status
+                   )
+                   ORDER BY ce.sent_at DESC
+               ) AS campaign_emails
+        FROM (
+            SELECT campaign_id, subject, sent_at, status
+            FROM campaign_emails
+            WHERE customer_id = c."Customer ID"
+            ORDER BY sent_at DESC
+            LIMIT :recent_emails
+        ) ce
+        LEFT JOIN marketing_campaigns m ON m.id = ce.campaign_id
+    ) e ON true
+    WHERE c."Customer ID" = ANY(:customer_ids)
+    """
+).columns(top_items=JSONB, campaign_emails=JSONB)
+
+
+# Schema introspection behind the `describe_table` tool. Partitions are folded into their
+# parent table, whose estimated row count sums theirs (NULL until the table is analyzed),
+# and the indexes backing a primary key or unique constraint are listed as the constraint.
+SELECT_SCHEMA_MIGRATIONS_EXISTS = text("SELECT to_regclass('public.schema_migrations') IS NOT NULL")
+SELECT_SCHEMA_VERSION = text("SELECT max(version) FROM public.schema_migrations")
+
+SELECT_SCHEMA_TABLES = text(
+    """
+    SELECT
+        c.relname AS table_name, c.relkind::text AS kind, obj_description(c.oid, 'pg_class') AS description,
+        pg_get_partkeydef(c.oid) AS partition_key,
+        (SELECT count(*) FROM pg_inherits i WHERE i.inhparent = c.oid) AS partitions,
+        CASE
+            WHEN c.relkind = 'p' THEN (
+                SELECT sum(p.reltuples)::bigint
+                FROM pg_inherits i JOIN pg_class p ON p.oid = i.inhrelid
+                WHERE i.inhparent = c.oid AND p.reltuples >= 0
+            )
+            WHEN c.reltuples >= 0 THEN c.reltuples::bigint
+        END AS row_estimate
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = 'public' AND c.relkind IN ('r', 'p', 'v', 'm') AND NOT c.relispartition
+      AND c.relname <> ALL(:excluded_tables)
+    ORDER BY c.relname
+    """
+)
+
+SELECT_SCHEMA_COLUMNS = text(
+    """
+    SELECT
+        c.relname AS table_name, a.attname AS column_name, format_type(a.atttypid, a.atttypmod) AS data_type,
+        NOT a.attnotnull AS nullable, pg_get_expr(d.adbin, d.adrelid) AS column_default,
+        col_description(c.oid, a.attnum) AS description
+    FROM pg_attribute a
+    JOIN pg_class c ON c.oid = a.attrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    LEFT JOIN pg_attrdef d ON d.adrelid = a.attrelid AND d.adnum = a.attnum
+    WHERE n.nspname = 'public' AND c.relname = ANY(:tables) AND a.attnum > 0 AND NOT a.attisdropped
+    ORDER BY c.relname, a.attnum
+    """
+)
+
+SELECT_SCHEMA_CONSTRAINTS = text(
+    """
+    SELECT c.relname AS table_name, k.conname AS name, pg_get_constraintdef(k.oid) AS definition
+    FROM pg_constraint k
+    JOIN pg_class c ON c.oid = k.conrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = 'public' AND c.relname = ANY(:tables)
+    ORDER BY c.relname, k.contype DESC, k.conname
+    """
+)
+
+SELECT_SCHEMA_INDEXES = text(
+    """
+    SELECT c.relname AS table_name, x.relname AS name, pg_get_indexdef(i.indexrelid) AS definition
+    FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indrelid
+    JOIN pg_class x ON x.oid = i.indexrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = 'public' AND c.relname = ANY(:tables)
+      AND NOT EXISTS (
+          SELECT 1 FROM pg_constraint k
+          WHERE k.conrelid = i.indrelid AND k.conindid = i.indexrelid AND k.contype IN ('p', 'u', 'x')
+      )
+    ORDER BY c.relname, x.relname
+    """
+)
+
+_TABLE_KINDS = {"r": "table", "p": "partitioned table", "v": "view", "m": "materialized view"}
+# "CREATE [UNIQUE] INDEX name ON [ONLY] table USING method (columns)", kept from UNIQUE / USING on.
+_INDEX_DEFINITION = re.compile(r"^CREATE (UNIQUE )?INDEX .+? USING (.+)$")
+
+
+def read_only_statement(sql: str) -> TextClause:
+    """Wraps raw SQL in a text() clause, escaping colons so they are not parsed as bind parameters."""
+    return text(sql.strip().rstrip(";").replace(":", "\\:"))
+
+
+def _json_value(value: Any) -> Any:
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return str(value)
+
+
+class QueryResultCollector:
+    """
+    Accumulates the rows of a query in a compact columnar encoding, up to a row and a byte cap.
+
+    The result is `{"columns": [...], "data": [[column values], ...], "row_count": n,
+    "truncated": bool, "truncated_reason": "max_rows" | "max_bytes" | None}`.
+    """
+
+    def __init__(self, columns: Sequence[str], max_rows: int, max_bytes: int):
+        self.columns = list(columns)
+        self.data: List[List[Any]] = [[] for _ in self.columns]
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.row_count = 0
+        self.size_bytes = 0
+        self.truncated_reason: Optional[str] = None
+
+    def add(self, row: Sequence[Any]) -> bool:
+        """Adds a row. Returns False, without adding it, once a cap is reached."""
+        if self.row_count >= self.max_rows:
+            self.truncated_reason = "max_rows"
+            return False
+        values = [_json_value(value) for value in row]
+        row_bytes = len(json.dumps(values, ensure_ascii=False).encode())
+        if self.size_bytes + row_bytes > self.max_bytes:
+            self.truncated_reason = "max_bytes"
+            return False
+        for column, value in zip(self.data, values):
+            column.append(value)
+        self.row_count += 1
+        self.size_bytes += row_bytes
+        return True
+
+    def result(self) -> Dict[str, Any]:
+        return {
+            "columns": self.columns,
+            "data": self.data,
+            "row_count": self.row_count,
+            "truncated": self.truncated_reason is not None,
+            "truncated_reason": self.truncated_reason,
+        }
+
 
 class MarketingRepository(ABC):
     """Abstract Base Class for a marketing data repository."""
@@ -17,4 +201,158 @@ class MarketingRepository(ABC):
         """
         Records that a campaign email has been sent.
         """
-        ...
\ No newline at end of file
+        ...
+
+    @abstractmethod
+    async def create_campaign_email_records(self, campaign_id: UUID, emails: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Records a batch of campaign emails in a single transaction.
+        Each email is a dict with `customer_id`, `subject` and `body`.
+        Should return one result per email, in input order:
+        `{"customer_id": ..., "status": "sent" | "failed", "error": str | None}`.
+        """
+        ...
+
+    @abstractmethod
+    async def notify_tables_changed(self, channel: str, tables: List[str]) -> None:
+        """
+        Publishes the names of modified tables on a Postgres NOTIFY channel.
+        """
+        ...
+
+    @abstractmethod
+    async def run_read_only_query(self, sql: str, max_rows: int, max_bytes: int, statement_timeout_ms: int) -> Dict[str, Any]:
+        """
+        Runs a single SQL statement in a read-only transaction with a statement timeout,
+        streaming the rows from a server-side cursor and stopping at `max_rows` / `max_bytes`.
+        Should return the `QueryResultCollector` result.
+        """
+        ...
+
+    @abstractmethod
+    async def get_customer_profiles(self, customer_ids: List[int], recent_emails: int) -> Dict[str, Any]:
+        """
+        Returns `{"profiles": [...], "not_found": [...]}`: one profile per known customer, in input order,
+        with their RFM segment, purchase summary, top items, last item purchased and `recent_emails`
+        latest campaign emails.
+        """
+        ...
+
+    @abstractmethod
+    async def get_schema_version(self) -> Optional[int]:
+        """
+        Returns the latest migration applied (see src/Migrations), or None before the first one.
+        """
+        ...
+
+    @abstractmethod
+    async def describe_tables(self, excluded_tables: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Introspects every table and view of the public schema but `excluded_tables`.
+        Should return the `_table_descriptions` result, keyed by table name.
+        """
+        ...
+
+    @staticmethod
+    def _table_descriptions(tables: Sequence[Any], columns: Sequence[Any], constraints: Sequence[Any],
+                            indexes: Sequence[Any]) -> Dict[str, Dict[str, Any]]:
+        """Shapes the rows of the `SELECT_SCHEMA_*` queries into one description per table."""
+        descriptions = {}
+        for row in tables:
+            row = row._mapping
+            descriptions[row["table_name"]] = {
+                "kind": _TABLE_KINDS[row["kind"]],
+                "description": row["description"],
+                "row_estimate": row["row_estimate"],
+                "columns": [],
+                "constraints": [],
+                "indexes": [],
+            }
+            if row["partition_key"]:
+                descriptions[row["table_name"]]["partitioned_by"] = row["partition_key"]
+                descriptions[row["table_name"]]["partitions"] = row["partitions"]
+
+        for row in columns:
+            row = row._mapping
+            column = {"name": row["column_name"], "type": row["data_type"], "nullable": row["nullable"]}
+            if row["column_default"] is not None:
+                column["default"] = row["column_default"]
+            if row["description"]:
+                column["description"] = row["description"]
+            descriptions[row["table_name"]]["columns"].append(column)
+
+        for row in constraints:
+            row = row._mapping
+            descriptions[row["table_name"]]["constraints"].append(f'{row["name"]}: {row["definition"]}')
+
+        for row in indexes:
+            row = row._mapping
+            match = _INDEX_DEFINITION.match(row["definition"])
+            definition = f"{match.group(1) or ''}{match.group(2)}" if match else row["definition"]
+            descriptions[row["table_name"]]["indexes"].append(f'{row["name"]}: {definition}')
+        return descriptions
+
+    @staticmethod
+    def _customer_profiles(customer_ids: List[int], rows: Sequence[Any]) -> Dict[str, Any]:
+        """Shapes the rows of `SELECT_CUSTOMER_PROFILES` into profiles ordered like `customer_ids`."""
+        profiles_by_id = {}
+        for row in rows:
+            row = row._mapping
+            profiles_by_id[row["customer_id"]] = {
+                "customer_id": row["customer_id"],
+                "name": row["name"],
+                "email": row["email"],
+                "country": row["country"],
+                "rfm": {
+                    "segment": row["segment"],
+                    "score": row["rfm_score"],
+                    "recency": row["recency"],
+                    "frequency": row["frequency"],
+                    "monetary": _json_value(row["monetary"]),
+                } if row["segment"] is not None else None,
+                "first_purchase_at": _json_value(row["first_purchase_at"]),
+                "last_purchase_at": _json_value(row["last_purchase_at"]),
+                "invoice_count": row["invoice_count"] or 0,
+                "total_quantity": row["total_quantity"] or 0,
+                "total_spent": round(row["total_spent"] or 0, 2),
+                "top_items": row["top_items"],
+                "last_item": {
+                    "stock_code": row["last_stock_code"],
+                    "description": row["last_description"],
+                } if row["last_stock_code"] is not None else None,
+                "campaign_emails": row["campaign_emails"],
+            }
+        unique_ids = list(dict.fromkeys(customer_ids))
+        return {
+            "profiles": [profiles_by_id[customer_id] for customer_id in unique_ids if customer_id in profiles_by_id],
+            "not_found": [customer_id for customer_id in unique_ids if customer_id not in profiles_by_id],
+        }
+
+    @staticmethod
+    def _validate_campaign_emails(emails: List[Dict[str, Any]]) -> Dict[int, str]:
+        """Returns the validation error of every invalid email, keyed by its position in the batch."""
+        errors = {}
+        seen_customers = set()
+        for index, email in enumerate(emails):
+            customer_id = email.get("customer_id")
+            if not isinstance(customer_id, int) or isinstance(customer_id, bool):
+                errors[index] = "customer_id must be an integer"
+            elif not email.get("subject") or not email.get("body"):
+                errors[index] = "subject and body are required"
+            elif customer_id in seen_customers:
+                errors[index] = f"Duplicate email for customer <{customer_id}> in this batch"
+            else:
+                seen_customers.add(customer_id)
+        return errors
+
+    @staticmethod
+    def _campaign_email_results(emails: List[Dict[str, Any]], errors: Dict[int, str]) -> List[Dict[str, Any]]:
+        """Builds the per-email results of a batch, in input order."""
+        return [
+            {
+                "customer_id": email.get("customer_id"),
+                "status": "failed" if index in errors else "sent",
+                "error": errors.get(index),
+            }
+            for index, email in enumerate(emails)
+        ]
@@ -1,8 +1,30 @@
+from typing import Any, Dict, List, Optional, Set
 from uuid import UUID
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from src.MCP.Servers.Repositories.base_repo import MarketingRepository
+from src.MCP.Servers.Repositories.base_repo import (
+    SELECT_CUSTOMER_PROFILES,
+    SELECT_SCHEMA_COLUMNS,
+    SELECT_SCHEMA_CONSTRAINTS,
+    SELECT_SCHEMA_INDEXES,
+    SELECT_SCHEMA_MIGRATIONS_EXISTS,
+    SELECT_SCHEMA_TABLES,
+    SELECT_SCHEMA_VERSION,
+    MarketingRepository,
+    QueryResultCollector,
+    read_only_statement,
+)
+
+_INSERT_CAMPAIGN_EMAIL = text(
+    """
+    INSERT INTO campaign_emails (campaign_id, customer_id, subject, body)
+    VALUES (:campaign_id, :customer_id, :subject, :body)
+    """
+)
+
+# Rows fetched per round trip from the server-side cursor of a read-only query.
+_QUERY_FETCH_SIZE = 200
 
 class PostgresMarketingRepository(MarketingRepository):
     """PostgreSQL implementation for marketing data operations."""
@@ -29,12 +51,7 @@ class PostgresMarketingRepository(MarketingRepository):
     async def create_campaign_email_record(self, campaign_id: UUID, customer_id: int, subject: str, body: str) -> None:
         """Records a campaign email in the PostgreSQL database."""
         self.db.execute(
-            text(
-                """
-                INSERT INTO campaign_emails (campaign_id, customer_id, subject, body)
-                VALUES (:campaign_id, :customer_id, :subject, :body)
-                """
-            ),
+            _INSERT_CAMPAIGN_EMAIL,
             {
                 "campaign_id": campaign_id,
                 "customer_id": customer_id,
@@ -42,4 +59,113 @@ class PostgresMarketingRepository(MarketingRepository):
                 "body": body
             },
         )
-        self.db.commit()
\ No newline at end of file
+        self.db.commit()
+
+    async def create_campaign_email_records(self, campaign_id: UUID, emails: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Records a batch of campaign emails with one executemany INSERT and a single COMMIT."""
+        errors = self._validate_campaign_emails(emails)
+        candidates = [index for index in range(len(emails)) if index not in errors]
+
+        if candidates and not self._campaign_exists(campaign_id):
+            errors.update({index: f"Unknown campaign <{campaign_id}>" for index in candidates})
+        elif candidates:
+            known_customers = self._existing_customer_ids({emails[index]["customer_id"] for index in candidates})
+            for index in candidates:
+                if emails[index]["customer_id"] not in known_customers:
+                    errors[index] = f"Unknown customer <{emails[index]['customer_id']}>"
+
+        rows = [
+            (index, {
+                "campaign_id": str(campaign_id),
+                "customer_id": email["customer_id"],
+                "subject": email["subject"],
+                "body": email["body"],
+            })
+            for index, email in enumerate(emails) if index not in errors
+        ]
+        if rows:
+            try:
+                self.db.execute(_INSERT_CAMPAIGN_EMAIL, [params for _, params in rows])
+                self.db.commit()
+            except Exception:
+                # Something slipped past validation (e.g. a concurrent delete): redo the batch row by
+                # row behind savepoints to find the failing rows, still committing only once.
+                self.db.rollback()
+                for index, params in rows:
+                    try:
+                        with self.db.begin_nested():
+                            self.db.execute(_INSERT_CAMPAIGN_EMAIL, params)
+                    except Exception as e:
+                        errors[index] = str(getattr(e, "orig", e))
+                self.db.commit()
+
+        return self._campaign_email_results(emails, errors)
+
+    async def get_customer_profiles(self, customer_ids: List[int], recent_emails: int) -> Dict[str, Any]:
+        """Reads the profiles of all the requested customers in one query."""
+        result = self.db.execute(
+            SELECT_CUSTOMER_PROFILES,
+            {"customer_ids": list(customer_ids), "recent_emails": recent_emails},
+        )
+        return self._customer_profiles(customer_ids, result.all())
+
+    async def get_schema_version(self) -> Optional[int]:
+        """Reads the latest applied migration from schema_migrations, when the runner has created it."""
+        try:
+            if not self.db.execute(SELECT_SCHEMA_MIGRATIONS_EXISTS).scalar_one():
+                return None
+            return self.db.execute(SELECT_SCHEMA_VERSION).scalar_one()
+        finally:
+            self.db.rollback()
+
+    async def describe_tables(self, excluded_tables: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Introspects the tables from the catalog, in one query per kind of information."""
+        try:
+            tables = self.db.execute(SELECT_SCHEMA_TABLES, {"excluded_tables": list(excluded_tables)}).all()
+            params = {"tables": [row.table_name for row in tables]}
+            columns = self.db.execute(SELECT_SCHEMA_COLUMNS, params).all()
+            constraints = self.db.execute(SELECT_SCHEMA_CONSTRAINTS, params).all()
+            indexes = self.db.execute(SELECT_SCHEMA_INDEXES, params).all()
+        finally:
+            self.db.rollback()
+        return self._table_descriptions(tables, columns, constraints, indexes)
+
+    async def notify_tables_changed(self, channel: str, tables: List[str]) -> None:
+        """Sends one NOTIFY per modified table on `channel`, so other processes can drop what they cached."""
+        for table in tables:
+            self.db.execute(text("SELECT pg_notify(:channel, :table)"), {"channel": channel, "table": table})
+        self.db.commit()
+
+    async def run_read_only_query(self, sql: str, max_rows: int, max_bytes: int, statement_timeout_ms: int) -> Dict[str, Any]:
+        """Streams a query from a server-side cursor in a read-only transaction, stopping at the row and byte caps."""
+        try:
+            self.db.execute(text("SET TRANSACTION READ ONLY"))
+            self.db.execute(text(f"SET LOCAL statement_timeout = {int(statement_timeout_ms)}"))
+            result = self.db.execute(
+                read_only_statement(sql),
+                execution_options={"yield_per": _QUERY_FETCH_SIZE},
+            )
+            collector = QueryResultCollector(list(result.keys()), max_rows, max_bytes)
+            for row in result:
+                if not collector.add(row):
+                    break
+            result.close()
+        finally:
+            # Nothing to keep: the rollback ends the transaction and drops the cursor,
+            # so the rows past the caps are never fetched.
+            self.db.rollback()
+        return collector.result()
+
+    def _campaign_exists(self, campaign_id: UUID) -> bool:
+        result = self.db.execute(
+            text("SELECT 1 FROM marketing_campaigns WHERE id = :campaign_id"),
+            {"campaign_id": str(campaign_id)},
+        )
+        return result.first() is not None
+
+    def _existing_customer_ids(self, customer_ids: Set[int]) -> Set[int]:
+        result = self.db.execute(
+            text('SELECT "Customer ID" FROM customers WHERE "Customer ID" = ANY(:customer_ids)'),
+            {"customer_ids": list(customer_ids)},
+        )
+        return set(result.scalars().all())
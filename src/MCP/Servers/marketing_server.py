@@ -8,14 +8,28 @@ It follows modern architecture principles:
     dependencies (like a database session and repository) for that specific request.
 """
 import sys
+import json
+from typing import List
 from uuid import UUID
-from contextlib import contextmanager
+from contextlib import AsyncExitStack, asynccontextmanager
 
+from pydantic import BaseModel
+from sqlalchemy.exc import SQLAlchemyError
 from mcp.server.fastmcp import FastMCP
 
 from src.Helpers.config import get_settings
-from src.Authentication.database import setup_database_engine
+from src.Authentication.database import (
+    DatabaseDriverMode,
+    get_pool_metrics,
+    listen_for_notifications,
+    setup_async_database_engine,
+    setup_database_engine,
+    verify_async_database_connection,
+)
 from src.MCP.Servers.Repositories.postgres_repo import PostgresMarketingRepository
+from src.MCP.Servers.Repositories.async_postgres_repo import AsyncPostgresMarketingRepository
+from src.MCP.Servers.query_result_cache import QUERY_CACHE_INVALIDATION_CHANNEL, QueryResultCache
+from src.MCP.Servers.schema_cache import SchemaCache
 
 # ----------------------------
 # 1. INITIALIZATION ON STARTUP
@@ -30,25 +44,73 @@ except Exception as e:
     sys.exit(1)
 
 # Set up the database engine and session factory. This happens only once when the script starts.
-db_engine, SessionLocal = setup_database_engine(settings.SUPABASE_URI)
+# The async (asyncpg) path keeps tool calls from blocking the server's event loop;
+# the sync path remains selectable through DATABASE_DRIVER_MODE.
+use_async_database = DatabaseDriverMode(settings.DATABASE_DRIVER_MODE) == DatabaseDriverMode.ASYNC
+if use_async_database:
+    db_engine, SessionLocal = setup_async_database_engine(settings.SUPABASE_URI)
+else:
+    db_engine, SessionLocal = setup_database_engine(settings.SUPABASE_URI)
+
+# Results of the read-only `query` tool, shared by all tool calls of this process.
+# The write tools below invalidate the entries of the tables they modify.
+query_cache = QueryResultCache(
+    max_entries=settings.QUERY_CACHE_MAX_ENTRIES,
+    max_bytes=settings.QUERY_CACHE_MAX_BYTES,
+    ttl_seconds=settings.QUERY_CACHE_TTL_SECONDS,
+) if settings.QUERY_CACHE_ENABLED else None
+
+# Table descriptions of the `describe_table` tool, re-read from the catalog after a migration.
+schema_cache = SchemaCache(ttl_seconds=settings.SCHEMA_CACHE_TTL_SECONDS)
+
+
+@asynccontextmanager
+async def server_lifespan(server: FastMCP):
+    """
+    Checks the async engine's connection on startup and closes its pool on shutdown.
+    While running, it listens for the table changes published by the other server processes
+    and drops the cached query results that depend on them. (The sync engine has no listener:
+    its cache only relies on its own writes and the TTL.)
+    """
+    if use_async_database:
+        await verify_async_database_connection(db_engine)
+    try:
+        async with AsyncExitStack() as stack:
+            if use_async_database and query_cache is not None:
+                await stack.enter_async_context(listen_for_notifications(
+                    db_engine,
+                    QUERY_CACHE_INVALIDATION_CHANNEL,
+                    lambda table: query_cache.invalidate_tables([table]),
+                ))
+            yield
+    finally:
+        if use_async_database:
+            await db_engine.dispose()
+            print("Async database connection pool closed.")
+
 
 # Initialize the MCP server instance
-mcp = FastMCP("marketing")
+mcp = FastMCP("marketing", lifespan=server_lifespan)
 
 
 # -------------------------------------
 # 2. DEPENDENCY PROVIDER (Manual DI)
 # -------------------------------------
 
-@contextmanager
-def get_repository():
+@asynccontextmanager
+async def get_repository():
     """
     A context manager that handles the lifecycle of dependencies for a single tool call.
-    - Creates a DB session.
+    - Creates a DB session (async or sync, depending on DATABASE_DRIVER_MODE).
     - Creates the repository with that session.
     - Yields the repository to the tool.
     - Ensures the DB session is closed, even if errors occur.
     """
+    if use_async_database:
+        async with SessionLocal() as db_session:
+            yield AsyncPostgresMarketingRepository(db_session=db_session)
+        return
+
     db_session = None
     try:
         db_session = SessionLocal()
@@ -59,6 +121,15 @@ def get_repository():
             db_session.close()
 
 
+async def invalidate_cached_queries(repo, *tables: str) -> None:
+    """Drops the cached query results that read from `tables`, in this process and, through
+    a NOTIFY, in every other marketing server process."""
+    if query_cache is None:
+        return
+    query_cache.invalidate_tables(tables)
+    await repo.notify_tables_changed(QUERY_CACHE_INVALIDATION_CHANNEL, list(tables))
+
+
 # ----------------------------
 # 3. TOOL DEFINITIONS
 # ----------------------------
@@ -77,11 +148,12 @@ async def create_campaign(name: str, type: str, description: str) -> str:
     """
     print(f"Executing tool: create_campaign(name='{name}')")
     # Use our context manager to get a repository instance
-    with get_repository() as repo:
+    async with get_repository() as repo:
         # Delegate all business logic to the repository method
         campaign_id = await repo.create_campaign(
             name=name, type=type, description=description
         )
+        await invalidate_cached_queries(repo, "marketing_campaigns")
         return campaign_id
 
 @mcp.tool()
@@ -99,7 +171,7 @@ async def send_campaign_email(campaign_id: UUID, customer_id: int, subject: str,
     """
     print(f"Executing tool: send_campaign_email(campaign_id='{campaign_id}')")
     # Use our context manager again for this request
-    with get_repository() as repo:
+    async with get_repository() as repo:
         # Delegate to the repository
         await repo.create_campaign_email_record(
             campaign_id=campaign_id,
@@ -107,11 +179,166 @@ async def send_campaign_email(campaign_id: UUID, customer_id: int, subject: str,
             subject=subject,
             body=body,
         )
+        await invalidate_cached_queries(repo, "campaign_emails")
     return f"Successfully sent <{subject}> to customer <{customer_id}>!"
 
 
+class CampaignEmail(BaseModel):
+    """One email of a campaign batch."""
+    customer_id: int
+    subject: str
+    body: str
+
+
+@mcp.tool()
+async def send_campaign_emails(campaign_id: UUID, emails: List[CampaignEmail]) -> str:
+    """Send a batch of campaign emails and record them in the database in a single transaction.
+    Prefer this over calling `send_campaign_email` once per customer.
+
+    Args:
+        campaign_id: The ID of the campaign.
+        emails: The emails to send, each with the customer's ID, a subject and an HTML body.
+
+    Returns:
+        A JSON summary with the number of emails sent and the customers whose email failed.
+    """
+    print(f"Executing tool: send_campaign_emails(campaign_id='{campaign_id}', emails={len(emails)})")
+    async with get_repository() as repo:
+        results = await repo.create_campaign_email_records(
+            campaign_id=campaign_id,
+            emails=[email.model_dump() for email in emails],
+        )
+        await invalidate_cached_queries(repo, "campaign_emails")
+    failures = [
+        {"customer_id": result["customer_id"], "error": result["error"]}
+        for result in results if result["status"] == "failed"
+    ]
+    return json.dumps({
+        "campaign_id": str(campaign_id),
+        "sent": len(results) - len(failures),
+        "failed": len(failures),
+        "failures": failures,
+    })
+
+
+@mcp.tool()
+async def get_customer_profiles(customer_ids: List[int]) -> str:
+    """Get the profiles of one or more customers in a single call.
+    Use this to analyse the customers of a campaign before writing their emails.
+
+    Args:
+        customer_ids: The IDs of the customers to profile.
+
+    Returns:
+        A JSON object with `profiles` (one per customer: contact details, RFM segment, first and last
+        purchase dates, totals, top items with descriptions, the last item they purchased and their
+        latest campaign emails)
+        and `not_found` (the IDs that don't match any customer).
+    """
+    print(f"Executing tool: get_customer_profiles(customers={len(customer_ids)})")
+    if len(customer_ids) > settings.CUSTOMER_PROFILES_MAX_IDS:
+        raise ValueError(
+            f"At most {settings.CUSTOMER_PROFILES_MAX_IDS} customers can be profiled per call, got {len(customer_ids)}."
+        )
+    async with get_repository() as repo:
+        profiles = await repo.get_customer_profiles(
+            customer_ids=customer_ids,
+            recent_emails=settings.CUSTOMER_PROFILE_RECENT_EMAILS,
+        )
+    return json.dumps(profiles, ensure_ascii=False)
+
+
+@mcp.tool()
+async def describe_table(tables: List[str]) -> str:
+    """Describe CRM tables: their columns and types, keys and checks, indexes and estimated row count.
+    Call it before writing SQL against tables whose columns you don't know, with all of them in one call.
+
+    Args:
+        tables: The names of the tables, e.g. ["transactions", "rfm"]. Pass an empty list to list every table.
+
+    Returns:
+        A JSON object keyed by table name, with its `description`, `columns` (name, type, nullable, default
+        and description), `constraints`, `indexes`, `row_estimate`, and `partitioned_by` for partitioned tables.
+        With an empty list, the one-line description of every table.
+    """
+    print(f"Executing tool: describe_table(tables={tables})")
+    async with get_repository() as repo:
+        version = await repo.get_schema_version()
+        descriptions = schema_cache.get(version)
+        if descriptions is None:
+            descriptions = await repo.describe_tables(excluded_tables=settings.SCHEMA_EXCLUDED_TABLES)
+            schema_cache.set(version, descriptions)
+
+    if not tables:
+        return json.dumps({name: description["description"] for name, description in descriptions.items()},
+                          ensure_ascii=False)
+    names = [table.strip().strip('"').removeprefix("public.") for table in tables]
+    unknown = [name for name in names if name not in descriptions]
+    if unknown:
+        raise ValueError(f"Unknown tables: {', '.join(unknown)}. The tables are: {', '.join(descriptions)}.")
+    return json.dumps({name: descriptions[name] for name in names}, ensure_ascii=False)
+
+
+@mcp.tool()
+async def query(sql: str) -> str:
+    """Run a read-only SQL query against the CRM database.
+    Results are capped in rows and size, so aggregate, filter and LIMIT in SQL instead of fetching raw tables.
+
+    Args:
+        sql: A single SELECT statement.
+
+    Returns:
+        A JSON object with `columns`, `data` (one array of values per column, in column order),
+        `row_count`, and `truncated` / `truncated_reason` ("max_rows" or "max_bytes") when a cap was hit.
+    """
+    print(f"Executing tool: query(sql='{sql[:80]}')")
+    cache_params = (settings.QUERY_MAX_ROWS, settings.QUERY_MAX_BYTES)
+    if query_cache is not None:
+        cached = query_cache.get(sql, cache_params)
+        if cached is not None:
+            return cached
+        cache_version = query_cache.version
+
+    async with get_repository() as repo:
+        try:
+            result = await repo.run_read_only_query(
+                sql=sql,
+                max_rows=settings.QUERY_MAX_ROWS,
+                max_bytes=settings.QUERY_MAX_BYTES,
+                statement_timeout_ms=settings.QUERY_STATEMENT_TIMEOUT_MS,
+            )
+        except SQLAlchemyError as e:
+            raise ValueError(f"Query failed: {getattr(e, 'orig', None) or e}") from e
+    response = json.dumps(result, ensure_ascii=False)
+    if query_cache is not None:
+        query_cache.set(sql, response, cache_params, read_at_version=cache_version)
+    return response
+
+
+# ----------------------------
+# 4. RESOURCES
+# ----------------------------
+
+@mcp.resource("metrics://database/pool")
+def database_pool_metrics() -> str:
+    """Connection pool usage of the marketing server's database engine."""
+    return json.dumps(get_pool_metrics(db_engine))
+
+
+@mcp.resource("metrics://query/cache")
+def query_cache_metrics() -> str:
+    """Hit, miss, eviction and size counters of the `query` tool's result cache."""
+    return json.dumps(query_cache.stats() if query_cache is not None else {"enabled": False})
+
+
+@mcp.resource("metrics://schema/cache")
+def schema_cache_metrics() -> str:
+    """Hit, miss and invalidation counters of the `describe_table` tool's schema cache."""
+    return json.dumps(schema_cache.stats())
+
+
 # ----------------------------
-# 4. SCRIPT EXECUTION
+# 5. SCRIPT EXECUTION
 # ----------------------------
 
 if __name__ == "__main__":
@@ -122,6 +349,7 @@ if __name__ == "__main__":
         print("\nShutting down server.")
     finally:
         # Cleanly dispose of the database connection pool when the server exits.
-        if db_engine:
+        # (The async engine is disposed by the server lifespan, inside the event loop.)
+        if db_engine and not use_async_database:
             db_engine.dispose()
             print("Database connection pool closed.")
\ No newline at end of file
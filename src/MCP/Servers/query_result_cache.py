@@ -0,0 +1,240 @@
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+# Postgres NOTIFY channel on which writers publish the names of the tables they modified.
+QUERY_CACHE_INVALIDATION_CHANNEL = "crm_query_cache_invalidation"
+
+# Single-quoted literals (with '' escapes), double-quoted identifiers, or runs of whitespace.
+_SQL_TOKENS = re.compile(r"('(?:[^']|'')*')|(\"[^\"]*\")|(\s+)")
+# Comments, then the tokens referenced_tables() walks: quoted identifiers, words, or single symbols.
+_SQL_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_WORD_TOKENS = re.compile(r'"[^"]*"|\w+|[^\w\s]')
+# Words that start a subquery right after an opening parenthesis.
+_QUERY_STARTS = {"select", "with", "values"}
+# Words that can follow a FROM item in place of an alias.
+_CLAUSE_KEYWORDS = {
+    "where", "group", "having", "order", "limit", "offset", "fetch", "for", "window", "union", "intersect",
+    "except", "on", "using", "join", "inner", "left", "right", "full", "cross", "natural", "lateral",
+    "tablesample", "returning", "into", "select", "from", "with",
+}
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapses whitespace and lower-cases everything outside of literals and quoted identifiers,
+    so formatting-only variants of a query share a cache entry."""
+    parts = []
+    position = 0
+    for match in _SQL_TOKENS.finditer(sql):
+        parts.append(sql[position:match.start()].lower())
+        parts.append(" " if match.group(3) else match.group(0))
+        position = match.end()
+    parts.append(sql[position:].lower())
+    return "".join(parts).strip().rstrip(";").strip()
+
+
+def _sql_words(sql: str) -> List[Tuple[str, bool]]:
+    """The tokens of `sql` without its literals and comments, lower-cased, each with whether it is an identifier."""
+    text = _SQL_COMMENTS.sub(" ", _SQL_TOKENS.sub(lambda m: m.group(2) or " ", sql))
+    return [(token.strip('"').lower(), token[0] == '"' or token[0].isalnum() or token[0] == "_")
+            for token in _WORD_TOKENS.findall(text)]
+
+
+def referenced_tables(sql: str) -> Optional[Set[str]]:
+    """
+    Returns the (unqualified, lower-cased) names of the tables a query reads from: every item of
+    every FROM list and JOIN, subqueries included. Returns None when a FROM clause cannot be
+    followed, in which case the result must not be cached, since no write would invalidate it.
+    """
+    words = _sql_words(sql)
+    tables: Set[str] = set()
+    # One entry per open parenthesis: (whether FROM in it lists tables, whether it is a FROM item).
+    # FROM in a function call's parentheses, as in extract(year from ...), lists none.
+    parentheses: List[Tuple[bool, bool]] = []
+
+    def from_item(index: int) -> Optional[int]:
+        while index < len(words) and words[index][0] in ("lateral", "only"):
+            index += 1
+        if index >= len(words):
+            return None
+        word, is_identifier = words[index]
+        if word == "(":
+            # A subquery, or a parenthesized join whose first table follows the parenthesis.
+            parentheses.append((True, True))
+            if index + 1 < len(words) and words[index + 1][1] and words[index + 1][0] not in _QUERY_STARTS:
+                return from_item(index + 1)
+            return index + 1
+        if not is_identifier or word in _CLAUSE_KEYWORDS:
+            return None
+        name = word
+        index += 1
+        while index + 1 < len(words) and words[index][0] == "." and words[index + 1][1]:
+            name = words[index + 1][0]
+            index += 2
+        if index < len(words) and words[index][0] == "(":
+            # A set-returning function such as generate_series(...), not a table.
+            parentheses.append((False, True))
+            return index + 1
+        tables.add(name)
+        return after_from_item(index)
+
+    def after_from_item(index: int) -> Optional[int]:
+        """Skips a FROM item's alias and column aliases, then follows the FROM list past a comma."""
+        if index < len(words) and words[index][0] == "as":
+            index += 1
+        if index < len(words) and words[index][1] and words[index][0] not in _CLAUSE_KEYWORDS:
+            index += 1
+            if index < len(words) and words[index][0] == "(":
+                depth = 0
+                while index < len(words):
+                    depth += {"(": 1, ")": -1}.get(words[index][0], 0)
+                    index += 1
+                    if depth == 0:
+                        break
+        if index < len(words) and words[index][0] == ",":
+            return from_item(index + 1)
+        return index
+
+    index = 0
+    while index is not None and index < len(words):
+        word = words[index][0]
+        lists_tables = not parentheses or parentheses[-1][0]
+        if word == "(":
+            parentheses.append((index + 1 < len(words) and words[index + 1][0] in _QUERY_STARTS, False))
+            index += 1
+        elif word == ")":
+            if not parentheses:
+                return None
+            _, is_from_item = parentheses.pop()
+            index = after_from_item(index + 1) if is_from_item else index + 1
+        elif word == "join" and lists_tables:
+            index = from_item(index + 1)
+        elif word == "from" and lists_tables and (index == 0 or words[index - 1][0] != "distinct"):
+            index = from_item(index + 1)
+        else:
+            index += 1
+    if index is None or parentheses:
+        return None
+    return tables
+
+
+@dataclass
+class _CacheEntry:
+    value: str
+    size_bytes: int
+    expires_at: float
+    tables: Set[str] = field(default_factory=set)
+
+
+class QueryResultCache:
+    """
+    An LRU + TTL cache of serialized read-only query results.
+
+    Entries are keyed on the normalized SQL plus the query parameters, bounded both in
+    number and in total size, and indexed by the tables they read so that a write to a
+    table drops every cached result that depends on it.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, Hashable], _CacheEntry]" = OrderedDict()
+        self._keys_by_table: Dict[str, Set[Tuple[str, Hashable]]] = {}
+        self._size_bytes = 0
+        # Bumped on every invalidation, so a result read before a write is not cached after it.
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(sql: str, params: Hashable = None) -> Tuple[str, Hashable]:
+        return normalize_sql(sql), params
+
+    def get(self, sql: str, params: Hashable = None) -> Optional[str]:
+        key = self.make_key(sql, params)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def set(self, sql: str, value: str, params: Hashable = None, read_at_version: int = None) -> None:
+        """Caches `value`. Pass the `version` seen before running the query as `read_at_version`
+        to skip caching a result that a concurrent write may have made stale."""
+        if read_at_version is not None and read_at_version != self.version:
+            return
+        size_bytes = len(value.encode())
+        if size_bytes > self.max_bytes or self.max_entries <= 0:
+            return
+        tables = referenced_tables(sql)
+        if tables is None:
+            return
+        key = self.make_key(sql, params)
+        if key in self._entries:
+            self._remove(key)
+
+        entry = _CacheEntry(value, size_bytes, time.monotonic() + self.ttl_seconds, tables)
+        self._entries[key] = entry
+        self._size_bytes += size_bytes
+        for table in entry.tables:
+            self._keys_by_table.setdefault(table, set()).add(key)
+
+        while len(self._entries) > self.max_entries or self._size_bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate_tables(self, tables: Iterable[str]) -> int:
+        """Drops every entry that reads from one of `tables`. Returns the number of entries dropped."""
+        dropped = 0
+        for table in tables:
+            for key in list(self._keys_by_table.get(table.lower(), ())):
+                self._remove(key)
+                dropped += 1
+        self.invalidations += dropped
+        self.version += 1
+        return dropped
+
+    def clear(self) -> None:
+        self.version += 1
+        self._entries.clear()
+        self._keys_by_table.clear()
+        self._size_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self._size_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+    def _remove(self, key: Tuple[str, Hashable]) -> None:
+        entry = self._entries.pop(key)
+        self._size_bytes -= entry.size_bytes
+        for table in entry.tables:
+            keys = self._keys_by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_table[table]
@@ -0,0 +1,50 @@
+import time
+from typing import Any, Dict, Optional
+
+
+class SchemaCache:
+    """
+    The introspected table descriptions of the `describe_table` tool, cached per schema version.
+
+    The version is the latest migration applied: running a migration makes the next lookup
+    miss, so the descriptions are re-read from the catalog. The TTL only refreshes the
+    row estimates, which drift without any migration.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._version: Optional[int] = None
+        self._descriptions: Optional[Dict[str, Dict[str, Any]]] = None
+        self._expires_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, version: Optional[int]) -> Optional[Dict[str, Dict[str, Any]]]:
+        if self._descriptions is None or self._expires_at <= time.monotonic():
+            self.misses += 1
+            return None
+        if version != self._version:
+            self._descriptions = None
+            self.invalidations += 1
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._descriptions
+
+    def set(self, version: Optional[int], descriptions: Dict[str, Dict[str, Any]]) -> None:
+        self._version = version
+        self._descriptions = descriptions
+        self._expires_at = time.monotonic() + self.ttl_seconds
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "version": self._version,
+            "tables": len(self._descriptions) if self._descriptions is not None else 0,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,306 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, asdict
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import anyio
+
+from langchain_core.tools import BaseTool, StructuredTool, ToolException
+from langchain_mcp_adapters.sessions import create_session
+from mcp import ClientSession
+from mcp.shared.exceptions import McpError
+from mcp.types import CallToolResult, TextContent, Tool as MCPTool
+
+from src.Helpers.config import get_settings, Settings
+
+
+@dataclass
+class MCPServerPoolStats:
+    """Point-in-time statistics for the sessions of one MCP server."""
+    server: str
+    size: int
+    alive: int
+    idle: int
+    in_use: int
+    waiting: int
+    total_calls: int
+    failed_calls: int
+    restarts: int
+    healthcheck_failures: int
+    avg_wait_ms: float
+    avg_call_ms: float
+
+
+class PooledMCPSession:
+    """
+    One long-lived MCP client session and the subprocess behind it.
+
+    The session is opened and closed by a dedicated owner task: the stdio transport
+    uses anyio task groups, which must be exited from the task that entered them.
+    """
+    def __init__(self, server_name: str, connection: Dict[str, Any]):
+        self.server_name = server_name
+        self.connection = connection
+        self.session: Optional[ClientSession] = None
+        self._ready: asyncio.Future = None
+        self._close_event: asyncio.Event = None
+        self._owner_task: Optional[asyncio.Task] = None
+
+    @property
+    def is_alive(self) -> bool:
+        return self._owner_task is not None and not self._owner_task.done() and self.session is not None
+
+    async def open(self, timeout: float) -> None:
+        loop = asyncio.get_running_loop()
+        self._ready = loop.create_future()
+        self._close_event = asyncio.Event()
+        self._owner_task = asyncio.create_task(self._run(), name=f"mcp-session-{self.server_name}")
+        await asyncio.wait_for(asyncio.shield(self._ready), timeout=timeout)
+
+    async def close(self, timeout: float = 5.0) -> None:
+        if self._owner_task is None:
+            return
+        self._close_event.set()
+        try:
+            await asyncio.wait_for(self._owner_task, timeout=timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            self._owner_task.cancel()
+        except Exception:
+            # The subprocess already died; there is nothing left to clean up.
+            pass
+        self.session = None
+
+    async def _run(self) -> None:
+        try:
+            async with create_session(self.connection) as session:
+                await session.initialize()
+                self.session = session
+                self._ready.set_result(None)
+                await self._close_event.wait()
+        except Exception as e:
+            if not self._ready.done():
+                self._ready.set_exception(e)
+            else:
+                print(f"MCP session for server '{self.server_name}' terminated: {e}")
+        finally:
+            self.session = None
+
+
+class MCPServerPool:
+    """A fixed-size pool of warm sessions to a single MCP server."""
+
+    def __init__(self, server_name: str, connection: Dict[str, Any], settings: Settings):
+        self.server_name = server_name
+        self.connection = connection
+        self.size = settings.MCP_POOL_SIZE
+        self._startup_timeout = settings.MCP_POOL_STARTUP_TIMEOUT_SECONDS
+        self._acquire_timeout = settings.MCP_POOL_ACQUIRE_TIMEOUT_SECONDS
+        self._healthcheck_timeout = settings.MCP_POOL_HEALTHCHECK_TIMEOUT_SECONDS
+        self._sessions: List[PooledMCPSession] = []
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._waiting = 0
+        self._total_calls = 0
+        self._failed_calls = 0
+        self._restarts = 0
+        self._healthcheck_failures = 0
+        self._total_wait = 0.0
+        self._total_call_time = 0.0
+
+    async def start(self) -> None:
+        """Spawns all sessions of the server concurrently."""
+        self._sessions = [PooledMCPSession(self.server_name, self.connection) for _ in range(self.size)]
+        await asyncio.gather(*(pooled.open(self._startup_timeout) for pooled in self._sessions))
+        for pooled in self._sessions:
+            self._idle.put_nowait(pooled)
+
+    async def list_tools(self) -> List[MCPTool]:
+        async with self.acquire() as session:
+            tools, cursor = [], None
+            while True:
+                result = await session.list_tools(cursor=cursor)
+                tools.extend(result.tools)
+                cursor = result.nextCursor
+                if not cursor:
+                    return tools
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[ClientSession]:
+        """Checks out an idle session, restarting it first if its subprocess has died."""
+        start = time.perf_counter()
+        self._waiting += 1
+        try:
+            pooled: PooledMCPSession = await asyncio.wait_for(self._idle.get(), timeout=self._acquire_timeout)
+        finally:
+            self._waiting -= 1
+        self._total_wait += time.perf_counter() - start
+
+        try:
+            if not pooled.is_alive:
+                await self._restart(pooled)
+            try:
+                yield pooled.session
+            except McpError:
+                # A protocol-level error reported by the server: the session itself is fine.
+                raise
+            except Exception:
+                # Transport failures (broken pipe, crashed subprocess...) leave the session unusable.
+                await self._restart_quietly(pooled)
+                raise
+        finally:
+            self._idle.put_nowait(pooled)
+
+    async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> CallToolResult:
+        start = time.perf_counter()
+        self._total_calls += 1
+        try:
+            try:
+                async with self.acquire() as session:
+                    return await session.call_tool(tool_name, arguments)
+            except (anyio.ClosedResourceError, anyio.BrokenResourceError):
+                # The request never reached the (dead) server, so it is safe to retry it once
+                # on the session that acquire() has just restarted.
+                async with self.acquire() as session:
+                    return await session.call_tool(tool_name, arguments)
+        except Exception:
+            self._failed_calls += 1
+            raise
+        finally:
+            self._total_call_time += time.perf_counter() - start
+
+    async def health_check(self) -> None:
+        """Pings every idle session and restarts the ones that don't answer."""
+        for _ in range(self._idle.qsize()):
+            try:
+                pooled: PooledMCPSession = self._idle.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                if not pooled.is_alive:
+                    raise ConnectionError("session is not running")
+                await asyncio.wait_for(pooled.session.send_ping(), timeout=self._healthcheck_timeout)
+            except Exception as e:
+                self._healthcheck_failures += 1
+                print(f"Health check failed for MCP server '{self.server_name}': {e!r}. Restarting session.")
+                await self._restart_quietly(pooled)
+            finally:
+                self._idle.put_nowait(pooled)
+
+    async def close(self) -> None:
+        await asyncio.gather(*(pooled.close() for pooled in self._sessions))
+        self._sessions = []
+        self._idle = asyncio.Queue()
+
+    def stats(self) -> MCPServerPoolStats:
+        idle = self._idle.qsize()
+        return MCPServerPoolStats(
+            server=self.server_name,
+            size=self.size,
+            alive=sum(1 for pooled in self._sessions if pooled.is_alive),
+            idle=idle,
+            in_use=len(self._sessions) - idle,
+            waiting=self._waiting,
+            total_calls=self._total_calls,
+            failed_calls=self._failed_calls,
+            restarts=self._restarts,
+            healthcheck_failures=self._healthcheck_failures,
+            avg_wait_ms=round(1000 * self._total_wait / max(self._total_calls, 1), 3),
+            avg_call_ms=round(1000 * self._total_call_time / max(self._total_calls, 1), 3),
+        )
+
+    async def _restart(self, pooled: PooledMCPSession) -> None:
+        self._restarts += 1
+        await pooled.close()
+        await pooled.open(self._startup_timeout)
+
+    async def _restart_quietly(self, pooled: PooledMCPSession) -> None:
+        try:
+            await self._restart(pooled)
+        except Exception as e:
+            # Leave it dead; the next acquire() retries the restart.
+            print(f"Could not restart MCP session for server '{self.server_name}': {e!r}")
+
+
+class MCPSessionPool:
+    """
+    Keeps warm sessions to every configured MCP server for the lifetime of the process.
+
+    - Spawns `MCP_POOL_SIZE` sessions per server once, instead of one subprocess per graph build.
+    - Exposes the servers' tools as LangChain tools that borrow a pooled session per call.
+    - Periodically health-checks idle sessions and restarts crashed subprocesses.
+    """
+    def __init__(self, connections: Dict[str, Dict[str, Any]], settings: Settings = None):
+        self.settings = settings if settings else get_settings()
+        self.servers: Dict[str, MCPServerPool] = {
+            server_name: MCPServerPool(server_name, connection, self.settings)
+            for server_name, connection in connections.items()
+        }
+        self._tools: Optional[List[BaseTool]] = None
+        self._start_lock = asyncio.Lock()
+        self._healthcheck_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Starts every server pool and discovers the tools. Safe to call more than once."""
+        async with self._start_lock:
+            if self._tools is not None:
+                return
+            await asyncio.gather(*(server_pool.start() for server_pool in self.servers.values()))
+            tools = []
+            for server_name, server_pool in self.servers.items():
+                for mcp_tool in await server_pool.list_tools():
+                    tools.append(self._to_langchain_tool(server_name, mcp_tool))
+            self._tools = tools
+            self._healthcheck_task = asyncio.create_task(self._healthcheck_loop())
+            print(f"MCP session pool ready: {len(self.servers)} servers, {len(tools)} tools.")
+
+    async def get_tools(self) -> List[BaseTool]:
+        await self.start()
+        return self._tools
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {server_name: asdict(server_pool.stats()) for server_name, server_pool in self.servers.items()}
+
+    async def close(self) -> None:
+        if self._healthcheck_task:
+            self._healthcheck_task.cancel()
+            try:
+                await self._healthcheck_task
+            except asyncio.CancelledError:
+                pass
+        await asyncio.gather(*(server_pool.close() for server_pool in self.servers.values()))
+        self._tools = None
+
+    async def _healthcheck_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.settings.MCP_POOL_HEALTHCHECK_INTERVAL_SECONDS)
+            await asyncio.gather(*(server_pool.health_check() for server_pool in self.servers.values()))
+
+    def _to_langchain_tool(self, server_name: str, mcp_tool: MCPTool) -> BaseTool:
+        server_pool = self.servers[server_name]
+
+        async def call_tool(**arguments: Any) -> str:
+            result = await server_pool.call_tool(mcp_tool.name, arguments)
+            content = "\n".join(block.text for block in result.content if isinstance(block, TextContent))
+            if result.isError:
+                raise ToolException(content)
+            return content
+
+        return StructuredTool(
+            name=mcp_tool.name,
+            description=mcp_tool.description or "",
+            args_schema=mcp_tool.inputSchema,
+            coroutine=call_tool,
+            metadata={"mcp_server": server_name},
+        )
+
+
+_pool_instance: Optional[MCPSessionPool] = None
+
+def get_mcp_session_pool(mcp_config: Dict[str, Any] = None) -> MCPSessionPool:
+    """Returns the process-wide MCPSessionPool, creating it from the MCP config on first use."""
+    global _pool_instance
+    if _pool_instance is None:
+        if mcp_config is None:
+            from src.MCP import mcp_config
+        _pool_instance = MCPSessionPool(connections=mcp_config["mcpServers"])
+    return _pool_instance
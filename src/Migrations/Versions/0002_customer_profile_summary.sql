@@ -0,0 +1,151 @@
+-- Per-customer purchase summary behind the `get_customer_profiles` tool.
+-- It is kept up to date incrementally: statement-level triggers on transactions
+-- recompute only the customers touched by each INSERT / UPDATE / DELETE.
+
+create table if not exists public.customer_profile_summary (
+  "Customer ID" bigint not null,
+  first_purchase_at timestamp with time zone null,
+  last_purchase_at timestamp with time zone null,
+  invoice_count bigint not null default 0,
+  total_quantity bigint not null default 0,
+  total_spent double precision not null default 0,
+  top_items jsonb not null default '[]'::jsonb,
+  refreshed_at timestamp with time zone not null default now(),
+  constraint customer_profile_summary_pkey primary key ("Customer ID")
+) TABLESPACE pg_default;
+
+ALTER TABLE customer_profile_summary ENABLE ROW LEVEL SECURITY;
+
+-- Recomputes the summary of the given customers (all customers when customer_ids is null).
+create or replace function public.refresh_customer_profile_summary(customer_ids bigint[])
+returns void
+language plpgsql
+as $$
+begin
+  delete from public.customer_profile_summary s
+  where (customer_ids is null or s."Customer ID" = any (customer_ids))
+    and not exists (
+      select 1 from public.transactions t where t."Customer ID" = s."Customer ID"
+    );
+
+  insert into public.customer_profile_summary as s (
+    "Customer ID", first_purchase_at, last_purchase_at, invoice_count,
+    total_quantity, total_spent, top_items, refreshed_at
+  )
+  with customer_items as (
+    select
+      t."Customer ID",
+      t."StockCode",
+      max(t."InvoiceDate") as last_purchased_at,
+      coalesce(sum(t."Quantity"), 0) as quantity,
+      coalesce(sum(t."TotalPrice"), 0) as spent
+    from public.transactions t
+    where t."Customer ID" is not null
+      and (customer_ids is null or t."Customer ID" = any (customer_ids))
+    group by t."Customer ID", t."StockCode"
+  ),
+  ranked_items as (
+    select
+      ci.*,
+      row_number() over (partition by ci."Customer ID" order by ci.spent desc, ci."StockCode") as item_rank
+    from customer_items ci
+  ),
+  totals as (
+    select
+      t."Customer ID",
+      min(t."InvoiceDate") as first_purchase_at,
+      max(t."InvoiceDate") as last_purchase_at,
+      count(distinct t."Invoice") as invoice_count
+    from public.transactions t
+    where t."Customer ID" is not null
+      and (customer_ids is null or t."Customer ID" = any (customer_ids))
+    group by t."Customer ID"
+  )
+  select
+    totals."Customer ID",
+    totals.first_purchase_at,
+    totals.last_purchase_at,
+    totals.invoice_count,
+    items.total_quantity,
+    items.total_spent,
+    items.top_items,
+    now()
+  from totals
+  join (
+    select
+      ri."Customer ID",
+      sum(ri.quantity) as total_quantity,
+      sum(ri.spent) as total_spent,
+      jsonb_agg(
+        jsonb_build_object(
+          'stock_code', ri."StockCode",
+          'description', i."Description",
+          'quantity', ri.quantity,
+          'spent', round(ri.spent::numeric, 2),
+          'last_purchased_at', ri.last_purchased_at
+        )
+        order by ri.item_rank
+      ) filter (where ri.item_rank <= 5) as top_items
+    from ranked_items ri
+    left join public.items i on i."StockCode" = ri."StockCode"
+    group by ri."Customer ID"
+  ) items on items."Customer ID" = totals."Customer ID"
+  on conflict ("Customer ID") do update set
+    first_purchase_at = excluded.first_purchase_at,
+    last_purchase_at = excluded.last_purchase_at,
+    invoice_count = excluded.invoice_count,
+    total_quantity = excluded.total_quantity,
+    total_spent = excluded.total_spent,
+    top_items = excluded.top_items,
+    refreshed_at = excluded.refreshed_at;
+end;
+$$;
+
+-- Statement-level trigger: reads the transition tables once per statement, so a bulk
+-- load refreshes each affected customer once instead of once per inserted row.
+create or replace function public.refresh_customer_profile_summary_from_transactions()
+returns trigger
+language plpgsql
+as $$
+begin
+  if TG_OP = 'INSERT' then
+    perform public.refresh_customer_profile_summary(
+      array(select distinct "Customer ID" from new_rows where "Customer ID" is not null)
+    );
+  elsif TG_OP = 'UPDATE' then
+    perform public.refresh_customer_profile_summary(
+      array(
+        select "Customer ID" from old_rows where "Customer ID" is not null
+        union
+        select "Customer ID" from new_rows where "Customer ID" is not null
+      )
+    );
+  else
+    perform public.refresh_customer_profile_summary(
+      array(select distinct "Customer ID" from old_rows where "Customer ID" is not null)
+    );
+  end if;
+  return null;
+end;
+$$;
+
+drop trigger if exists transactions_refresh_profile_summary_insert on public.transactions;
+create trigger transactions_refresh_profile_summary_insert
+after insert on public.transactions
+referencing new table as new_rows
+for each statement execute function public.refresh_customer_profile_summary_from_transactions();
+
+drop trigger if exists transactions_refresh_profile_summary_update on public.transactions;
+create trigger transactions_refresh_profile_summary_update
+after update on public.transactions
+referencing old table as old_rows new table as new_rows
+for each statement execute function public.refresh_customer_profile_summary_from_transactions();
+
+drop trigger if exists transactions_refresh_profile_summary_delete on public.transactions;
+create trigger transactions_refresh_profile_summary_delete
+after delete on public.transactions
+referencing old table as old_rows
+for each statement execute function public.refresh_customer_profile_summary_from_transactions();
+
+-- Backfill the summary of every existing customer.
+select public.refresh_customer_profile_summary(null);
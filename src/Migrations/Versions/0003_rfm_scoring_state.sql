@@ -0,0 +1,17 @@
+-- State of the RFM engine (src/Analytics/rfm_engine.py): the reference date and the
+-- quintile edges of its last full run, which incremental runs reuse to score the
+-- customers with new invoices, and the watermark of the transactions already scored.
+
+create table if not exists public.rfm_scoring_state (
+  id smallint not null default 1,
+  reference_date date not null,
+  recency_edges double precision[] not null,
+  frequency_edges double precision[] not null,
+  monetary_edges double precision[] not null,
+  transactions_watermark timestamp with time zone null,
+  scored_at timestamp with time zone not null default now(),
+  constraint rfm_scoring_state_pkey primary key (id),
+  constraint rfm_scoring_state_single_row check (id = 1)
+) TABLESPACE pg_default;
+
+ALTER TABLE rfm_scoring_state ENABLE ROW LEVEL SECURITY;
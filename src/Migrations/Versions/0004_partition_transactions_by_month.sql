@@ -0,0 +1,99 @@
+-- Range-partitions transactions by month of "InvoiceDate", so that date-bounded queries
+-- only scan the months they ask for, and adds its secondary indexes.
+-- The partition key has to be part of the primary key, which becomes
+-- ("Invoice", "StockCode", "InvoiceDate"); "InvoiceDate" becomes NOT NULL.
+
+-- Creates the monthly partitions covering [from_date, to_date] that don't exist yet.
+-- Rows already sitting in the default partition for those months are moved into them.
+create or replace function public.create_transactions_partitions(from_date timestamp with time zone,
+                                                                 to_date timestamp with time zone)
+returns integer
+language plpgsql
+as $$
+declare
+  month_start timestamp with time zone := date_trunc('month', from_date at time zone 'UTC') at time zone 'UTC';
+  month_end timestamp with time zone;
+  partition_name text;
+  created integer := 0;
+begin
+  if from_date is null or to_date is null then
+    return 0;
+  end if;
+
+  while month_start <= to_date loop
+    month_end := month_start + interval '1 month';
+    partition_name := format('transactions_%s', to_char(month_start at time zone 'UTC', 'YYYY_MM'));
+
+    if to_regclass(format('public.%I', partition_name)) is null then
+      execute format('create table public.%I (like public.transactions including defaults)', partition_name);
+      if to_regclass('public.transactions_default') is not null then
+        execute format(
+          'with moved as (delete from public.transactions_default where "InvoiceDate" >= %L and "InvoiceDate" < %L returning *) '
+          'insert into public.%I select * from moved',
+          month_start, month_end, partition_name
+        );
+      end if;
+      execute format(
+        'alter table public.transactions attach partition public.%I for values from (%L) to (%L)',
+        partition_name, month_start, month_end
+      );
+      created := created + 1;
+    end if;
+
+    month_start := month_end;
+  end loop;
+  return created;
+end;
+$$;
+
+create table public.transactions_partitioned (
+  "Invoice" bigint not null,
+  "InvoiceDate" timestamp with time zone not null,
+  "StockCode" text not null,
+  "Quantity" bigint null,
+  "Price" double precision null,
+  "TotalPrice" double precision null,
+  "Customer ID" bigint null
+) partition by range ("InvoiceDate");
+
+create table public.transactions_default partition of public.transactions_partitioned default;
+
+-- Swap the tables: the partitions are created on the new table under its final name.
+alter table public.transactions rename to transactions_unpartitioned;
+alter table public.transactions_partitioned rename to transactions;
+
+-- One partition per month of existing data, plus the current and the next two months;
+-- anything else lands in the default partition until its month is created.
+select public.create_transactions_partitions(min("InvoiceDate"), max("InvoiceDate"))
+from public.transactions_unpartitioned;
+select public.create_transactions_partitions(now(), now() + interval '2 months');
+
+insert into public.transactions ("Invoice", "InvoiceDate", "StockCode", "Quantity", "Price", "TotalPrice", "Customer ID")
+select "Invoice", "InvoiceDate", "StockCode", "Quantity", "Price", "TotalPrice", "Customer ID"
+from public.transactions_unpartitioned;
+
+drop table public.transactions_unpartitioned;
+
+-- Indexes are built once the rows are in, on every partition.
+alter table public.transactions add constraint transactions_pkey primary key ("Invoice", "StockCode", "InvoiceDate");
+create index transactions_customer_id_invoice_date_idx on public.transactions ("Customer ID", "InvoiceDate" desc);
+create index transactions_invoice_date_idx on public.transactions ("InvoiceDate");
+create index transactions_stock_code_idx on public.transactions ("StockCode");
+
+ALTER TABLE transactions ENABLE ROW LEVEL SECURITY;
+
+-- The customer profile summary triggers (0002) went away with the old table.
+create trigger transactions_refresh_profile_summary_insert
+after insert on public.transactions
+referencing new table as new_rows
+for each statement execute function public.refresh_customer_profile_summary_from_transactions();
+
+create trigger transactions_refresh_profile_summary_update
+after update on public.transactions
+referencing old table as old_rows new table as new_rows
+for each statement execute function public.refresh_customer_profile_summary_from_transactions();
+
+create trigger transactions_refresh_profile_summary_delete
+after delete on public.transactions
+referencing old table as old_rows
+for each statement execute function public.refresh_customer_profile_summary_from_transactions();
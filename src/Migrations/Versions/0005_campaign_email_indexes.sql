@@ -0,0 +1,10 @@
+-- migrate:no-transaction
+-- Secondary indexes for the campaign_emails lookups of the agent (by campaign, and a
+-- customer's latest emails). Built CONCURRENTLY so that sending emails isn't blocked
+-- while they build, which can't run inside a transaction block.
+
+create index concurrently if not exists campaign_emails_campaign_id_idx
+  on public.campaign_emails (campaign_id);
+
+create index concurrently if not exists campaign_emails_customer_id_idx
+  on public.campaign_emails (customer_id, sent_at desc);
@@ -0,0 +1,30 @@
+-- Describes the CRM tables and their less obvious columns in the catalog, where the
+-- marketing server's `describe_table` tool reads them along with the introspected schema.
+
+comment on table public.customers is 'One row per customer: name, email (for marketing campaigns) and country.';
+
+comment on table public.transactions is 'One row per invoice line: the item purchased, its quantity and price, and the customer. Partitioned by month of "InvoiceDate".';
+comment on column public.transactions."Invoice" is 'Invoice number; an invoice has one line per item.';
+comment on column public.transactions."StockCode" is 'The item purchased, see items."StockCode".';
+comment on column public.transactions."Price" is 'Unit price.';
+comment on column public.transactions."TotalPrice" is '"Quantity" * "Price".';
+comment on column public.transactions."Customer ID" is 'The customer, see customers."Customer ID".';
+
+comment on table public.items is 'One row per item: description and unit price.';
+
+comment on table public.rfm is 'RFM scores and segment of each customer, recomputed from the transactions by the RFM engine.';
+comment on column public.rfm.recency is 'Days since the customer''s last purchase.';
+comment on column public.rfm.frequency is 'Number of transaction lines.';
+comment on column public.rfm.monetary is 'Total spent.';
+comment on column public.rfm."R" is 'Recency quintile, 5 for the most recent customers.';
+comment on column public.rfm."F" is 'Frequency quintile, 5 for the most frequent customers.';
+comment on column public.rfm."M" is 'Monetary quintile, 5 for the biggest spenders.';
+comment on column public.rfm."RFM_Score" is 'The digits R, F and M, e.g. 355.';
+comment on column public.rfm."Segment" is 'Champion, Recent Customer, Frequent Buyer, Big Spender, At Risk or Others.';
+
+comment on table public.marketing_campaigns is 'The marketing campaigns, created with the create_campaign tool.';
+
+comment on table public.campaign_emails is 'One row per email sent as part of a marketing campaign, with its delivery status.';
+
+comment on table public.customer_profile_summary is 'Precomputed purchase totals, first/last purchase dates and top items of each customer, kept up to date from the transactions.';
+comment on column public.customer_profile_summary.top_items is 'The customer''s most purchased items: [{"stock_code", "description", "quantity", "spent"}].';
@@ -0,0 +1,227 @@
+"""
+Applies the versioned SQL migrations of the CRM database.
+
+- Version 1 is the baseline schema, src/Assets/Data/migration-create-table.sql.
+- Later versions are the files src/Migrations/Versions/NNNN_description.sql, in order.
+
+Applied versions are recorded in `schema_migrations`. A migration runs in a single
+transaction together with its bookkeeping, unless its first line is
+`-- migrate:no-transaction` (needed for CREATE INDEX CONCURRENTLY): it then runs statement
+by statement in autocommit mode, so its statements must be idempotent (IF NOT EXISTS).
+A database that was set up by hand before the runner existed (it has the baseline tables
+but no `schema_migrations`) gets version 1 recorded without running it.
+
+Usage:
+    python -m src.Migrations.migration_runner [--target 4]
+    python -m src.Migrations.migration_runner --status
+"""
+import argparse
+import hashlib
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.engine import Engine
+
+from src.Authentication.database import setup_database_engine
+from src.Helpers.config import get_settings
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "Assets", "Data", "migration-create-table.sql")
+VERSIONS_DIR = os.path.join(os.path.dirname(__file__), "Versions")
+NO_TRANSACTION_MARKER = "-- migrate:no-transaction"
+# Key of the advisory lock that keeps two runners from migrating the same database at once.
+MIGRATION_LOCK_ID = 7_312_004_211
+
+_VERSION_FILE = re.compile(r"^(\d+)_(\w+)\.sql$")
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    path: str
+    checksum: str
+    transactional: bool
+
+    @classmethod
+    def from_file(cls, version: int, name: str, path: str) -> "Migration":
+        with open(path, "rb") as migration_file:
+            content = migration_file.read()
+        first_line = content.decode("utf-8").lstrip().splitlines()[0] if content.strip() else ""
+        return cls(
+            version=version,
+            name=name,
+            path=path,
+            checksum=hashlib.sha256(content).hexdigest(),
+            transactional=first_line.strip() != NO_TRANSACTION_MARKER,
+        )
+
+    def read(self) -> str:
+        with open(self.path, "r", encoding="utf-8") as migration_file:
+            return migration_file.read()
+
+
+def discover_migrations(versions_dir: str = VERSIONS_DIR, baseline_path: str = BASELINE_PATH) -> List[Migration]:
+    migrations = [Migration.from_file(1, "create_tables", baseline_path)]
+    for file_name in sorted(os.listdir(versions_dir)):
+        match = _VERSION_FILE.match(file_name)
+        if match:
+            migrations.append(Migration.from_file(int(match.group(1)), match.group(2),
+                                                  os.path.join(versions_dir, file_name)))
+
+    versions = [migration.version for migration in migrations]
+    if len(set(versions)) != len(versions):
+        raise ValueError(f"Duplicate migration versions in {versions_dir}: {versions}")
+    return sorted(migrations, key=lambda migration: migration.version)
+
+
+def split_statements(script: str) -> List[str]:
+    """Splits a no-transaction script on the semicolons that end a line.
+    (Such scripts hold plain DDL statements, without function bodies.)"""
+    lines = [line for line in script.splitlines() if not line.strip().startswith("--")]
+    statements = re.split(r";\s*(?:\n|$)", "\n".join(lines))
+    return [statement.strip() for statement in statements if statement.strip()]
+
+
+class MigrationRunner:
+    """Applies pending migrations, in version order, on a psycopg connection of the engine."""
+
+    def __init__(self, engine: Engine, migrations: Optional[List[Migration]] = None):
+        self.engine = engine
+        self.migrations = migrations if migrations is not None else discover_migrations()
+
+    def status(self) -> List[Dict[str, Any]]:
+        with self._connection() as connection:
+            applied = self._applied(connection)
+        return [
+            {
+                "version": migration.version,
+                "name": migration.name,
+                "applied_at": applied[migration.version]["applied_at"] if migration.version in applied else None,
+                "checksum_changed": migration.version in applied
+                                    and applied[migration.version]["checksum"] != migration.checksum,
+            }
+            for migration in self.migrations
+        ]
+
+    def migrate(self, target: Optional[int] = None) -> List[Migration]:
+        """Applies the pending migrations up to `target` (the latest by default). Returns those applied."""
+        applied_now = []
+        with self._connection() as connection:
+            connection.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_ID,))
+            try:
+                self._ensure_schema_migrations(connection)
+                applied = self._applied(connection)
+                for migration in self.migrations:
+                    if target is not None and migration.version > target:
+                        break
+                    if migration.version in applied:
+                        if applied[migration.version]["checksum"] != migration.checksum:
+                            print(f"Warning: migration {migration.version} ({migration.name}) "
+                                  f"was modified after it was applied.")
+                        continue
+                    self._apply(connection, migration)
+                    applied_now.append(migration)
+            finally:
+                connection.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_ID,))
+        return applied_now
+
+    def _apply(self, connection, migration: Migration) -> None:
+        print(f"Applying migration {migration.version} ({migration.name})...")
+        started = time.perf_counter()
+        script = migration.read()
+        if migration.transactional:
+            with connection.transaction():
+                connection.execute(script)
+                self._record(connection, migration, started)
+        else:
+            for statement in split_statements(script):
+                connection.execute(statement)
+            self._record(connection, migration, started)
+        print(f"Applied migration {migration.version} in {time.perf_counter() - started:.2f}s.")
+
+    @staticmethod
+    def _record(connection, migration: Migration, started: float, baselined: bool = False) -> None:
+        connection.execute(
+            """
+            INSERT INTO schema_migrations (version, name, checksum, execution_ms, baselined)
+            VALUES (%s, %s, %s, %s, %s)
+            """,
+            (migration.version, migration.name, migration.checksum,
+             int((time.perf_counter() - started) * 1000), baselined),
+        )
+
+    def _ensure_schema_migrations(self, connection) -> None:
+        if connection.execute("SELECT to_regclass('public.schema_migrations')").fetchone()[0] is not None:
+            return
+        baseline_exists = connection.execute("SELECT to_regclass('public.customers')").fetchone()[0] is not None
+        with connection.transaction():
+            connection.execute(
+                """
+                CREATE TABLE public.schema_migrations (
+                  version integer not null,
+                  name text not null,
+                  checksum text not null,
+                  applied_at timestamp with time zone not null default now(),
+                  execution_ms integer null,
+                  baselined boolean not null default false,
+                  constraint schema_migrations_pkey primary key (version)
+                )
+                """
+            )
+            if baseline_exists:
+                print("Existing schema found: recording the baseline migration as applied.")
+                self._record(connection, self.migrations[0], time.perf_counter(), baselined=True)
+
+    @staticmethod
+    def _applied(connection) -> Dict[int, Dict[str, Any]]:
+        if connection.execute("SELECT to_regclass('public.schema_migrations')").fetchone()[0] is None:
+            return {}
+        rows = connection.execute("SELECT version, checksum, applied_at FROM schema_migrations").fetchall()
+        return {version: {"checksum": checksum, "applied_at": applied_at} for version, checksum, applied_at in rows}
+
+    def _connection(self):
+        return _AutocommitConnection(self.engine)
+
+
+class _AutocommitConnection:
+    """A pooled psycopg connection in autocommit mode, for the lifetime of the context."""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self._pooled_connection = None
+
+    def __enter__(self):
+        self._pooled_connection = self.engine.raw_connection()
+        connection = self._pooled_connection.driver_connection
+        connection.autocommit = True
+        return connection
+
+    def __exit__(self, *exc_info):
+        try:
+            self._pooled_connection.driver_connection.autocommit = False
+        finally:
+            self._pooled_connection.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", type=int, default=None, help="Migrate up to this version (default: latest).")
+    parser.add_argument("--status", action="store_true", help="List the migrations and whether they are applied.")
+    args = parser.parse_args()
+
+    db_engine, _ = setup_database_engine(get_settings().SUPABASE_URI)
+    try:
+        runner = MigrationRunner(db_engine)
+        if args.status:
+            for entry in runner.status():
+                state = f"applied {entry['applied_at']:%Y-%m-%d %H:%M}" if entry["applied_at"] else "pending"
+                warning = "  (modified since applied)" if entry["checksum_changed"] else ""
+                print(f"{entry['version']:>4}  {entry['name']:<40} {state}{warning}")
+        else:
+            applied = runner.migrate(target=args.target)
+            print(f"{len(applied)} migration(s) applied." if applied else "Database is up to date.")
+    finally:
+        db_engine.dispose()
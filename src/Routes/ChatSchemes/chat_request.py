@@ -1,7 +1,8 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Literal, Optional
 
 class ChatRequest(BaseModel):
     message: str
     thread_id: str
-    yolo_mode : Optional[str] = None
\ No newline at end of file
+    yolo_mode : bool = False
+    stream_format : Literal["text", "sse"] = "text"  # "sse": typed Server-Sent Events
\ No newline at end of file
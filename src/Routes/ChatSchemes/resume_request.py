@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+from typing import Any, Literal, Optional
+
+class ResumeRequest(BaseModel):
+    thread_id: str
+    action: Literal["continue", "update", "feedback"]
+    data: Optional[Any] = None  # "update": the per-call edits (see HumanToolReviewNode), "feedback": the message to the agent
+    interrupt_id: Optional[str] = None  # the interrupt answered, required when several are pending
+    stream_format : Literal["text", "sse"] = "text"
\ No newline at end of file
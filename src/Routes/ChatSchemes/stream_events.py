@@ -0,0 +1,143 @@
+import json
+import time
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, ToolMessage
+
+# An SSE comment line: ignored by EventSource clients, it keeps proxies from closing an idle stream.
+SSE_HEARTBEAT = ": heartbeat\n\n"
+
+
+class StreamEventType(Enum):
+    TOKEN = "token"
+    TOOL_CALL = "tool_call"
+    TOOL_RESULT = "tool_result"
+    INTERRUPT = "interrupt"
+    USAGE = "usage"
+    ERROR = "error"
+    DONE = "done"
+
+
+StreamEvent = Tuple[StreamEventType, Dict[str, Any]]
+
+
+def format_sse_event(event_type: StreamEventType, data: Dict[str, Any], event_id: int) -> str:
+    """Frames one event; the data is compact JSON on a single line."""
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str)
+    return f"id: {event_id}\nevent: {event_type.value}\ndata: {payload}\n\n"
+
+
+def _text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    return "".join(block.get("text", "") for block in content if isinstance(block, dict))
+
+
+class StreamEventTranslator:
+    """
+    Turns the graph's "messages" stream into typed events: token, tool_call (once its
+    arguments are complete), tool_result and usage. Usage is also summed over the run.
+    """
+
+    def __init__(self, tool_result_max_chars: int):
+        self.tool_result_max_chars = tool_result_max_chars
+        self._pending: Dict[str, AIMessageChunk] = {}  # tool call chunks, by message id
+        self._emitted_tool_calls = set()
+        self.usage = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+
+    def translate(self, message: BaseMessage) -> List[StreamEvent]:
+        events = []
+        if isinstance(message, AIMessageChunk):
+            text = _text(message.content)
+            if text:
+                events.append((StreamEventType.TOKEN, {"text": text}))
+            if message.tool_call_chunks:
+                pending = self._pending.get(message.id)
+                self._pending[message.id] = message if pending is None else pending + message
+            if message.chunk_position == "last" or message.response_metadata.get("finish_reason"):
+                events += self._tool_calls(self._pending.pop(message.id, None))
+            if message.usage_metadata:
+                events.append(self._usage(message.usage_metadata))
+        elif isinstance(message, AIMessage):
+            # A message a node returned without streaming it, e.g. tool calls edited in review.
+            text = _text(message.content)
+            if text:
+                events.append((StreamEventType.TOKEN, {"text": text}))
+            events += self._tool_calls(message)
+        elif isinstance(message, ToolMessage):
+            events += self.flush()
+            content = _text(message.content)
+            truncated = len(content) > self.tool_result_max_chars
+            events.append((StreamEventType.TOOL_RESULT, {
+                "tool_call_id": message.tool_call_id,
+                "name": message.name,
+                "status": message.status,
+                "content": content[:self.tool_result_max_chars],
+                "truncated": truncated,
+            }))
+        return events
+
+    def flush(self) -> List[StreamEvent]:
+        """Emits the tool calls of messages whose last chunk never came (e.g. a cancelled completion)."""
+        events = []
+        for message_id in list(self._pending):
+            events += self._tool_calls(self._pending.pop(message_id))
+        return events
+
+    def _tool_calls(self, message: Optional[AIMessage]) -> List[StreamEvent]:
+        if message is None:
+            return []
+        events = []
+        for tool_call in message.tool_calls:
+            if tool_call["id"] in self._emitted_tool_calls:
+                continue
+            self._emitted_tool_calls.add(tool_call["id"])
+            events.append((StreamEventType.TOOL_CALL,
+                           {"id": tool_call["id"], "name": tool_call["name"], "args": tool_call["args"]}))
+        return events
+
+    def _usage(self, usage_metadata: Dict[str, Any]) -> StreamEvent:
+        usage = {key: usage_metadata.get(key, 0) for key in self.usage}
+        for key, value in usage.items():
+            self.usage[key] += value
+        return StreamEventType.USAGE, usage
+
+
+class TokenCoalescer:
+    """
+    Buffers token text into fewer, larger events: the buffer is flushed once it holds
+    `max_bytes`, or `max_delay_seconds` after its first token, whichever comes first.
+    """
+
+    def __init__(self, max_bytes: int, max_delay_seconds: float):
+        self.max_bytes = max_bytes
+        self.max_delay_seconds = max_delay_seconds
+        self._parts: List[str] = []
+        self._size_bytes = 0
+        self._started_at = 0.0
+
+    @property
+    def pending(self) -> bool:
+        return bool(self._parts)
+
+    def add(self, text: str) -> Optional[str]:
+        """Buffers `text`. Returns the buffered text when it is due to be sent."""
+        if not self._parts:
+            self._started_at = time.monotonic()
+        self._parts.append(text)
+        self._size_bytes += len(text.encode())
+        if self._size_bytes >= self.max_bytes or self.time_left() <= 0:
+            return self.flush()
+        return None
+
+    def time_left(self) -> float:
+        """Seconds until the buffered text is due."""
+        return max(0.0, self._started_at + self.max_delay_seconds - time.monotonic())
+
+    def flush(self) -> Optional[str]:
+        if not self._parts:
+            return None
+        text = "".join(self._parts)
+        self._parts, self._size_bytes = [], 0
+        return text
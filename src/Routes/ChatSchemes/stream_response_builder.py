@@ -1,48 +1,105 @@
 import json
-from langchain_core.messages import AIMessageChunk
-from typing import AsyncGenerator, Any , Dict
+import time
+import asyncio
+from contextlib import aclosing
+from langchain_core.messages import AIMessage, AIMessageChunk
+from typing import AsyncGenerator, Any , Callable , Dict , List , Union
 from langgraph.graph import StateGraph 
-from langgraph.types import Command
+from langgraph.types import Command, StateSnapshot
 from src.Agent.State.crm_state import AgentState
 from src.Agent.Graph.crm_graph import CRMGraph
+from src.Routes.ChatSchemes.stream_events import (
+    SSE_HEARTBEAT,
+    StreamEvent,
+    StreamEventTranslator,
+    StreamEventType,
+    TokenCoalescer,
+    format_sse_event,
+)
+from src.Helpers.config import get_settings
+from src.Helpers.metrics import STREAM_DURATION, STREAM_FLUSH_DURATION, STREAM_IN_FLIGHT, STREAM_TIME_TO_FIRST_BYTE
+
+# Marks the end of the graph's events on the SSE queue.
+_END_OF_STREAM = object()
 
 
 
 class StreamResponseBuilder:
 
-    def __init__(self , graph_input : AgentState , graph : CRMGraph , config : Dict):
-        self.graph_input = graph_input
+    def __init__(self , graph_input : Union[AgentState, Command] , graph : CRMGraph , config : Dict ,
+                 stream_format : str = "text"):
+        if isinstance(graph_input, Command):
+            # Resuming an interrupted run (see the /chat/resume route)
+            self.graph_input = graph_input
+        else:
+            # Pass the explicitly set fields rather than the model itself: the input is written to
+            # the checkpointer, which only deserializes registered types.
+            self.graph_input = {field: getattr(graph_input, field) for field in graph_input.model_fields_set}
         self.graph = graph 
         self.config = config
+        self.stream_format = stream_format
+        self.settings = get_settings()
+        self._translator = StreamEventTranslator(tool_result_max_chars=self.settings.STREAM_TOOL_RESULT_MAX_CHARS)
 
     async def event_stream(self):
+        """The response body: plain text, or typed Server-Sent Events when `stream_format` is "sse"."""
+        stream_format = self.stream_format
+        started = time.perf_counter()
+        first_byte_sent = False
+        status = "error"
+        STREAM_IN_FLIGHT.inc(format=stream_format)
+        try:
+            body = self._sse_stream() if self.stream_format == "sse" else self._event_stream(
+                self._stream_graph_responses,
+                lambda thread_state: ["\n\n--- 🔔 Human Approval Required ---\n"
+                                      f"{json.dumps(self._pending_review(thread_state), indent=2, ensure_ascii=False)}\n"
+                                      "Answer with POST /chat/resume.\n"],
+            )
+            async with aclosing(body) as stream:
+                async for chunk in stream:
+                    if chunk and not first_byte_sent:
+                        first_byte_sent = True
+                        STREAM_TIME_TO_FIRST_BYTE.observe(time.perf_counter() - started, format=stream_format)
+                    # StreamingResponse asks for the next chunk once it has sent this one.
+                    flushing = time.perf_counter()
+                    yield chunk
+                    STREAM_FLUSH_DURATION.observe(time.perf_counter() - flushing, format=stream_format)
+            status = "completed"
+        except (asyncio.CancelledError, GeneratorExit):
+            status = "disconnected"
+            # The client went away: StreamingResponse cancels or closes this generator.
+            # Closing the graph streams (see aclosing below) cancels the running node,
+            # which in turn aborts the in-flight LLM request.
+            print(f"Client disconnected, cancelled graph run for thread <{self.config['configurable']['thread_id']}>")
+            raise
+        finally:
+            STREAM_IN_FLIGHT.dec(format=stream_format)
+            STREAM_DURATION.observe(time.perf_counter() - started, format=stream_format, status=status)
+
+    async def _event_stream(self, stream_responses: Callable, format_interrupts: Callable):
+        """Runs the graph through `stream_responses`, then `format_interrupts` if it stopped for a review."""
         # Stream graph execution
-        async for chunk in self._stream_graph_responses(self.graph_input, self.graph, config=self.config):
-            yield chunk
-
-        thread_state = await self.graph.get_state(config=self.config)
-
-        # Handle interrupts
-        while thread_state.interrupts:
-            for interrupt in thread_state.interrupts:
-                interrupt_json_str = json.dumps(interrupt.value, indent=2, ensure_ascii=False)
-                yield f"\n\n--- 🔔 Human Approval Required ---\n{interrupt_json_str}\n"
-
-                # For production: here you may return the interrupt state to the frontend and pause
-                # But for demo purposes, simulate auto-approval
-                # In real case, save the interrupt and let the user act later (via another API call)
-
-                action = "continue"  # Simulating human action
-                data = None
-
-                async for resumed_chunk in self._stream_graph_responses(
-                    Command(resume={"action": action, "data": data}),
-                    self.graph,
-                    config=self.config
-                ):
-                    yield resumed_chunk
-
-                thread_state = await self.graph.get_state(config=self.config)
+        async with aclosing(stream_responses(self.graph_input, self.graph, config=self.config)) as stream:
+            async for chunk in stream:
+                yield chunk
+
+        # An interrupted run ends the response: the interrupt is in the checkpoint, so the
+        # thread holds no connection or coroutine while it waits for the reviewer, who
+        # answers through /chat/resume, possibly from another worker.
+        thread_state = await self.graph.aget_state(config=self.config)
+        if thread_state.interrupts:
+            for chunk in format_interrupts(thread_state):
+                yield chunk
+
+    def _pending_review(self, thread_state: StateSnapshot) -> Dict[str, Any]:
+        """What a reviewer needs to answer an interrupted run: the interrupts and the tool calls they hold back."""
+        messages = thread_state.values.get("messages") or []
+        last_message = messages[-1] if messages else None
+        return {
+            "thread_id": self.config["configurable"]["thread_id"],
+            "interrupts": [{"id": interrupt.id, "value": interrupt.value} for interrupt in thread_state.interrupts],
+            "pending_tool_calls": last_message.tool_calls if isinstance(last_message, AIMessage) else [],
+        }
 
 
     async def _stream_graph_responses(
@@ -61,29 +118,127 @@ class StreamResponseBuilder:
         Returns:
             str: The final LLM or tool call response
         """
-        async for message_chunk, metadata in graph.astream(
+        async with aclosing(graph.astream(
             input=input,
             stream_mode="messages",
+            # "async" overlaps each super-step's checkpoint write with the next step,
+            # "exit" coalesces the whole run into a single write
+            durability=self.settings.CHECKPOINT_DURABILITY,
             **kwargs
-            ):
-            if isinstance(message_chunk, AIMessageChunk):
-                if message_chunk.response_metadata:
-                    finish_reason = message_chunk.response_metadata.get("finish_reason", "")
-                    if finish_reason == "tool_calls":
-                        yield "\n\n"
+            )) as graph_stream:
+            async for message_chunk, metadata in graph_stream:
+                if isinstance(message_chunk, AIMessageChunk):
+                    if message_chunk.response_metadata:
+                        finish_reason = message_chunk.response_metadata.get("finish_reason", "")
+                        if finish_reason == "tool_calls":
+                            yield "\n\n"
+
+                    if message_chunk.tool_call_chunks:
+                        tool_chunk = message_chunk.tool_call_chunks[0]
+
+                        tool_name = tool_chunk.get("name", "")
+                        args = tool_chunk.get("args", "")
+
+                        if tool_name:
+                            tool_call_str = f"\n\n< TOOL CALL: {tool_name} >\n\n"
+                        if args:
+                            tool_call_str = args
 
-                if message_chunk.tool_call_chunks:
-                    tool_chunk = message_chunk.tool_call_chunks[0]
+                        yield tool_call_str
+                    else:
+                        yield message_chunk.content
+                    continue
 
-                    tool_name = tool_chunk.get("name", "")
-                    args = tool_chunk.get("args", "")
 
-                    if tool_name:
-                        tool_call_str = f"\n\n< TOOL CALL: {tool_name} >\n\n"
-                    if args:
-                        tool_call_str = args
+    async def _stream_graph_events(
+            self,
+            input: dict[str, Any],
+            graph: StateGraph,
+            **kwargs
+            ) -> AsyncGenerator[StreamEvent, None]:
+        """Asynchronously stream the graph run as typed events (see StreamEventTranslator)."""
+        async with aclosing(graph.astream(
+            input=input,
+            stream_mode="messages",
+            durability=self.settings.CHECKPOINT_DURABILITY,
+            **kwargs
+            )) as graph_stream:
+            async for message, metadata in graph_stream:
+                for event in self._translator.translate(message):
+                    yield event
+        for event in self._translator.flush():
+            yield event
+
+    async def _produce_events(self, queue: asyncio.Queue) -> None:
+        """Feeds the SSE queue with the graph's events. The queue is bounded: while the client
+        is not reading, `put` blocks and the graph's stream is no longer consumed."""
+        try:
+            interrupted = False
+
+            def format_interrupts(thread_state: StateSnapshot) -> List[StreamEvent]:
+                nonlocal interrupted
+                interrupted = True
+                return [(StreamEventType.INTERRUPT, self._pending_review(thread_state))]
+
+            async with aclosing(self._event_stream(self._stream_graph_events, format_interrupts)) as events:
+                async for event in events:
+                    await queue.put(event)
+            await queue.put((StreamEventType.DONE, {
+                "thread_id": self.config["configurable"]["thread_id"],
+                "status": "interrupted" if interrupted else "completed",
+                "usage": self._translator.usage,
+            }))
+        except Exception as e:
+            print(f"Graph run failed for thread <{self.config['configurable']['thread_id']}>: {e}")
+            await queue.put((StreamEventType.ERROR, {"message": str(e)}))
+        finally:
+            await queue.put(_END_OF_STREAM)
+
+    async def _sse_stream(self):
+        """
+        Writes the graph's events as Server-Sent Events.
 
-                    yield tool_call_str
+        Tokens are coalesced (STREAM_COALESCE_MAX_BYTES / STREAM_COALESCE_MAX_DELAY_MS) into few
+        writes, any other event first flushes the tokens before it, and a heartbeat comment is
+        written whenever the stream has been silent for STREAM_HEARTBEAT_SECONDS.
+        """
+        coalescer = TokenCoalescer(max_bytes=self.settings.STREAM_COALESCE_MAX_BYTES,
+                                   max_delay_seconds=self.settings.STREAM_COALESCE_MAX_DELAY_MS / 1000)
+        queue = asyncio.Queue(maxsize=self.settings.STREAM_QUEUE_MAX_EVENTS)
+        producer = asyncio.create_task(self._produce_events(queue))
+        event_id = 0
+        last_write = time.monotonic()
+        try:
+            while True:
+                if coalescer.pending:
+                    timeout = coalescer.time_left()
+                else:
+                    timeout = max(0.0, last_write + self.settings.STREAM_HEARTBEAT_SECONDS - time.monotonic())
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    item = None
+
+                frames = []
+                if item is None or item is _END_OF_STREAM or item[0] != StreamEventType.TOKEN:
+                    text = coalescer.flush()
                 else:
-                    yield message_chunk.content
-                continue
\ No newline at end of file
+                    text = coalescer.add(item[1]["text"])
+                if text:
+                    event_id += 1
+                    frames.append(format_sse_event(StreamEventType.TOKEN, {"text": text}, event_id))
+                if item is not None and item is not _END_OF_STREAM and item[0] != StreamEventType.TOKEN:
+                    event_id += 1
+                    frames.append(format_sse_event(item[0], item[1], event_id))
+                if item is None and not frames:
+                    frames.append(SSE_HEARTBEAT)
+
+                if frames:
+                    # One write per batch: the send blocks until the client's transport drains.
+                    yield "".join(frames)
+                    last_write = time.monotonic()
+                if item is _END_OF_STREAM:
+                    break
+        finally:
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
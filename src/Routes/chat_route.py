@@ -1,38 +1,130 @@
-from fastapi import APIRouter
+import asyncio
+from typing import AsyncIterator, Dict
+from uuid import uuid4
+from weakref import WeakValueDictionary
+
+from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from langchain_core.messages import HumanMessage
+from langgraph.types import Command
 
 from src.Routes.ChatSchemes.chat_request import ChatRequest
-from src.Agent.Graph.crm_graph import CRMGraph
+from src.Routes.ChatSchemes.resume_request import ResumeRequest
+from src.Agent.Graph.graph_registry import get_graph_registry
 from src.Agent.State.crm_state import AgentState
+from src.Routes.ChatSchemes.stream_events import StreamEventType, format_sse_event
 from src.Routes.ChatSchemes.stream_response_builder import StreamResponseBuilder
 
 
 router = APIRouter(prefix="/chat", tags=["Chat"])
 
+# One lock per thread, held by a resumed run while it streams, so that two answers to the same
+# review (a double click, a client retry) cannot both run the tools. It is dropped once no
+# resume holds it. In-process only: with several workers, pin a thread's requests to one.
+_resume_locks: "WeakValueDictionary[str, asyncio.Lock]" = WeakValueDictionary()
+
 @router.post("/invoke")
 async def invoke_chat(chat_request: ChatRequest):
     thread_id = chat_request.thread_id
     meesage_input = chat_request.message
     yolo_mode = chat_request.yolo_mode
+    stream_format = chat_request.stream_format
 
     config = {
             "configurable": {
                 "thread_id": thread_id
             }
         }
-    
+
     graph_input = AgentState(
             messages=[
-                HumanMessage(content=meesage_input)
+                HumanMessage(content=meesage_input, id=str(uuid4()))
             ],
             yolo_mode=yolo_mode
         )
-    
-    crm_graph = CRMGraph()
-    graph = await crm_graph.get_graph()
-    stream_response_builder = StreamResponseBuilder(graph_input=graph_input , 
+
+    # The compiled graph is built once per process and shared across requests
+    graph = await get_graph_registry().get_graph()
+    # A new message would abandon the tool calls waiting for approval
+    thread_state = await graph.aget_state(config=config)
+    if thread_state.interrupts:
+        raise HTTPException(status_code=409,
+                            detail=f"Thread <{thread_id}> is waiting for a review, answer it with /chat/resume.")
+
+    stream_response_builder = StreamResponseBuilder(graph_input=graph_input ,
                                                     graph=graph,
-                                                    config=config)
-    return StreamingResponse(stream_response_builder.event_stream(), media_type="text/plain")
+                                                    config=config,
+                                                    stream_format=stream_format)
+    return _streaming_response(stream_response_builder.event_stream(), stream_format)
+
+
+@router.post("/resume")
+async def resume_chat(resume_request: ResumeRequest):
+    """Answers the review an interrupted run is waiting for, and streams the rest of the run."""
+    thread_id = resume_request.thread_id
+    config = {
+            "configurable": {
+                "thread_id": thread_id
+            }
+        }
+
+    graph = await get_graph_registry().get_graph()
+    thread_state = await graph.aget_state(config=config)
+    pending_ids = [interrupt.id for interrupt in thread_state.interrupts]
+    if not pending_ids:
+        raise HTTPException(status_code=409, detail=f"Thread <{thread_id}> is not waiting for a review.")
+    if resume_request.interrupt_id is not None and resume_request.interrupt_id not in pending_ids:
+        raise HTTPException(status_code=409,
+                            detail=f"Interrupt <{resume_request.interrupt_id}> is not pending, "
+                                   f"the thread is waiting on: {', '.join(pending_ids)}.")
+    if resume_request.interrupt_id is None and len(pending_ids) > 1:
+        raise HTTPException(status_code=422,
+                            detail=f"Several reviews are pending, pass one of them as interrupt_id: {', '.join(pending_ids)}.")
+    resume_lock = _resume_locks.get(thread_id)
+    if resume_lock is not None and resume_lock.locked():
+        raise HTTPException(status_code=409, detail=f"Thread <{thread_id}> is already being resumed.")
+
+    review = {"action": resume_request.action, "data": resume_request.data}
+    resume = {resume_request.interrupt_id: review} if resume_request.interrupt_id else review
+    stream_response_builder = StreamResponseBuilder(graph_input=Command(resume=resume),
+                                                    graph=graph,
+                                                    config=config,
+                                                    stream_format=resume_request.stream_format)
+    body = _resume_stream(stream_response_builder, graph, config,
+                          interrupt_id=resume_request.interrupt_id or pending_ids[0])
+    return _streaming_response(body, resume_request.stream_format)
+
+
+async def _resume_stream(stream_response_builder: StreamResponseBuilder, graph, config: Dict,
+                         interrupt_id: str) -> AsyncIterator[str]:
+    """Runs a resume under its thread's lock, unless the interrupt it answers was answered meanwhile."""
+    thread_id = config["configurable"]["thread_id"]
+    # Taken by the stream itself, so that a response that is never sent cannot keep it.
+    resume_lock = _resume_locks.setdefault(thread_id, asyncio.Lock())
+    async with resume_lock:
+        thread_state = await graph.aget_state(config=config)
+        if interrupt_id not in [interrupt.id for interrupt in thread_state.interrupts]:
+            message = f"Interrupt <{interrupt_id}> of thread <{thread_id}> was already answered."
+            if stream_response_builder.stream_format == "sse":
+                yield format_sse_event(StreamEventType.ERROR, {"message": message}, 1)
+            else:
+                yield message
+            return
+        async for chunk in stream_response_builder.event_stream():
+            yield chunk
+
+
+def _streaming_response(body: AsyncIterator[str], stream_format: str) -> StreamingResponse:
+    if stream_format == "sse":
+        # No caching or proxy buffering, so that every coalesced event reaches the client at once
+        return StreamingResponse(body, media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    return StreamingResponse(body, media_type="text/plain")
+
+
+@router.post("/graph/rebuild", status_code=202)
+async def rebuild_graph():
+    graph_registry = get_graph_registry()
+    graph_registry.rebuild_in_background()
+    return {"status": "rebuilding", "generation": graph_registry.generation}
@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+
+from src.Agent.LLM.llm_gateway import get_llm_gateway
+from src.Agent.LLM.llm_response_cache import get_llm_response_cache
+
+
+router = APIRouter(prefix="/llm", tags=["LLM"])
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    return get_llm_response_cache().stats()
+
+@router.get("/gateway/stats")
+async def get_gateway_stats():
+    return get_llm_gateway().stats()
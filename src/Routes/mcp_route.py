@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+
+from src.MCP.mcp_session_pool import get_mcp_session_pool
+
+
+router = APIRouter(prefix="/mcp", tags=["MCP"])
+
+@router.get("/pool/stats")
+async def get_pool_stats():
+    return get_mcp_session_pool().stats()
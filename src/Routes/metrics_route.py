@@ -0,0 +1,23 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from src.Agent.LLM.llm_gateway import get_llm_gateway
+from src.Helpers.metrics import (
+    LLM_GATEWAY_CONCURRENCY_LIMIT,
+    LLM_GATEWAY_IN_FLIGHT,
+    LLM_GATEWAY_QUEUED,
+    REGISTRY,
+)
+
+
+router = APIRouter(tags=["Metrics"])
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """The process's metrics in the Prometheus text format."""
+    # The gateway keeps its own counters: they are read at scrape time.
+    gateway_stats = get_llm_gateway().stats()
+    LLM_GATEWAY_QUEUED.set(gateway_stats["queued"])
+    LLM_GATEWAY_IN_FLIGHT.set(gateway_stats["in_flight"])
+    LLM_GATEWAY_CONCURRENCY_LIMIT.set(gateway_stats["concurrency_limit"])
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
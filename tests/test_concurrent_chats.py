@@ -0,0 +1,72 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import StateGraph, START, END
+
+from src.Agent.Nodes.assistant_node import AssistantNode
+from src.Agent.State.crm_state import AgentState
+from src.Routes.ChatSchemes.stream_response_builder import StreamResponseBuilder
+
+CHATS = 5
+LATENCY_SECONDS = 0.5
+
+
+class SlowChatModel(BaseChatModel):
+    """A chat model that takes `latency` seconds to stream its answer."""
+    latency: float = LATENCY_SECONDS
+    reply: str = "Our champions are the customers with an RFM score of 555."
+
+    @property
+    def _llm_type(self) -> str:
+        return "slow-fake"
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs: Any) -> ChatResult:
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.reply))])
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager=None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        tokens = self.reply.split(" ")
+        for token in tokens:
+            await asyncio.sleep(self.latency / len(tokens))
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token + " "))
+
+
+def _build_graph():
+    graph = StateGraph(state_schema=AgentState)
+    graph.add_node("assistant_node", AssistantNode(llm=SlowChatModel()))
+    graph.add_edge(START, "assistant_node")
+    graph.add_edge("assistant_node", END)
+    return graph.compile(checkpointer=MemorySaver())
+
+
+async def _chat(graph, thread_id: str) -> str:
+    stream_response_builder = StreamResponseBuilder(
+        graph_input=AgentState(messages=[HumanMessage(content="Who are our champions?")]),
+        graph=graph,
+        config={"configurable": {"thread_id": thread_id}},
+    )
+    return "".join([chunk async for chunk in stream_response_builder.event_stream()])
+
+
+async def _timed_chats(graph, chats: int) -> float:
+    started = time.perf_counter()
+    replies = await asyncio.gather(*(_chat(graph, f"chat-{chats}-{index}") for index in range(chats)))
+    assert all("champions" in reply for reply in replies)
+    return time.perf_counter() - started
+
+
+def test_parallel_chats_overlap_on_one_worker():
+    async def run():
+        graph = _build_graph()
+        return await _timed_chats(graph, 1), await _timed_chats(graph, CHATS)
+
+    one_chat, parallel_chats = asyncio.run(run())
+    # Chats that queued behind each other would take about CHATS times as long.
+    assert parallel_chats < 2 * one_chat, f"{CHATS} chats took {parallel_chats:.2f}s, one took {one_chat:.2f}s"
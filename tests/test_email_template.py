@@ -0,0 +1,17 @@
+from src.Agent.Nodes.Campaign.email_template import render, slot_values
+from src.Agent.Nodes.Campaign.email_worker_node import validate_email
+
+BODY = '<p>Hi {{first_name}},</p><p>We saved you a {{favorite_product}}.</p><a href="https://shop.example">Shop now</a>'
+
+
+def test_rendered_email_greets_a_name_that_html_escapes():
+    profile = {"name": "D'Arcy Smith", "top_items": [{"description": "cake stand"}]}
+    body = render(BODY, slot_values(profile, favorites=[]))
+    assert "D&#x27;Arcy" in body
+    assert validate_email("Just for you", body, profile) == []
+
+
+def test_email_without_the_customer_name_is_rejected():
+    profile = {"name": "D'Arcy Smith", "top_items": []}
+    body = render(BODY, slot_values({"name": "Someone Else"}, favorites=[]))
+    assert validate_email("Just for you", body, profile) == ["The body does not greet the customer by name (D'Arcy)."]
@@ -0,0 +1,39 @@
+from src.MCP.Servers.query_result_cache import QueryResultCache, referenced_tables
+
+
+def test_referenced_tables_follows_comma_joins():
+    assert referenced_tables("SELECT * FROM customers c, campaign_emails e WHERE c.id = e.customer_id") == {
+        "customers", "campaign_emails"}
+    assert referenced_tables("select * from customers, rfm") == {"customers", "rfm"}
+
+
+def test_referenced_tables_ignores_from_inside_function_calls():
+    sql = 'SELECT extract(year from "InvoiceDate") AS year, count(*) FROM orders GROUP BY 1'
+    assert referenced_tables(sql) == {"orders"}
+    assert referenced_tables("SELECT substring(name from 2 for 3) FROM customers") == {"customers"}
+
+
+def test_referenced_tables_follows_subqueries_and_joins():
+    sql = ('SELECT * FROM (SELECT * FROM rfm) r, public."Customers" AS c '
+           'JOIN campaign_emails e ON e.customer_id = c.id WHERE c.id IN (SELECT id FROM segments)')
+    assert referenced_tables(sql) == {"rfm", "customers", "campaign_emails", "segments"}
+
+
+def test_referenced_tables_ignores_literals_and_comments():
+    assert referenced_tables("SELECT 'from x' FROM rfm -- from y") == {"rfm"}
+
+
+def test_unparseable_query_is_not_cached():
+    cache = QueryResultCache(max_entries=10, max_bytes=10_000, ttl_seconds=60)
+    assert referenced_tables("SELECT * FROM") is None
+    cache.set("SELECT * FROM", "[]")
+    assert cache.get("SELECT * FROM") is None
+
+
+def test_write_to_any_joined_table_invalidates_the_result():
+    cache = QueryResultCache(max_entries=10, max_bytes=10_000, ttl_seconds=60)
+    sql = "SELECT * FROM customers c, rfm r WHERE c.id = r.customer_id"
+    cache.set(sql, "[1]")
+    assert cache.get(sql) == "[1]"
+    assert cache.invalidate_tables(["rfm"]) == 1
+    assert cache.get(sql) is None